@@ -0,0 +1,51 @@
+"""
+Insert latency of CSVManager.add_seizure_record for growing logs.
+
+Run from the project root:
+    python -m benchmarks.bench_append
+"""
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from services.csv_manager import CSVManager
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+INSERTS = 50
+
+
+def write_log(path, rows):
+    """Write a seizure log with `rows` records in the two-header-row layout"""
+    start = datetime(2000, 1, 1)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("Судорожные приступы,,,,,\n")
+        f.write("№,Дата,Время,Продолж-сть,Интервал,Комментарии\n")
+        for i in range(rows):
+            dt = start + timedelta(hours=6 * i)
+            f.write(f"{i + 1},{dt.month}/{dt.day}/{dt.year},{dt.hour}:{dt.minute:02d},30 сек,0,\n")
+    return start + timedelta(hours=6 * rows)
+
+
+def bench(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "seizure.csv")
+        next_dt = write_log(path, rows)
+        manager = CSVManager(path)
+
+        timings = []
+        for i in range(INSERTS):
+            dt = next_dt + timedelta(days=i)
+            t0 = time.perf_counter()
+            ok, _ = manager.add_seizure_record(dt.strftime("%Y-%m-%d %H:%M"), "30 сек", "")
+            timings.append(time.perf_counter() - t0)
+            assert ok
+    return statistics.median(timings), max(timings)
+
+
+if __name__ == "__main__":
+    print(f"{'rows':>10} {'median, ms':>12} {'max, ms':>10}")
+    for rows in SIZES:
+        median, worst = bench(rows)
+        print(f"{rows:>10} {median * 1000:>12.3f} {worst * 1000:>10.3f}")
@@ -0,0 +1,108 @@
+"""
+Back-dated inserts, edits and deletes on a large log, for both backends.
+
+A seizure entered late is placed in time order by binary search (the sorted
+timestamp index for CSV, the occurred_at index for SQLite). Only the new
+row's interval and the next seizure's are recomputed. Each operation is
+timed at a few depths from the end of the log. The script then checks that
+the log stays in time order and numbered 1..n, and that no Интервал cell
+other than those two changed. Appends after the last row are timed for
+comparison; they still go through the O(1) tail path.
+
+Run from the project root:
+    python -m benchmarks.bench_back_dated
+"""
+import io
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from benchmarks.synthetic_logs import write_seizure_log
+from services.csv_manager import CSVManager
+from services.seizure_import import read_log_text
+from services.seizure_store import parse_timestamps
+from services.sqlite_manager import SQLiteManager
+
+ROWS = 100_000
+APPENDS = 20
+# How far back from the newest seizure the late entry goes, in rows
+DEPTHS = [1, 100, ROWS // 2, ROWS - 1]
+
+
+def log_text(manager):
+    if isinstance(manager, SQLiteManager):
+        return read_log_text(io.BytesIO(b''.join(manager.iter_seizure_csv())))
+    return read_log_text(manager.csv_path)
+
+
+def changed_intervals(before, after):
+    """Интервал cells of rows present in both logs that differ, keyed by date and time"""
+    key = ['Дата', 'Время']
+    merged = before[key + ['Интервал']].merge(after[key + ['Интервал']], on=key, suffixes=('', '_after'))
+    return int((merged['Интервал'] != merged['Интервал_after']).sum())
+
+
+def check(manager):
+    df = log_text(manager)
+    stamps = parse_timestamps(df)
+    assert stamps.is_monotonic_increasing, "log is out of time order"
+    assert list(df['№']) == [str(n) for n in range(1, len(df) + 1)], "№ not 1..n"
+    return df
+
+
+def timed(func, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def bench(manager, stamps, last):
+    manager.get_statistics()
+    append_ms = 0.0
+    for i in range(APPENDS):
+        ok, ms = timed(manager.add_seizure_record, (last + timedelta(days=i + 1)).strftime("%Y-%m-%d %H:%M"), "30 сек")
+        assert ok[0]
+        append_ms += ms / APPENDS
+    print(f"  append after the last row        {append_ms:8.2f} ms")
+
+    for depth in DEPTHS:
+        # Half way between two existing seizures `depth` rows before the end
+        earlier, later = stamps.iloc[-depth - 1], stamps.iloc[-depth]
+        late = (earlier + (later - earlier) / 2).floor('min')
+        when = late.strftime("%Y-%m-%d %H:%M")
+
+        before = check(manager)
+        (ok, days), insert_ms = timed(manager.add_seizure_record, when, "20 сек", "внесено позже")
+        after = check(manager)
+        assert ok and changed_intervals(before, after) <= 1, "insert touched other intervals"
+
+        moved = (late + timedelta(minutes=1)).strftime("%Y-%m-%d %H:%M")
+        (ok, _), edit_ms = timed(manager.update_seizure_record, when, new_datetime_str=moved)
+        assert ok
+        deleted, delete_ms = timed(manager.delete_seizure_record, moved)
+        final = check(manager)
+        assert deleted and len(final) == len(before)
+        assert changed_intervals(before, final) <= 1, "delete did not restore the neighbour"
+        print(f"  {depth:>6} rows back: insert {insert_ms:8.2f} ms, move {edit_ms:8.2f} ms, "
+              f"delete {delete_ms:8.2f} ms  (interval {days} days)")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "seizure.csv")
+        last = write_seizure_log(path, ROWS)
+        stamps = parse_timestamps(read_log_text(path))
+        print(f"{ROWS} seizures")
+
+        sqlite = SQLiteManager(os.path.join(tmp, "seizure.sqlite3"))
+        sqlite.migrate_from_csv(path)
+        for name, manager in (("csv", CSVManager(path)), ("sqlite", sqlite)):
+            print(name)
+            bench(manager, stamps, pd.Timestamp(last))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Binary columnar seizure log (STORAGE_BACKEND=binary) against the CSV log.
+
+For a large synthetic log the script measures:
+  - converting the CSV into the binary log, and the file sizes
+  - a cold load of the seizure store, what every chart worker process
+    does first: the CSV is parsed, the binary log is only mapped
+  - the typed columns and statistics read after that
+  - appending seizures through add_seizure_record (O(1) in both)
+  - exporting the binary log back to CSV for /send_file, checked to be
+    cell for cell the CSV it was imported from
+
+Run from the project root:
+    python -m benchmarks.bench_binary_log
+"""
+import io
+import os
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_logs import write_seizure_log
+from services.binary_log import BinaryLogManager, BinarySeizureStore, strings_path
+from services.csv_manager import CSVManager
+from services.seizure_import import read_log_text, write_log_text
+from services.seizure_store import SeizureStore
+
+ROWS = 100_000
+APPENDS = 50
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_cold_load(csv_path, binary_path):
+    print("first read of a new store       CSV         binary")
+    reads = {
+        "sorted timestamps": lambda store: store.sorted_timestamps(),
+        "typed columns": lambda store: store.columns(),
+        "statistics": lambda store: store.statistics(),
+        "frame() (charts)": lambda store: store.frame(),
+    }
+    for name, read in reads.items():
+        old = best_of(lambda: read(SeizureStore(csv_path)))
+        new = best_of(lambda: read(BinarySeizureStore(binary_path)))
+        print(f"  {name:<26} {old * 1e3:9.1f} ms {new * 1e3:9.1f} ms")
+
+    timestamps = BinarySeizureStore(binary_path).records().timestamps
+    assert not timestamps.flags.owndata, "timestamps should be a view of the mapping"
+
+
+def bench_appends(manager, last):
+    timings = []
+    for _ in range(APPENDS):
+        last += timedelta(days=1)
+        t0 = time.perf_counter()
+        manager.add_seizure_record(last.strftime("%Y-%m-%d %H:%M"), "30 сек")
+        manager.store.statistics()
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings), last
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "seizure.csv")
+        binary_path = os.path.join(tmp, "seizure.bin")
+        last = pd.Timestamp(write_seizure_log(csv_path, ROWS))
+
+        binary = BinaryLogManager(binary_path)
+        t0 = time.perf_counter()
+        binary.migrate_from_csv(csv_path)
+        elapsed = time.perf_counter() - t0
+        size = os.path.getsize(binary_path) + os.path.getsize(strings_path(binary_path))
+        print(f"{ROWS} seizures: CSV {os.path.getsize(csv_path) / 1e6:.1f} MB, binary log {size / 1e6:.1f} MB "
+              f"(records + strings), converted in {elapsed:.2f} s")
+
+        bench_cold_load(csv_path, binary_path)
+
+        csv_manager = CSVManager(csv_path)
+        csv_manager.store.statistics()
+        binary.store.statistics()
+        old, _ = bench_appends(csv_manager, last)
+        new, last = bench_appends(binary, last)
+        print(f"add_seizure_record + statistics(): CSV {old * 1e3:.2f} ms, binary {new * 1e3:.2f} ms (median)")
+
+        t0 = time.perf_counter()
+        exported = b"".join(binary.iter_seizure_csv())
+        elapsed = time.perf_counter() - t0
+        expected = io.StringIO()
+        write_log_text(expected, read_log_text(csv_path))
+        assert exported == expected.getvalue().encode('utf-8'), "export differs from the CSV log"
+        print(f"export to CSV: {elapsed * 1e3:.1f} ms, identical to the CSV log")
+        records = binary.store.records()
+        assert np.array_equal(records.timestamps, csv_manager.store.records().timestamps)
+
+
+if __name__ == "__main__":
+    main()
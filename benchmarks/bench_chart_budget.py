@@ -0,0 +1,66 @@
+"""
+Render time and PNG size of the seizure charts against log length.
+
+"all points" draws every seizure (the old behaviour, skipped for the largest
+log because it takes minutes), "decimated" is the default per-seizure view
+thinned out to CHART_MAX_POINTS with LTTB, "week"/"month" the aggregated
+views. The log is parsed once before timing, as in a warm chart worker.
+It also checks that a series over the point budget with few or no values
+(blank Интервал cells) is drawn without decimation.
+
+Run from the project root:
+    python -m benchmarks.bench_chart_budget
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_logs import write_seizure_log
+from services.chart_generator import ChartGenerator
+
+SIZES = [1_000, 100_000, 1_000_000]
+FULL_RENDER_LIMIT = 100_000
+VIEWS = [
+    ("all points", None, True),
+    ("decimated", None, False),
+    ("week", 'week', False),
+    ("month", 'month', False),
+]
+
+
+def main():
+    print(f"{'rows':>10}  {'chart':<9} {'view':<11} {'render':>9}  {'PNG':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in SIZES:
+            path = os.path.join(tmp, f"seizure_{rows}.csv")
+            write_seizure_log(path, rows)
+            ChartGenerator(path)._load_data()
+            for name, period, full in VIEWS:
+                if full and rows > FULL_RENDER_LIMIT:
+                    continue
+                generator = ChartGenerator(path, max_points=rows + 1) if full else ChartGenerator(path)
+                for chart_type in ('interval', 'duration'):
+                    t0 = time.perf_counter()
+                    png = generator.render(chart_type, period=period).getvalue()
+                    elapsed = time.perf_counter() - t0
+                    print(f"{rows:>10,}  {chart_type:<9} {name:<11} {elapsed * 1000:>6.0f} ms  "
+                          f"{len(png) / 1024:>4.0f} KB")
+
+
+def check_blank_values():
+    generator = ChartGenerator(os.devnull, max_points=10)
+    dates = np.arange('2025-01-01', '2025-02-20', dtype='datetime64[D]').astype('datetime64[ns]')
+    values = np.full(len(dates), np.nan)
+    kept = generator._decimate(dates, values, values)
+    assert all(len(column) == 0 for column in kept), kept
+    values[::10] = 1.0
+    kept_dates, kept_values, _ = generator._decimate(dates, values, values)
+    assert (kept_dates == dates[::10]).all() and (kept_values == 1.0).all(), kept_values
+    print("decimation: all-blank and mostly blank series over the budget keep their values only")
+
+
+if __name__ == '__main__':
+    check_blank_values()
+    main()
@@ -0,0 +1,130 @@
+"""
+Vectorized ChartGenerator._prepare_*_data against the old row-by-row version.
+
+Run from the project root:
+    python -m benchmarks.bench_chart_prepare
+"""
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from services.chart_generator import ChartGenerator
+
+SIZES = [10_000, 1_000_000]
+
+
+def synthetic_frame(rows, seed=0):
+    """Frame shaped like pd.read_csv(seizure.csv, skiprows=1)"""
+    rng = np.random.default_rng(seed)
+    # Spread the rows over ~100 years so any size stays within datetime64 bounds
+    mean_gap = 100 * 365 * 24 * 60 / rows
+    gaps = rng.exponential(mean_gap, rows).astype('int64') + 1
+    stamps = pd.Timestamp(1990, 1, 1) + pd.to_timedelta(np.cumsum(gaps), unit='m')
+    intervals = np.diff(stamps.values).astype('timedelta64[D]').astype(float)
+    return pd.DataFrame({
+        '№': np.arange(1, rows + 1),
+        'Дата': [f"{t.month}/{t.day}/{t.year}" for t in stamps],
+        'Время': [f"{t.hour}:{t.minute:02d}" for t in stamps],
+        'Продолж-сть': [f"{d} сек" for d in rng.choice([15, 20, 30, 40], rows)],
+        'Интервал': np.concatenate([[np.nan], intervals]),
+        'Комментарии': np.nan,
+    })
+
+
+def legacy_prepare_interval_data(df):
+    """ChartGenerator._prepare_interval_data before vectorization"""
+    dates = []
+    intervals = []
+
+    for idx, row in df.iterrows():
+        try:
+            date_str = row['Дата']
+            time_str = row['Время']
+            dt = datetime.strptime(f"{date_str} {time_str}", "%m/%d/%Y %H:%M")
+            dates.append(dt)
+
+            interval_str = str(row.get('Интервал', ''))
+            if interval_str and interval_str.strip():
+                try:
+                    intervals.append(float(interval_str))
+                except ValueError:
+                    intervals.append(None)
+            else:
+                intervals.append(None)
+        except Exception as e:
+            print(f"Error processing row {idx}: {e}")
+
+    valid_indices = [i for i, val in enumerate(intervals) if val is not None]
+    filtered_dates = [dates[i] for i in valid_indices]
+    filtered_intervals = [intervals[i] for i in valid_indices]
+    normalized_intervals = []
+    if filtered_intervals:
+        max_interval = max(filtered_intervals)
+        normalized_intervals = [i / max_interval for i in filtered_intervals]
+
+    return filtered_dates, filtered_intervals, normalized_intervals
+
+
+def legacy_prepare_duration_data(df):
+    """ChartGenerator._prepare_duration_data before vectorization"""
+    dates = []
+    durations = []
+
+    for idx, row in df.iterrows():
+        try:
+            date_str = row['Дата']
+            time_str = row['Время']
+            dt = datetime.strptime(f"{date_str} {time_str}", "%m/%d/%Y %H:%M")
+            dates.append(dt)
+
+            duration_str = str(row.get('Продолж-сть', ''))
+            if 'сек' in duration_str:
+                duration_str = duration_str.replace('сек', '').strip()
+            if duration_str and duration_str.strip() and duration_str.strip().replace('.', '', 1).isdigit():
+                durations.append(float(duration_str))
+            else:
+                durations.append(None)
+        except Exception as e:
+            print(f"Error processing row {idx}: {e}")
+
+    valid_indices = [i for i, val in enumerate(durations) if val is not None]
+    filtered_dates = [dates[i] for i in valid_indices]
+    filtered_durations = [durations[i] for i in valid_indices]
+
+    normalized_durations = []
+    if filtered_durations:
+        max_duration = max(filtered_durations)
+        normalized_durations = [d / max_duration for d in filtered_durations]
+
+    return filtered_dates, filtered_durations, normalized_durations
+
+
+def assert_same(new, old):
+    dates, values, normalized = new
+    old_dates, old_values, old_normalized = old
+    assert np.array_equal(dates, np.array(old_dates, dtype='datetime64[ns]'))
+    assert np.array_equal(values, np.array(old_values, dtype=float), equal_nan=True)
+    assert np.array_equal(normalized, np.array(old_normalized, dtype=float), equal_nan=True)
+
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    gen = ChartGenerator(None)
+    print(f"{'rows':>10} {'chart':>9} {'legacy, s':>10} {'vector, s':>10} {'speedup':>8}")
+    for rows in SIZES:
+        df = synthetic_frame(rows)
+        for name, new_func, old_func in [
+            ('interval', gen._prepare_interval_data, legacy_prepare_interval_data),
+            ('duration', gen._prepare_duration_data, legacy_prepare_duration_data),
+        ]:
+            new, new_time = timed(new_func, df)
+            old, old_time = timed(old_func, df)
+            assert_same(new, old)
+            print(f"{rows:>10} {name:>9} {old_time:>10.3f} {new_time:>10.3f} {old_time / new_time:>7.0f}x")
@@ -0,0 +1,125 @@
+"""
+Correctness corpus and throughput of utils.date_parser.
+
+Checks every example (the formats from the /add_action prompt and the old
+commented-out test_date_parser cases) against its expected result, then
+reports parses per second for the fast path, the cached path and the
+dateutil fallback.
+
+Run from the project root:
+    python -m benchmarks.bench_date_parser
+"""
+import sys
+import time
+
+from utils.date_parser import (
+    _parse_cached, _parse_fuzzy, format_datetime_for_csv, parse_strict_date,
+    parse_strict_time, parse_user_datetime, split_date_time,
+)
+
+DATE_EXAMPLES = {
+    "25 12 2023": "2023-12-25",
+    "25/12/2023": "2023-12-25",
+    "25.12.2023": "2023-12-25",
+    "25-12-2023": "2023-12-25",
+    "25/12/23": "2023-12-25",
+    "25.12-2023": "2023-12-25",
+}
+
+TIME_EXAMPLES = {
+    "14:30": "14:30",
+    "14.30": "14:30",
+    "14 30": "14:30",
+    "2:30 pm": "14:30",
+    "2:30 вечера": "14:30",
+    "2:30PM": "14:30",
+    "12 дня": "12:00",
+    "7 утра": "07:00",
+    "23:05": "23:05",
+    "9": "09:00",
+}
+
+SPLIT_EXAMPLES = {
+    "25.12.2023 14:30": ("25.12.2023", "14:30"),
+    "25/12/2023 в 14.30": ("25/12/2023", "в 14.30"),
+    "25-12-2023 примерно 2:30 вечера": ("25-12-2023", "примерно 2:30 вечера"),
+    "25.12.23 7 утра": ("25.12.23", "7 утра"),
+}
+
+DATETIME_EXAMPLES = {
+    "25.12.2023 14:30": "2023-12-25 14:30",
+    "25/12/2023 в 2 часа дня": "2023-12-25 14:00",
+    "25-12-2023 примерно 2:30 вечера": "2023-12-25 14:30",
+    "25.12.23 7 утра": "2023-12-25 07:00",
+    "25/12/2023 в 14.30": "2023-12-25 14:30",
+    "25 12 2023 14 30": "2023-12-25 14:30",
+    "25.12.2023 12 дня": "2023-12-25 12:00",
+    "25.12.2023 12 ночи": "2023-12-25 00:00",
+    "25.12.2023 2 ночи": "2023-12-25 02:00",
+    "25.12.2023 11 ночи": "2023-12-25 23:00",
+    "2:30PM 25.12.2023": "2023-12-25 14:30",
+    "14.30 25.12.23": "2023-12-25 14:30",
+    "05.12.2023": "2023-12-05 00:00",
+    "  31.07.2025 03:20  ": "2025-07-31 03:20",
+    "December 5 2023 3pm": "2023-12-05 15:00",
+    "неправильный формат": None,
+    "в 5": None,
+    "abc 3": None,
+    "30.02.2023 10:00": None,
+    "25.12.2023 25:00": None,
+    "": None,
+}
+
+# Inputs the single-pass tokenizer handles, and inputs that fall back to dateutil
+FAST_INPUTS = list(DATETIME_EXAMPLES)[:14]
+FUZZY_INPUTS = ["December 5 2023 3pm", "в 5"]
+
+
+def check():
+    failures = []
+
+    def expect(name, text, got, expected):
+        if got != expected:
+            failures.append(f"{name}({text!r}) -> {got!r}, expected {expected!r}")
+
+    for text, expected in DATE_EXAMPLES.items():
+        expect("parse_strict_date", text, parse_strict_date(text).strftime("%Y-%m-%d"), expected)
+    for text, expected in TIME_EXAMPLES.items():
+        expect("parse_strict_time", text, parse_strict_time(text), expected)
+    for text, expected in SPLIT_EXAMPLES.items():
+        expect("split_date_time", text, split_date_time(text), expected)
+    for text, expected in DATETIME_EXAMPLES.items():
+        result = parse_user_datetime(text)
+        expect("parse_user_datetime", text, result and format_datetime_for_csv(result), expected)
+
+    total = len(DATE_EXAMPLES) + len(TIME_EXAMPLES) + len(SPLIT_EXAMPLES) + len(DATETIME_EXAMPLES)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"corpus: {total - len(failures)}/{total} ok")
+    return not failures
+
+
+def rate(func, inputs, seconds=1.0):
+    """Parses per second of `func` over `inputs`, repeated for about `seconds`"""
+    count = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        for text in inputs:
+            func(text)
+        count += len(inputs)
+    return count / (time.perf_counter() - t0)
+
+
+def main():
+    ok = check()
+
+    uncached = _parse_cached.__wrapped__
+    _parse_cached.cache_clear()
+    print(f"fast path (uncached): {rate(uncached, FAST_INPUTS):>12,.0f} parses/s")
+    print(f"cached:               {rate(parse_user_datetime, FAST_INPUTS):>12,.0f} parses/s")
+    print(f"dateutil fallback:    {rate(_parse_fuzzy, FUZZY_INPUTS):>12,.0f} parses/s")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
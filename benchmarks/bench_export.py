@@ -0,0 +1,88 @@
+"""
+Exporting a large seizure log through /send_file in every format.
+
+For each format the script measures the first request for a data version
+(the file is built in a thread and cached) and a repeat request for the
+same version (served from the cache; in the bot, Telegram's file_id is
+then reused and nothing is uploaded). Several concurrent requests right
+after a change share one build. An append bumps the data version, so the
+next request builds the file again.
+
+The XLSX and Parquet files are read back and checked: row count, typed
+dates and durations, and the XLSX loads through /import's parser with
+every row accepted.
+
+Run from the project root:
+    python -m benchmarks.bench_export
+"""
+import asyncio
+import io
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from benchmarks.synthetic_logs import write_seizure_log
+from services.csv_manager import CSVManager
+from services.export_cache import export_cache
+from services.log_export import available_formats, get_export
+from services.metrics import export_build_seconds
+from services.seizure_import import parse_upload
+
+ROWS = 100_000
+CONCURRENT = 5
+
+
+def check(export_format, data):
+    if export_format == 'parquet':
+        table = pd.read_parquet(io.BytesIO(data))
+        assert len(table) == ROWS and table["Дата и время"].notna().all()
+        assert str(table["Дата и время"].dtype) == 'datetime64[ns]' and table["Продолж-сть, сек"].dtype == float
+    elif export_format == 'xlsx':
+        rows, report = parse_upload(data, "seizure.xlsx")
+        assert report['valid'] == ROWS and not report['rejected'], report
+
+
+async def timed_export(manager, export_format):
+    t0 = time.perf_counter()
+    key, entry = await get_export(manager, manager.csv_path, export_format)
+    return entry, time.perf_counter() - t0
+
+
+async def bench(manager, last):
+    raw = os.path.getsize(manager.csv_path)
+    print(f"{ROWS} seizures, CSV log {raw / 1e6:.1f} MB")
+    for export_format in available_formats():
+        entry, cold = await timed_export(manager, export_format)
+        _, hot = await timed_export(manager, export_format)
+        size = raw if entry['data'] is None else len(entry['data'])
+        check(export_format, entry['data'])
+        print(f"  {export_format:<8} first request {cold * 1e3:8.1f} ms, cached {hot * 1e3:6.3f} ms, "
+              f"{size / 1e6:5.2f} MB")
+
+    # Plain CSV is streamed from the log, never built
+    for export_format in [name for name in available_formats() if name != 'csv']:
+        manager.add_seizure_record((last + timedelta(days=1)).strftime("%Y-%m-%d %H:%M"), "30 сек")
+        last += timedelta(days=1)
+        builds = export_build_seconds.count(export_format)
+        t0 = time.perf_counter()
+        await asyncio.gather(*(timed_export(manager, export_format) for _ in range(CONCURRENT)))
+        elapsed = time.perf_counter() - t0
+        builds = export_build_seconds.count(export_format) - builds
+        assert builds == 1, f"{builds} builds for one version"
+        print(f"  {export_format:<8} after an append, {CONCURRENT} concurrent requests: "
+              f"{elapsed * 1e3:8.1f} ms, {builds} build")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "seizure.csv")
+        last = write_seizure_log(path, ROWS)
+        export_cache.clear()
+        asyncio.run(bench(CSVManager(path), pd.Timestamp(last)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Bulk import of an uploaded seizure table into an existing log.
+
+Uploads of 100k rows in three shapes go through the same path as the
+import handler, parse_upload then import_seizures, for both storage
+backends:
+- the bot's own CSV export (month-first dates, parsed vectorized);
+- a ';'-separated cp1251 spreadsheet with day-first dates typed by hand;
+- XLSX with date/time cells (only when openpyxl is installed).
+
+Each import is checked: row count, no repeated timestamps, № numbered 1..n,
+and a second import of the same file adds nothing. For comparison, the
+same rows are also added one at a time with add_seizure_record, as
+backfilling through the bot's dialog does (measured on a sample and
+extrapolated).
+
+Run from the project root:
+    python -m benchmarks.bench_import
+"""
+import io
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.synthetic_logs import seizure_frame, write_seizure_log
+from services.csv_manager import CSVManager
+from services.seizure_import import parse_upload
+from services.sqlite_manager import SQLiteManager
+
+EXISTING_ROWS = 10_000
+UPLOAD_ROWS = 100_000
+ONE_BY_ONE_SAMPLE = 2_000
+NOW = datetime(2030, 1, 1)
+
+
+def export_upload(frame):
+    buf = io.StringIO()
+    buf.write("Судорожные приступы,,,,,\n")
+    frame.to_csv(buf, index=False)
+    return buf.getvalue().encode('utf-8'), "seizure.csv"
+
+
+def typed_upload(frame):
+    """Day-first dates with dots, ';' separator, cp1251, as Excel saves it on a Russian Windows"""
+    stamps = pd.to_datetime(frame['Дата'], format="%m/%d/%Y")
+    typed = pd.DataFrame({
+        "Дата": stamps.dt.strftime("%d.%m.%Y"),
+        "Время": frame['Время'],
+        "Продолжительность": frame['Продолж-сть'],
+        "Комментарий": frame['Комментарии'],
+    })
+    return typed.to_csv(index=False, sep=';').encode('cp1251'), "history.csv"
+
+
+def xlsx_upload(frame):
+    try:
+        import openpyxl
+    except ImportError:
+        return None
+    stamps = pd.to_datetime(frame['Дата'] + " " + frame['Время'], format="%m/%d/%Y %H:%M")
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(["Дата", "Время", "Продолж-сть", "Комментарии"])
+    for stamp, duration, comment in zip(stamps, frame['Продолж-сть'], frame['Комментарии']):
+        sheet.append([stamp.to_pydatetime().replace(hour=0, minute=0), stamp.time(), duration, comment])
+    buf = io.BytesIO()
+    workbook.save(buf)
+    return buf.getvalue(), "history.xlsx"
+
+
+def check(manager, expected_rows, rows):
+    df = manager.get_data()
+    assert len(df) == expected_rows, f"{len(df)} rows, expected {expected_rows}"
+    assert list(df['№']) == list(range(1, expected_rows + 1)), "№ not renumbered 1..n"
+    stamps = pd.to_datetime(df['Дата'] + " " + df['Время'], format="%m/%d/%Y %H:%M")
+    assert stamps.is_unique and stamps.is_monotonic_increasing
+    assert manager.import_seizures(rows) == (0, len(rows)), "second import added rows"
+
+
+def bench(tmp, name, upload):
+    data, filename = upload
+    t0 = time.perf_counter()
+    rows, report = parse_upload(data, filename, NOW)
+    parse = time.perf_counter() - t0
+    assert report['rows'] == UPLOAD_ROWS and not report['rejected'], report
+
+    results = []
+    for backend in ("csv", "sqlite"):
+        log = os.path.join(tmp, f"{name}.csv")
+        write_seizure_log(log, EXISTING_ROWS)
+        manager = CSVManager(log)
+        if backend == "sqlite":
+            manager = SQLiteManager(os.path.join(tmp, f"{name}.sqlite3"))
+            manager.migrate_from_csv(log)
+        manager.get_statistics()
+
+        t0 = time.perf_counter()
+        added, known = manager.import_seizures(rows)
+        write = time.perf_counter() - t0
+        check(manager, EXISTING_ROWS + added, rows)
+        results.append(f"{backend} {write:.2f} s")
+    mb = len(data) / 1e6
+    print(f"  {name:<7} {mb:5.1f} MB  parse {parse:.2f} s  merge+write: {', '.join(results)}  "
+          f"({added} added, {known} already in the log)")
+
+
+def bench_one_by_one(tmp, frame):
+    log = os.path.join(tmp, "one_by_one.csv")
+    write_seizure_log(log, EXISTING_ROWS)
+    manager = CSVManager(log)
+    stamps = pd.to_datetime(frame['Дата'] + " " + frame['Время'], format="%m/%d/%Y %H:%M")
+    # Appends after the existing log, the cheapest case for the one-at-a-time path
+    stamps = stamps + (pd.Timestamp(2030, 1, 1) - stamps.min())
+    t0 = time.perf_counter()
+    for stamp in stamps[:ONE_BY_ONE_SAMPLE]:
+        manager.add_seizure_record(stamp.strftime("%Y-%m-%d %H:%M"), "30 сек")
+    per_row = (time.perf_counter() - t0) / ONE_BY_ONE_SAMPLE
+    print(f"  one add_seizure_record per row: {per_row * 1e3:.2f} ms/row, "
+          f"~{per_row * UPLOAD_ROWS:.1f} s for {UPLOAD_ROWS} rows (writes only, no dialog)")
+
+
+def main():
+    frame = seizure_frame(UPLOAD_ROWS, seed=1)
+    print(f"{UPLOAD_ROWS} uploaded rows into a {EXISTING_ROWS}-row log")
+    with tempfile.TemporaryDirectory() as tmp:
+        uploads = {"export": export_upload(frame), "typed": typed_upload(frame), "xlsx": xlsx_upload(frame)}
+        for name, upload in uploads.items():
+            if upload is None:
+                print(f"  {name:<7} skipped: openpyxl is not installed")
+                continue
+            bench(tmp, name, upload)
+        bench_one_by_one(tmp, frame)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Cost of the metrics middlewares: the same text-message update is fed through
+a Dispatcher with and without them, then the /metrics endpoint is scraped
+once to check the exposition output.
+
+Run from the project root:
+    python -m benchmarks.bench_metrics
+"""
+import asyncio
+import socket
+import time
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Update
+from aiohttp import ClientSession
+
+from benchmarks.fake_bot_api import text_update
+from middlewares.metrics import setup_metrics
+from services.metrics import metrics, start_metrics_server
+
+UPDATES = 20_000
+ROUNDS = 5
+
+
+def make_dispatcher(with_metrics):
+    router = Router()
+
+    @router.message()
+    async def echo_handler(message):
+        return None
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    if with_metrics:
+        setup_metrics(dp)
+    return dp
+
+
+async def per_update_us(dispatchers, bot, update):
+    """Best µs/update of each dispatcher; rounds alternate so warm-up and noise hit both"""
+    best = [float("inf")] * len(dispatchers)
+    for _ in range(ROUNDS):
+        for i, dp in enumerate(dispatchers):
+            t0 = time.perf_counter()
+            for _ in range(UPDATES):
+                await dp.feed_update(bot, update)
+            best[i] = min(best[i], (time.perf_counter() - t0) / UPDATES * 1e6)
+    return best
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def main():
+    bot = Bot(token="1:bench")
+    update = Update.model_validate(text_update(1, "hello"), context={"bot": bot})
+
+    plain, instrumented = await per_update_us([make_dispatcher(False), make_dispatcher(True)], bot, update)
+    print(f"{UPDATES} updates x {ROUNDS} rounds, best round")
+    print(f"  without metrics   {plain:7.1f} µs/update")
+    print(f"  with metrics      {instrumented:7.1f} µs/update  (+{instrumented - plain:.1f} µs)")
+
+    t0 = time.perf_counter()
+    text = metrics.render()
+    print(f"  render /metrics   {(time.perf_counter() - t0) * 1000:7.2f} ms, {len(text.splitlines())} lines")
+
+    port = free_port()
+    runner = await start_metrics_server("127.0.0.1", port)
+    try:
+        async with ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                body = await response.text()
+    finally:
+        await runner.cleanup()
+        await bot.session.close()
+    assert 'echo_handler"}' in body and "bot_handler_seconds_count" in body, body
+    assert 'bot_updates_total{event_type="message"}' in body, body
+    print("  GET /metrics      ok, handler and update series present")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
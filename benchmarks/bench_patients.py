@@ -0,0 +1,87 @@
+"""
+Write throughput with many patients writing at once, each to its own
+partition, against the same number of writers sharing one partition (the
+single-patient layout). Writes go through the write queue the way handlers
+submit them, and every partition is checked for lost or misnumbered rows.
+
+Run from the project root:
+    python -m benchmarks.bench_patients [--backend csv|sqlite]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from services.patients import PatientRegistry
+from services.write_queue import WriteQueue
+
+PATIENT_COUNTS = [1, 2, 4, 8, 16]
+WRITES_PER_WRITER = 100
+
+
+def make_registry(root, count, backend):
+    config = {
+        f"p{i}": {"admins": {1000 + i: f"admin{i}"}, "data_dir": os.path.join(root, f"p{i}")}
+        for i in range(count)
+    }
+    return PatientRegistry(config, backend=backend)
+
+
+async def run(partitions, writers):
+    """`writers` concurrent writers, writer i using partitions[i % len(partitions)]"""
+    queue = WriteQueue()
+    start = datetime(2025, 1, 1)
+    latencies = []
+
+    async def writer(i):
+        patient = partitions[i % len(partitions)]
+        for j in range(WRITES_PER_WRITER):
+            dt = (start + timedelta(minutes=writers * j + i)).strftime("%Y-%m-%d %H:%M")
+            t0 = time.perf_counter()
+            ok, _ = await queue.submit(patient.storage, patient.storage.add_seizure_record, dt, "30 сек", f"w{i}")
+            latencies.append(time.perf_counter() - t0)
+            assert ok, "a seizure write failed"
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(writer(i) for i in range(writers)))
+    elapsed = time.perf_counter() - t0
+
+    expected = writers * WRITES_PER_WRITER // len(partitions)
+    for patient in partitions:
+        df = patient.storage.get_data()
+        assert len(df) == expected, f"{patient.id}: {len(df)} rows, expected {expected}"
+        assert sorted(df['№'].astype(int)) == list(range(1, expected + 1)), f"{patient.id}: duplicate or missing №"
+
+    latencies.sort()
+    return {
+        "writes_per_s": writers * WRITES_PER_WRITER / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["csv", "sqlite"], default="csv")
+    args = parser.parse_args()
+
+    # Untimed run: imports pandas and the storage modules
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(make_registry(tmp, 1, args.backend).all(), 1))
+
+    print(f"{args.backend}, {WRITES_PER_WRITER} writes per writer, {os.cpu_count()} CPU(s)")
+    print(f"{'writers':>8} {'layout':>12} {'writes/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for count in PATIENT_COUNTS:
+        for layout in ("partitioned", "shared"):
+            with tempfile.TemporaryDirectory() as tmp:
+                registry = make_registry(tmp, count if layout == "partitioned" else 1, args.backend)
+                result = asyncio.run(run(registry.all(), count))
+            print(f"{count:>8} {layout:>12} {result['writes_per_s']:>10.0f} "
+                  f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
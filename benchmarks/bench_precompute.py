@@ -0,0 +1,128 @@
+"""
+Background precomputation of charts and statistics after a write.
+
+For a large synthetic log, with the chart pool warmed up, the script measures
+the "Отправить визуализацию" press (both charts through chart_pool.get_chart)
+and /stats right after a seizure is edited:
+  - without precomputation: the press renders both charts, /stats reparses
+    the rewritten log
+  - with services.precompute: the press and /stats come from the rebuilt
+    cache and statistics
+It also checks that a burst of writes gives a single rebuild (debounce) and
+that stop() cancels a rebuild that is pending or running, leaving no task
+behind.
+
+Run from the project root:
+    python -m benchmarks.bench_precompute
+"""
+import asyncio
+import tempfile
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from benchmarks.synthetic_logs import write_seizure_log
+from services import chart_pool
+from services.metrics import chart_render_seconds, precompute_seconds
+from services.patients import PatientRegistry
+from services.precompute import CHART_TYPES, Precomputer
+
+ROWS = 100_000
+DELAY = 0.2
+BURST = 10
+
+
+async def press(patient):
+    """The charts and statistics the bot sends for the plain buttons, timed"""
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        chart_pool.get_chart(patient.seizure_data_path, chart_type, period=None, start=None, end=None,
+                             treatments=None)
+        for chart_type in CHART_TYPES
+    ))
+    charts = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    await asyncio.to_thread(patient.storage.get_statistics)
+    return charts, time.perf_counter() - t0
+
+
+async def edit(patient, when):
+    """Change a seizure in the middle of the log: a full rewrite, statistics start over"""
+    return await asyncio.to_thread(patient.storage.update_seizure_record, when, comment="исправлено")
+
+
+def renders():
+    return sum(chart_render_seconds.count(chart_type) for chart_type in CHART_TYPES)
+
+
+async def wait_rebuilds(count, timeout=120):
+    deadline = time.monotonic() + timeout
+    while precompute_seconds.count("seizures") < count:
+        assert time.monotonic() < deadline, "precompute did not run"
+        await asyncio.sleep(0.01)
+
+
+async def main(registry, when, last):
+    patient = registry.get("bench")
+    await chart_pool.warm_up(patient.seizure_data_path)
+    precomputer = Precomputer(registry, delay=DELAY)
+    try:
+        await press(patient)
+        await edit(patient, when)
+        charts, stats = await press(patient)
+        print(f"press after an edit, no precompute:   charts {charts * 1e3:7.1f} ms, /stats {stats * 1e3:6.1f} ms")
+
+        precomputer.start()
+        await edit(patient, when)
+        await wait_rebuilds(1)
+        before = renders()
+        charts, stats = await press(patient)
+        assert renders() == before, "the press rendered a chart"
+        print(f"press after an edit, precomputed:     charts {charts * 1e3:7.1f} ms, /stats {stats * 1e3:6.1f} ms")
+
+        before, rebuilds = renders(), precompute_seconds.count("seizures")
+        for _ in range(BURST):
+            last += timedelta(days=1)
+            await asyncio.to_thread(patient.storage.add_seizure_record, last.strftime("%Y-%m-%d %H:%M"), "30 сек")
+        await wait_rebuilds(rebuilds + 1)
+        await asyncio.sleep(DELAY * 2)
+        assert precompute_seconds.count("seizures") == rebuilds + 1
+        print(f"{BURST} writes in a burst: {precompute_seconds.count('seizures') - rebuilds} rebuild, "
+              f"{renders() - before} chart renders")
+
+        await edit(patient, when)
+        await asyncio.sleep(DELAY / 2)
+        t0 = time.perf_counter()
+        await precomputer.stop()
+        print(f"stop() with a rebuild pending:   {(time.perf_counter() - t0) * 1e3:6.2f} ms")
+
+        precomputer.start()
+        await edit(patient, when)
+        await asyncio.sleep(DELAY + 0.05)
+        t0 = time.perf_counter()
+        await precomputer.stop()
+        print(f"stop() with a rebuild running:   {(time.perf_counter() - t0) * 1e3:6.2f} ms")
+        leftover = [task for task in asyncio.all_tasks()
+                    if task is not asyncio.current_task() and 'Precomputer' in repr(task.get_coro())]
+        assert not leftover, leftover
+    finally:
+        await precomputer.stop()
+        await chart_pool.drain()
+        chart_pool.shutdown()
+
+
+def run():
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = PatientRegistry({"bench": {"admins": {}, "data_dir": tmp}}, backend="csv")
+        patient = registry.get("bench")
+        last = pd.Timestamp(write_seizure_log(patient.seizure_data_path, ROWS))
+        log = pd.read_csv(patient.seizure_data_path, skiprows=1, nrows=ROWS // 2)
+        # A seizure from the middle of the log, 'YYYY-MM-DD HH:MM'
+        when = pd.to_datetime(log['Дата'].iloc[-1] + " " + log['Время'].iloc[-1], format="%m/%d/%Y %H:%M")
+        print(f"{ROWS} seizures, rebuild {DELAY} s after the last write")
+        asyncio.run(main(registry, when.strftime("%Y-%m-%d %H:%M"), last))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,84 @@
+"""
+Date-range lookups and cached range charts.
+
+Compares SeizureStore.positions_between (binary search on the sorted
+timestamp index) with a boolean filter over the whole timestamp column, then
+times a "last 30 days" chart rendered in the pool against serving it again
+from the chart cache.
+
+Run from the project root:
+    python -m benchmarks.bench_range
+"""
+import asyncio
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.synthetic_logs import write_seizure_log
+from services import chart_pool
+from services.seizure_store import get_seizure_store
+
+LOOKUP_ROWS = 1_000_000
+CHART_ROWS = 100_000
+LOOKUPS = 200
+
+
+def bench_lookup(path):
+    store = get_seizure_store(path)
+    timestamps = store.columns()['timestamp']
+    t0 = time.perf_counter()
+    store.positions_between(None, None)
+    build = time.perf_counter() - t0
+
+    last = timestamps.max().to_pydatetime()
+    start, end = last - timedelta(days=30), last + timedelta(days=1)
+
+    t0 = time.perf_counter()
+    for _ in range(LOOKUPS):
+        indexed = store.positions_between(start, end)
+    search = (time.perf_counter() - t0) / LOOKUPS
+
+    t0 = time.perf_counter()
+    for _ in range(LOOKUPS):
+        filtered = ((timestamps >= start) & (timestamps < end)).to_numpy().nonzero()[0]
+    scan = (time.perf_counter() - t0) / LOOKUPS
+
+    assert (indexed == filtered).all()
+    print(f"{LOOKUP_ROWS:,} rows, last 30 days ({len(indexed)} rows)")
+    print(f"  index build (once)   {build * 1000:>8.1f} ms")
+    print(f"  binary search        {search * 1000:>8.3f} ms")
+    print(f"  full-column filter   {scan * 1000:>8.3f} ms")
+
+
+async def bench_chart(path):
+    last = get_seizure_store(path).columns()['timestamp'].max().to_pydatetime()
+    params = dict(start=last - timedelta(days=30), end=last + timedelta(days=1))
+    await chart_pool.warm_up(path)
+
+    t0 = time.perf_counter()
+    await chart_pool.get_chart(path, 'interval', **params)
+    miss = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    await chart_pool.get_chart(path, 'interval', **params)
+    hit = time.perf_counter() - t0
+    chart_pool.shutdown()
+
+    print(f"{CHART_ROWS:,} rows, last-30-days interval chart")
+    print(f"  rendered in the pool {miss * 1000:>8.1f} ms")
+    print(f"  served from cache    {hit * 1000:>8.3f} ms")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "seizure_lookup.csv")
+        write_seizure_log(path, LOOKUP_ROWS)
+        bench_lookup(path)
+
+        path = os.path.join(tmp, "seizure_chart.csv")
+        write_seizure_log(path, CHART_ROWS)
+        asyncio.run(bench_chart(path))
+
+
+if __name__ == '__main__':
+    main()
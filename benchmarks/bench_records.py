@@ -0,0 +1,177 @@
+"""
+SeizureColumns and slotted records against the old DataFrame-backed store.
+
+The store used to keep the log as the frame pd.read_csv returns plus a typed
+frame (timestamp, seconds, interval, comment) and merged every appended row
+with pd.concat. It now keeps SeizureColumns: NumPy columns with the text
+cells dictionary-encoded, one slot written per appended record.
+
+Measured for a large synthetic log:
+  - memory held per 100k rows (tracemalloc)
+  - memory of one row as a slotted SeizureRecord, a plain dataclass and a dict
+  - load time of the whole log
+  - appending rows, in memory and through CSVManager.add_seizure_record
+    followed by a read, the way the bot does it
+
+Run from the project root:
+    python -m benchmarks.bench_records
+"""
+import gc
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import timedelta
+
+import pandas as pd
+
+from benchmarks.synthetic_logs import write_seizure_log
+from services.csv_manager import CSVManager
+from services.records import SeizureColumns, SeizureRecord
+from services.seizure_import import read_log_cells
+from services.seizure_store import parse_seconds, parse_timestamps
+
+ROWS = 100_000
+APPENDS = 200
+
+
+def legacy_load(path):
+    """SeizureStore._load plus build_columns before SeizureColumns"""
+    frame = pd.read_csv(path, skiprows=1)
+    return frame, legacy_columns(frame)
+
+
+def legacy_columns(frame):
+    return pd.DataFrame({
+        'timestamp': parse_timestamps(frame),
+        'seconds': parse_seconds(frame),
+        'interval_days': pd.to_numeric(frame['Интервал'], errors='coerce').astype(float),
+        'comment': frame['Комментарии'].fillna('').astype(str),
+    }, index=frame.index)
+
+
+def legacy_append(frame, columns, line):
+    """SeizureStore._flush_pending before SeizureColumns"""
+    appended = pd.read_csv(io.StringIO(line), header=None)
+    appended.columns = frame.columns
+    appended.index = pd.RangeIndex(len(frame), len(frame) + len(appended))
+    return pd.concat([frame, appended]), pd.concat([columns, legacy_columns(appended)])
+
+
+@dataclass
+class PlainRecord:
+    number: int | None
+    date: str
+    time: str
+    duration: str = ""
+    interval_days: float | None = None
+    comment: str = ""
+
+
+def retained(build):
+    """Bytes still allocated by build()'s result once it returns"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def record_size(record):
+    size = sys.getsizeof(record)
+    if hasattr(record, '__dict__'):
+        size += sys.getsizeof(record.__dict__)
+    return size
+
+
+def bench_memory(path):
+    per_100k = 100_000 / ROWS / 1e6
+    old = retained(lambda: legacy_load(path))
+    new = retained(lambda: SeizureColumns.from_frame(read_log_cells(path)))
+    print(f"memory per 100k rows: DataFrames {old * per_100k:6.1f} MB, "
+          f"SeizureColumns {new * per_100k:6.1f} MB ({old / new:.1f}x less)")
+
+    row = ["1", "1/6/1930", "11:20", "15 сек", "4", "Во сне"]
+    record = SeizureRecord.from_row(row)
+    sizes = {
+        "SeizureRecord (slots)": record_size(record),
+        "dataclass without slots": record_size(PlainRecord(1, *row[1:4], 4.0, row[5])),
+        "dict": sys.getsizeof(dict(zip(["№", "Дата", "Время", "Продолж-сть", "Интервал", "Комментарии"], row))),
+    }
+    print("one row, container only: " + ", ".join(f"{name} {size} B" for name, size in sizes.items()))
+
+
+def bench_load(path):
+    old = best_of(lambda: legacy_load(path))
+    new = best_of(lambda: SeizureColumns.from_frame(read_log_cells(path)))
+    print(f"load {ROWS} rows: DataFrames {old * 1e3:7.1f} ms, SeizureColumns {new * 1e3:7.1f} ms")
+
+
+def bench_append_in_memory(path, last):
+    lines, records = [], []
+    for i in range(APPENDS):
+        last += timedelta(days=1)
+        row = [ROWS + i + 1, f"{last.month}/{last.day}/{last.year}", last.strftime("%H:%M"), "30 сек", 1, ""]
+        lines.append(",".join(map(str, row)) + "\n")
+        records.append(SeizureRecord.from_row([str(cell) for cell in row]))
+
+    frame, columns = legacy_load(path)
+    t0 = time.perf_counter()
+    for line in lines:
+        frame, columns = legacy_append(frame, columns, line)
+    old = (time.perf_counter() - t0) / APPENDS
+
+    store = SeizureColumns.from_frame(read_log_cells(path))
+    t0 = time.perf_counter()
+    for record in records:
+        store.append(record)
+    new = (time.perf_counter() - t0) / APPENDS
+    print(f"append one row: pd.concat {old * 1e3:7.3f} ms, SeizureColumns.append {new * 1e6:6.1f} us "
+          f"({old / new:.0f}x)")
+
+
+def bench_append_end_to_end(path, last):
+    manager = CSVManager(path)
+    store = manager.store
+    store.statistics()
+    timings = {"statistics": [], "columns": []}
+    for read in timings:
+        for _ in range(APPENDS // 10):
+            last += timedelta(days=1)
+            t0 = time.perf_counter()
+            manager.add_seizure_record(last.strftime("%Y-%m-%d %H:%M"), "30 сек")
+            getattr(store, read)()
+            timings[read].append(time.perf_counter() - t0)
+    for read, values in timings.items():
+        print(f"add_seizure_record + {read}(): median {statistics.median(values) * 1e3:6.2f} ms")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "seizure.csv")
+        last = pd.Timestamp(write_seizure_log(path, ROWS))
+        print(f"{ROWS} seizures, CSV log {os.path.getsize(path) / 1e6:.1f} MB")
+        bench_memory(path)
+        bench_load(path)
+        bench_append_in_memory(path, last)
+        bench_append_end_to_end(path, last)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Event loop responsiveness while charts render: inline (old behaviour) vs the
+worker pool in services/chart_pool.py.
+
+A heartbeat task ticks every 10 ms, standing in for polling other users'
+updates; the worst delay between ticks is how long the bot was unresponsive.
+
+Run from the project root:
+    python -m benchmarks.bench_render_latency
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.bench_append import write_log
+from services import chart_pool
+from services.chart_generator import ChartGenerator
+
+ROWS = 20_000
+REQUESTS = 4
+TICK = 0.01
+
+
+async def heartbeat(lags, stop):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - t0 - TICK)
+
+
+async def measure(render):
+    lags = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    t0 = time.perf_counter()
+    await render()
+    total = time.perf_counter() - t0
+    stop.set()
+    await beat
+    return total, max(lags, default=0.0)
+
+
+async def main(path):
+    async def inline():
+        for _ in range(REQUESTS):
+            for chart_type in ('interval', 'duration'):
+                ChartGenerator(path).render(chart_type)
+                await asyncio.sleep(0)
+
+    async def pooled():
+        await asyncio.gather(*(
+            chart_pool.render_chart(path, chart_type)
+            for _ in range(REQUESTS) for chart_type in ('interval', 'duration')
+        ))
+
+    # Start the workers and let them load the log once, as after the first press
+    await pooled()
+
+    print(f"{REQUESTS * 2} renders of a {ROWS}-row log")
+    print(f"{'mode':>8} {'total, s':>9} {'worst loop stall, ms':>21}")
+    for name, render in [('inline', inline), ('pool', pooled)]:
+        total, worst = await measure(render)
+        print(f"{name:>8} {total:>9.2f} {worst * 1000:>21.1f}")
+    chart_pool.shutdown()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "seizure.csv")
+        write_log(csv_path, ROWS)
+        asyncio.run(main(csv_path))
@@ -0,0 +1,91 @@
+"""
+Concurrent requests for the same chart: checks that N simultaneous
+get_chart calls cause exactly one render in the pool (also when one of the
+waiters is cancelled), times them against N uncoalesced renders, and checks
+that repeated taps from one user pass the debouncer once, and a retry once
+the first request is done.
+
+Run from the project root:
+    python -m benchmarks.bench_single_flight
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic_logs import write_seizure_log
+from services import chart_pool
+from services.metrics import chart_render_seconds
+from utils.debounce import Debouncer
+
+ROWS = 100_000
+REQUESTS = 20
+
+
+async def coalesced(path, chart_type, period):
+    """REQUESTS identical get_chart calls at once; returns (seconds, renders)"""
+    renders = chart_render_seconds.count(chart_type)
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(chart_pool.get_chart(path, chart_type, period=period)
+                                     for _ in range(REQUESTS)))
+    elapsed = time.perf_counter() - t0
+    entries = {id(entry) for _, entry in results}
+    assert len(entries) == 1, f"{len(entries)} different cache entries"
+    return elapsed, chart_render_seconds.count(chart_type) - renders
+
+
+async def with_cancelled_waiter(path):
+    """The first waiter is cancelled mid-render; the others still get the one shared render"""
+    renders = chart_render_seconds.count('duration')
+    tasks = [asyncio.ensure_future(chart_pool.get_chart(path, 'duration', period='week'))
+             for _ in range(REQUESTS)]
+    await asyncio.sleep(0.05)
+    tasks[0].cancel()
+    results = await asyncio.gather(*tasks[1:])
+    assert all(entry['png'] for _, entry in results)
+    return chart_render_seconds.count('duration') - renders
+
+
+async def uncoalesced(path, chart_type, period):
+    """REQUESTS renders of the same chart, the way every tap rendered before"""
+    t0 = time.perf_counter()
+    await asyncio.gather(*(chart_pool.render_chart(path, chart_type, period=period)
+                           for _ in range(REQUESTS)))
+    return time.perf_counter() - t0
+
+
+async def main(path):
+    await chart_pool.warm_up(path)
+    try:
+        elapsed, renders = await coalesced(path, 'interval', None)
+        assert renders == 1, f"{REQUESTS} requests caused {renders} renders"
+        print(f"{REQUESTS} simultaneous requests, one chart: {renders} render, {elapsed:.2f} s")
+
+        renders = await with_cancelled_waiter(path)
+        assert renders == 1, f"{renders} renders with a cancelled waiter"
+        print(f"same with the first waiter cancelled:  {renders} render")
+
+        elapsed = await uncoalesced(path, 'interval', 'month')
+        print(f"{REQUESTS} separate renders (no coalescing):   {elapsed:.2f} s")
+    finally:
+        chart_pool.shutdown()
+
+
+def check_debounce():
+    debouncer = Debouncer(5)
+    taps = [debouncer.allow((1, "Отправить визуализацию"), now=t * 0.3) for t in range(10)]
+    assert taps == [True] + [False] * 9, taps
+    assert debouncer.allow((2, "Отправить визуализацию"), now=0.3), "another user was debounced"
+    assert debouncer.allow((1, "Отправить визуализацию"), now=5.0), "tap after the interval was dropped"
+    debouncer.done((1, "Отправить визуализацию"))
+    assert debouncer.allow((1, "Отправить визуализацию"), now=5.3), "retry after done() was dropped"
+    print("debounce: 10 taps in 3 s pass once, other users, later taps and retries after done() pass")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "seizure.csv")
+        write_seizure_log(path, ROWS)
+        print(f"{ROWS} seizures")
+        asyncio.run(main(path))
+    check_debounce()
@@ -0,0 +1,61 @@
+"""
+Time from launching `python bot_runner.py` until the bot answers its first
+update, against a local fake Bot API.
+
+"eager" preloads pandas, matplotlib and dateutil before starting the bot,
+which is what every start cost before these imports became lazy.
+
+Run from the project root:
+    python -m benchmarks.bench_startup
+"""
+import asyncio
+import os
+import signal
+import statistics
+import sys
+import time
+
+from benchmarks.fake_bot_api import FakeBotAPI, text_update
+
+RUNS = 3
+EAGER_IMPORTS = "import pandas, numpy, matplotlib.pyplot, dateutil.parser; "
+START_BOT = "import runpy; runpy.run_path('bot_runner.py', run_name='__main__')"
+
+
+async def time_to_first_update(preload):
+    api = FakeBotAPI()
+    url = await api.start()
+    api.push(text_update(1, "/start"))
+    env = dict(os.environ, TOKEN="123456:bench", TELEGRAM_API_URL=url, WARM_UP="1")
+
+    t0 = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", (EAGER_IMPORTS if preload else "") + START_BOT,
+        env=env, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+    )
+    try:
+        await api.wait_sent(1)
+        first_request = api.first_request_at - t0
+        first_reply = api.sent[0][0] - t0
+    finally:
+        proc.send_signal(signal.SIGINT)
+        try:
+            await asyncio.wait_for(proc.wait(), 10)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+        await api.stop()
+    return first_request, first_reply
+
+
+async def main():
+    print(f"{'mode':>6} {'first API call, s':>18} {'first reply, s':>15}")
+    for name, preload in [("eager", True), ("lazy", False)]:
+        results = [await time_to_first_update(preload) for _ in range(RUNS)]
+        first_request = statistics.median(r[0] for r in results)
+        first_reply = statistics.median(r[1] for r in results)
+        print(f"{name:>6} {first_request:>18.2f} {first_reply:>15.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+"""
+/stats latency against history length.
+
+For each size: the first get_statistics call (parses the log and builds the
+running aggregates), then the cost of append + get_statistics, which is
+what every /stats after a new seizure pays.
+
+Run from the project root:
+    python -m benchmarks.bench_stats
+"""
+import os
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.synthetic_logs import write_seizure_log
+from services.csv_manager import CSVManager
+
+SIZES = [1_000, 100_000, 1_000_000]
+ROUNDS = 50
+
+
+def bench(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "seizure.csv")
+        last = write_seizure_log(path, rows)
+        manager = CSVManager(path)
+
+        t0 = time.perf_counter()
+        manager.get_statistics()
+        build = time.perf_counter() - t0
+
+        appends, queries = [], []
+        for i in range(ROUNDS):
+            dt = last + timedelta(days=i + 1)
+            t0 = time.perf_counter()
+            manager.add_seizure_record(dt.strftime("%Y-%m-%d %H:%M"), "30 сек", "")
+            t1 = time.perf_counter()
+            stats = manager.get_statistics()
+            t2 = time.perf_counter()
+            appends.append(t1 - t0)
+            queries.append(t2 - t1)
+        assert stats["total_seizures"] == rows + ROUNDS
+        return build, statistics.median(appends), statistics.median(queries)
+
+
+def main():
+    print(f"{'rows':>10}  {'first call':>12}  {'append':>10}  {'stats':>10}")
+    for rows in SIZES:
+        build, append, query = bench(rows)
+        print(f"{rows:>10,}  {build * 1000:>9.1f} ms  {append * 1000:>7.3f} ms  {query * 1000:>7.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Storage and chart benchmarks on synthetic logs of growing size.
+
+For each size a seizure and a medicine log are generated (see
+benchmarks/synthetic_logs.py), then every operation runs in a fresh Python
+process so its wall time and peak RSS are not skewed by earlier runs.
+"first" is the call on a cold process (including parsing the log), "repeat"
+a second call in the same process.
+
+Run from the project root:
+    python -m benchmarks.bench_suite                      # 1k, 100k, 1M rows
+    python -m benchmarks.bench_suite --sizes 1000 -o before.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic_logs import write_medicine_log, write_seizure_log
+
+SIZES = [1_000, 100_000, 1_000_000]
+APPENDS = 20
+OPERATIONS = [
+    "add_seizure_record",
+    "get_data",
+    "get_statistics",
+    "generate_interval_chart",
+    "generate_duration_chart",
+    "add_medicine_record",
+    "get_medicine_data",
+]
+
+
+def peak_rss_mb():
+    # VmHWM is per process image; ru_maxrss on Linux keeps the parent's peak across fork/exec
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def timed(func):
+    t0 = time.perf_counter()
+    func()
+    return time.perf_counter() - t0
+
+
+def run_operation(operation, seizure_path, medicine_path):
+    """Run one operation in this process and return its measurements"""
+    if operation == "add_seizure_record":
+        from services.csv_manager import CSVManager
+
+        manager = CSVManager(seizure_path)
+        last = datetime.fromisoformat(os.environ["BENCH_LAST_SEIZURE"])
+        times = [
+            timed(lambda i=i: manager.add_seizure_record(
+                (last + timedelta(days=i + 1)).strftime("%Y-%m-%d %H:%M"), "30 сек", ""))
+            for i in range(APPENDS)
+        ]
+        return {"first_s": times[0], "repeat_s": sum(times[1:]) / (APPENDS - 1)}
+
+    if operation in ("add_medicine_record", "get_medicine_data"):
+        from services.medicine_manager import MedicineManager
+
+        manager = MedicineManager(medicine_path)
+        if operation == "add_medicine_record":
+            call = lambda: manager.add_medicine_record("1/1/2021", "Мелепсин 0,5")
+        else:
+            call = manager.get_medicine_data
+    elif operation in ("get_data", "get_statistics"):
+        from services.csv_manager import CSVManager
+
+        call = getattr(CSVManager(seizure_path), operation)
+    else:
+        from services.chart_generator import ChartGenerator
+
+        call = getattr(ChartGenerator(seizure_path), operation)
+
+    return {"first_s": timed(call), "repeat_s": timed(call)}
+
+
+def run_isolated(operation, rows, seizure_src, medicine_src, last_seizure, tmp):
+    """Run `operation` in a child process on private copies of the logs"""
+    seizure_path = os.path.join(tmp, "op_seizure.csv")
+    medicine_path = os.path.join(tmp, "op_medicine.csv")
+    shutil.copyfile(seizure_src, seizure_path)
+    shutil.copyfile(medicine_src, medicine_path)
+    env = dict(os.environ, BENCH_LAST_SEIZURE=last_seizure.isoformat())
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_suite", "--child", operation, seizure_path, medicine_path],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return {"operation": operation, "rows": rows, **result}
+
+
+def child_main(operation, seizure_path, medicine_path):
+    rss_before = peak_rss_mb()
+    t0 = time.perf_counter()
+    result = run_operation(operation, seizure_path, medicine_path)
+    result["wall_s"] = time.perf_counter() - t0
+    result["rss_before_mb"] = rss_before
+    result["peak_rss_mb"] = peak_rss_mb()
+    print(json.dumps(result))
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    arg_parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=OPERATIONS)
+    arg_parser.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    arg_parser.add_argument("--child", nargs=3, metavar=("OPERATION", "SEIZURE", "MEDICINE"),
+                            help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        child_main(*args.child)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            seizure_src = os.path.join(tmp, "seizure.csv")
+            medicine_src = os.path.join(tmp, "medicine.csv")
+            last_seizure = write_seizure_log(seizure_src, rows)
+            write_medicine_log(medicine_src, rows)
+            for operation in args.operations:
+                result = run_isolated(operation, rows, seizure_src, medicine_src, last_seizure, tmp)
+                results.append(result)
+                print(f"{rows:>9,} rows  {operation:<24} first {result['first_s'] * 1000:>9.1f} ms  "
+                      f"repeat {result['repeat_s'] * 1000:>9.1f} ms  peak RSS {result['peak_rss_mb']:>7.1f} MB",
+                      file=sys.stderr)
+
+    report = json.dumps({"environment": environment(), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
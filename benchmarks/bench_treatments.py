@@ -0,0 +1,78 @@
+"""
+Cost of the treatment overlay on the charts.
+
+Times building the treatment timeline (as-of merge of the medicine log onto
+the seizures) against a per-seizure lookup, the cached timeline, and a chart
+rendered with and without the overlay.
+
+Run from the project root:
+    python -m benchmarks.bench_treatments
+"""
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic_logs import write_medicine_log, write_seizure_log
+from services.chart_generator import ChartGenerator
+from services.seizure_store import get_seizure_store
+from services.treatment_timeline import build_treatment_timeline
+
+SIZES = [10_000, 1_000_000]
+MEDICINE_ROWS = 30
+PER_ROW_LIMIT = 10_000
+
+
+def per_row_counts(columns, medicine):
+    """Seizures per treatment period, looked up one seizure at a time"""
+    starts = sorted(pd.to_datetime(medicine['Дата'], format="%m/%d/%Y"))
+    counts = [0] * len(starts)
+    for timestamp in columns['timestamp'].dropna():
+        current = None
+        for i, start in enumerate(starts):
+            if start <= timestamp:
+                current = i
+        if current is not None:
+            counts[current] += 1
+    return counts
+
+
+def timed(func):
+    t0 = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        medicine_path = os.path.join(tmp, "medicine.csv")
+        write_medicine_log(medicine_path, MEDICINE_ROWS)
+        medicine = pd.read_csv(medicine_path)
+        for rows in SIZES:
+            path = os.path.join(tmp, f"seizure_{rows}.csv")
+            write_seizure_log(path, rows)
+            store = get_seizure_store(path)
+            columns = store.columns()
+            print(f"{rows:,} seizures, {MEDICINE_ROWS} treatment changes")
+
+            timeline, merge = timed(lambda: build_treatment_timeline(columns, medicine))
+            print(f"  as-of merge            {merge * 1000:>9.1f} ms")
+            if rows <= PER_ROW_LIMIT:
+                counts, lookup = timed(lambda: per_row_counts(columns, medicine))
+                assert counts == timeline['seizures'].tolist()
+                print(f"  per-row lookup         {lookup * 1000:>9.1f} ms")
+
+            store.treatment_timeline(medicine_path)
+            _, cached = timed(lambda: store.treatment_timeline(medicine_path))
+            print(f"  cached timeline        {cached * 1000:>9.3f} ms")
+
+            generator = ChartGenerator(path)
+            _, plain = timed(lambda: generator.render('interval', period='month'))
+            _, overlay = timed(lambda: generator.render('interval', period='month', treatments=medicine_path))
+            print(f"  monthly chart          {plain * 1000:>9.1f} ms")
+            print(f"  with treatment overlay {overlay * 1000:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
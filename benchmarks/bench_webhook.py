@@ -0,0 +1,117 @@
+"""
+Update throughput of long polling vs webhook mode (1 and 4 workers) against
+a local fake Bot API. Every update is a /start message, so the numbers show
+transport and dispatch overhead rather than handler work.
+
+Run from the project root:
+    python -m benchmarks.bench_webhook
+"""
+import asyncio
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+from benchmarks.fake_bot_api import FakeBotAPI, text_update
+
+UPDATES = 2000
+CONCURRENCY = 64
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def start_bot(api, tmp, mode, workers=1, port=None):
+    env = dict(
+        os.environ, TOKEN="123456:bench", TELEGRAM_API_URL=api.base_url, WARM_UP="0",
+        BOT_MODE=mode, WEBHOOK_URL=f"http://127.0.0.1:{port}", PORT=str(port or 0),
+        WEBHOOK_WORKERS=str(workers), FSM_STORAGE="sqlite",
+        FSM_SQLITE_PATH=os.path.join(tmp, f"fsm-{mode}-{workers}.sqlite3"),
+    )
+    return await asyncio.create_subprocess_exec(
+        sys.executable, "bot_runner.py", env=env,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+async def stop_bot(proc):
+    # Signal the whole process group so webhook workers stop too
+    os.killpg(proc.pid, signal.SIGINT)
+    try:
+        await asyncio.wait_for(proc.wait(), 10)
+    except asyncio.TimeoutError:
+        os.killpg(proc.pid, signal.SIGKILL)
+        await proc.wait()
+
+
+async def bench_polling(tmp):
+    api = FakeBotAPI()
+    await api.start()
+    proc = await start_bot(api, tmp, "polling")
+    try:
+        await api.wait_call("getupdates")
+        t0 = time.perf_counter()
+        api.push(*(text_update(i + 1, "/start") for i in range(UPDATES)))
+        await api.wait_sent(UPDATES)
+        return UPDATES / (time.perf_counter() - t0)
+    finally:
+        await stop_bot(proc)
+        await api.stop()
+
+
+async def bench_webhook(tmp, workers):
+    api = FakeBotAPI()
+    await api.start()
+    port = free_port()
+    proc = await start_bot(api, tmp, "webhook", workers, port)
+    url = f"http://127.0.0.1:{port}/webhook"
+    try:
+        async with aiohttp.ClientSession() as session:
+            # Wait until the server answers, then give every worker time to bind
+            while True:
+                try:
+                    async with session.post(url, json=text_update(0, "/start")):
+                        break
+                except aiohttp.ClientError:
+                    await asyncio.sleep(0.2)
+            await api.wait_sent(1)
+            await asyncio.sleep(5 if workers > 1 else 0)
+            sent_before = len(api.sent)
+
+            semaphore = asyncio.Semaphore(CONCURRENCY)
+
+            async def post(i):
+                async with semaphore:
+                    async with session.post(url, json=text_update(i + 1, "/start")) as response:
+                        assert response.status == 200
+
+            t0 = time.perf_counter()
+            await asyncio.gather(*(post(i) for i in range(UPDATES)))
+            await api.wait_sent(sent_before + UPDATES)
+            return UPDATES / (time.perf_counter() - t0)
+    finally:
+        await stop_bot(proc)
+        await api.stop()
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [("polling", await bench_polling(tmp))]
+        for workers in (1, 4):
+            results.append((f"webhook x{workers}", await bench_webhook(tmp, workers)))
+    print(f"{UPDATES} updates")
+    print(f"{'mode':>12} {'updates/s':>10}")
+    for name, rate in results:
+        print(f"{name:>12} {rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Minimal local stand-in for the Telegram Bot API, enough for the bot to start
+polling, receive queued updates and answer them. Point the bot at it with
+TELEGRAM_API_URL (see bot.py).
+"""
+import asyncio
+import time
+
+from aiohttp import web
+
+
+def text_update(update_id, text, user_id=5460055491):
+    """A private-chat text message update from `user_id` (an admin by default)"""
+    user = {"id": user_id, "is_bot": False, "first_name": "Bench"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": user,
+            "text": text,
+        },
+    }
+
+
+class FakeBotAPI:
+    def __init__(self):
+        self.updates = []
+        self.sent = []
+        self.first_request_at = None
+        self.calls = {}
+        self._new_updates = asyncio.Event()
+        self._sent_event = asyncio.Event()
+        self._runner = None
+        self.base_url = None
+
+    def push(self, *updates):
+        self.updates.extend(updates)
+        self._new_updates.set()
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def wait_sent(self, count, timeout=60):
+        """Wait until the bot has sent `count` messages"""
+        async def wait():
+            while len(self.sent) < count:
+                self._sent_event.clear()
+                await self._sent_event.wait()
+        await asyncio.wait_for(wait(), timeout)
+
+    async def wait_call(self, method, timeout=60):
+        """Wait until the bot has called `method` (lower case) at least once"""
+        async def wait():
+            while not self.calls.get(method):
+                await asyncio.sleep(0.05)
+        await asyncio.wait_for(wait(), timeout)
+
+    async def _handle(self, request):
+        if self.first_request_at is None:
+            self.first_request_at = time.perf_counter()
+        method = request.match_info["method"].lower()
+        self.calls[method] = self.calls.get(method, 0) + 1
+        params = dict(await request.post())
+        result = await getattr(self, f"_{method}", self._default)(params)
+        return web.json_response({"ok": True, "result": result})
+
+    async def _default(self, params):
+        return True
+
+    async def _getme(self, params):
+        return {"id": 1, "is_bot": True, "first_name": "bench", "username": "bench_bot"}
+
+    async def _getupdates(self, params):
+        offset = int(params.get("offset", 0) or 0)
+        timeout = min(float(params.get("timeout", 0) or 0), 1.0)
+        pending = [u for u in self.updates if u["update_id"] >= offset]
+        if not pending and timeout:
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(self._new_updates.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            pending = [u for u in self.updates if u["update_id"] >= offset]
+        return pending[:100]
+
+    async def _sendmessage(self, params):
+        self.sent.append((time.perf_counter(), params))
+        self._sent_event.set()
+        chat_id = int(params.get("chat_id", 0))
+        return {
+            "message_id": len(self.sent),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": params.get("text", ""),
+        }
+
+    async def _setwebhook(self, params):
+        self.webhook = params.get("url")
+        return True
+
+    async def _getwebhookinfo(self, params):
+        return {"url": getattr(self, "webhook", ""), "has_custom_certificate": False,
+                "pending_update_count": 0}
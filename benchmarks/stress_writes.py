@@ -0,0 +1,69 @@
+"""
+Fire hundreds of concurrent seizure/medicine submissions through the write
+queue, the way handlers do, and check that no row is lost or numbered twice.
+
+Run from the project root:
+    python -m benchmarks.stress_writes
+"""
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from services.csv_manager import CSVManager
+from services.medicine_manager import MedicineManager
+from services.sqlite_manager import SQLiteManager
+from services.write_queue import WriteQueue
+
+SUBMISSIONS = 500
+
+
+async def stress(seizures, medicine):
+    queue = WriteQueue()
+    start = datetime(2025, 1, 1)
+
+    async def add_seizure(i):
+        dt = (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M")
+        return await queue.submit(seizures, seizures.add_seizure_record, dt, "30 сек", f"#{i}")
+
+    async def add_medicine(i):
+        return await queue.submit(medicine, medicine.add_medicine_record, "01/01/2025", f"#{i}")
+
+    t0 = time.perf_counter()
+    results = await asyncio.gather(
+        *(add_seizure(i) for i in range(SUBMISSIONS)),
+        *(add_medicine(i) for i in range(SUBMISSIONS)),
+    )
+    elapsed = time.perf_counter() - t0
+
+    assert all(r[0] for r in results[:SUBMISSIONS]), "a seizure write failed"
+    assert all(results[SUBMISSIONS:]), "a medicine write failed"
+
+    df = seizures.get_data()
+    assert len(df) == SUBMISSIONS, f"{len(df)} seizure rows, expected {SUBMISSIONS}"
+    assert sorted(df['№']) == list(range(1, SUBMISSIONS + 1)), "duplicate or missing №"
+    assert set(df['Комментарии']) == {f"#{i}" for i in range(SUBMISSIONS)}
+    assert len(medicine.get_medicine_data()) == SUBMISSIONS
+    return elapsed
+
+
+def check_csv_on_disk(path):
+    df = pd.read_csv(path, skiprows=1)
+    assert len(df) == SUBMISSIONS and df['№'].is_unique
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        seizure_csv = os.path.join(tmp, "seizure.csv")
+        csv_time = asyncio.run(stress(CSVManager(seizure_csv),
+                                      MedicineManager(os.path.join(tmp, "medicine.csv"))))
+        check_csv_on_disk(seizure_csv)
+
+        sqlite = SQLiteManager(os.path.join(tmp, "seizure.sqlite3"))
+        sqlite_time = asyncio.run(stress(sqlite, sqlite))
+
+    print(f"{SUBMISSIONS} seizures + {SUBMISSIONS} medicine records submitted concurrently, none lost")
+    print(f"csv: {csv_time:.2f} s, sqlite: {sqlite_time:.2f} s")
@@ -0,0 +1,102 @@
+"""
+Realistic synthetic seizure and medicine logs for benchmarks.
+
+The files use exactly the layout the bot reads and writes: the seizure log
+has the "Судорожные приступы" title row above the header, dates are
+M/D/YYYY, times H:MM, durations "30 сек", intervals whole days with the
+first one blank. A few rows have blank durations and quoted comments with
+commas, like the real log.
+
+Generate files from the command line:
+    python -m benchmarks.synthetic_logs 100000 /tmp/seizure.csv /tmp/medicine.csv
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+SEIZURE_TITLE = "Судорожные приступы,,,,,\n"
+DURATIONS = ["15 сек", "20 сек", "30 сек", "40 сек"]
+DURATION_WEIGHTS = [0.05, 0.35, 0.55, 0.05]
+SEIZURE_COMMENTS = ["Длились чуть дольше", "Во сне", "После температуры, ночью"]
+MEDICINE_COMMENTS = [
+    "При приеме Мелепсина",
+    "Прием мелепсина 0,5/день",
+    "Мелепсин 0,5, ежедневно, без перерыва",
+    "Начато лечение фарингита",
+    "начали упр.Стрельникова",
+]
+# Keep any size inside datetime64 bounds: never more than ~90 years of history
+START = pd.Timestamp(1930, 1, 1)
+MAX_SPAN_MINUTES = 90 * 365 * 24 * 60
+MAX_MEAN_GAP_MINUTES = 45 * 24 * 60
+
+
+def _timestamps(rows, rng, mean_gap_cap=MAX_MEAN_GAP_MINUTES):
+    mean_gap = min(mean_gap_cap, MAX_SPAN_MINUTES / max(rows, 1))
+    gaps = rng.exponential(mean_gap, rows).astype('int64') + 1
+    return pd.Series(START + pd.to_timedelta(np.cumsum(gaps), unit='m'))
+
+
+def _format_dates(stamps):
+    return stamps.dt.month.astype(str) + '/' + stamps.dt.day.astype(str) + '/' + stamps.dt.year.astype(str)
+
+
+def _sprinkle(rng, rows, choices, share):
+    """Mostly empty strings, with `share` of the rows set to one of `choices`"""
+    values = np.full(rows, '', dtype=object)
+    picked = rng.random(rows) < share
+    values[picked] = rng.choice(choices, int(picked.sum()))
+    return values
+
+
+def seizure_frame(rows, seed=0):
+    """Seizure rows as the string columns the bot writes, oldest first"""
+    rng = np.random.default_rng(seed)
+    stamps = _timestamps(rows, rng)
+    # Logs written before intervals were stored as fractional days hold (dt - last_dt).days
+    minutes = stamps.values.astype('datetime64[m]').astype('int64')
+    intervals = (np.diff(minutes) // (24 * 60)).astype(str)
+    durations = rng.choice(DURATIONS, rows, p=DURATION_WEIGHTS).astype(object)
+    durations[rng.random(rows) < 0.01] = ''
+    return pd.DataFrame({
+        '№': np.arange(1, rows + 1),
+        'Дата': _format_dates(stamps),
+        'Время': stamps.dt.hour.astype(str) + ':' + stamps.dt.minute.map('{:02d}'.format),
+        'Продолж-сть': durations,
+        'Интервал': np.concatenate([[''], intervals]) if rows else [],
+        'Комментарии': _sprinkle(rng, rows, SEIZURE_COMMENTS, 0.02),
+    })
+
+
+def medicine_frame(rows, seed=0):
+    """Medicine rows ('Дата', 'Лечение/Комментарии'), oldest first"""
+    rng = np.random.default_rng(seed + 1)
+    stamps = _timestamps(rows, rng, mean_gap_cap=120 * 24 * 60)
+    return pd.DataFrame({
+        'Дата': _format_dates(stamps),
+        'Лечение/Комментарии': rng.choice(MEDICINE_COMMENTS, rows),
+    })
+
+
+def write_seizure_log(path, rows, seed=0):
+    """Write a seizure log with `rows` records; returns the last record's timestamp"""
+    frame = seizure_frame(rows, seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(SEIZURE_TITLE)
+        frame.to_csv(f, index=False, lineterminator='\n')
+    if not rows:
+        return None
+    return pd.Timestamp(f"{frame['Дата'].iloc[-1]} {frame['Время'].iloc[-1]}").to_pydatetime()
+
+
+def write_medicine_log(path, rows, seed=0):
+    """Write a medicine log with `rows` records"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        medicine_frame(rows, seed).to_csv(f, index=False, lineterminator='\n')
+
+
+if __name__ == '__main__':
+    rows, seizure_path, medicine_path = int(sys.argv[1]), sys.argv[2], sys.argv[3]
+    write_seizure_log(seizure_path, rows)
+    write_medicine_log(medicine_path, rows)
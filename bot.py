@@ -7,16 +7,22 @@ TOKEN = os.getenv('TOKEN')
 # print(TOKEN)
 # ---- CONFIG VARIABLES
 from config import path_to_csv, admin_json
+from services.fsm_storage import create_fsm_storage
 # ---- CONFIG VARIABLES
 
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-bot = Bot(token=TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
-dp = Dispatcher(storage=MemoryStorage())
+# Optional self-hosted (or fake, for benchmarks) Bot API server, e.g. http://localhost:8081
+API_URL = os.getenv('TELEGRAM_API_URL')
+session = AiohttpSession(api=TelegramAPIServer.from_base(API_URL)) if API_URL else None
+
+bot = Bot(token=TOKEN, session=session, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+dp = Dispatcher(storage=create_fsm_storage())
 
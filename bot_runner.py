@@ -1,26 +1,142 @@
 import asyncio
+import logging
+import multiprocessing
+from contextlib import suppress
 
 from bot import dp, bot
 
 from handlers.start_route import start_router
 from handlers.send_file import send_file_router
 from handlers.add_action import add_action_router
+from handlers.edit_action import edit_action_router
 from handlers.add_medicine import add_medicine_router
 from handlers.send_chart import send_chart_router
+from handlers.stats import stats_router
+from handlers.import_file import import_file_router
 from keyboards.kb import command_menu
+from middlewares.metrics import setup_metrics
+from services import chart_pool
+from services.metrics import start_metrics_server
+from services.patients import patients
+from services.precompute import precomputer
+from services.seizure_store import close_stores
+from config import (
+    warm_up_on_start, bot_mode, webhook_url, webhook_path, webhook_secret,
+    webhook_host, webhook_port, webhook_workers, fsm_storage, metrics_host, metrics_port,
+)
 
+logger = logging.getLogger(__name__)
 
-async def main():
+
+async def warm_up():
+    """Load the heavy parts in the background so the first chart/record is fast"""
+    try:
+        # Parses every patient's log and builds the running statistics behind /stats
+        partitions = await asyncio.to_thread(patients.all)
+        for patient in partitions:
+            await asyncio.to_thread(patient.storage.get_statistics)
+        if partitions:
+            await chart_pool.warm_up(partitions[0].seizure_data_path)
+    except Exception:
+        logger.exception("Warm-up failed")
+
+
+def setup_dispatcher():
+    """Register routers and startup/shutdown hooks; called once per process"""
+    warm_up_task = None
+    metrics_server = None
+
+    async def on_startup():
+        nonlocal warm_up_task, metrics_server
+        if warm_up_on_start:
+            warm_up_task = asyncio.create_task(warm_up())
+        # Re-render charts and statistics in the background after each write
+        precomputer.start()
+        if metrics_port:
+            try:
+                metrics_server = await start_metrics_server(metrics_host, metrics_port)
+            except OSError as e:
+                # Port taken, e.g. by another webhook worker that serves the metrics
+                logger.warning("Metrics server not started: %s", e)
+
+    async def on_shutdown():
+        if warm_up_task is not None:
+            warm_up_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await warm_up_task
+        await precomputer.stop()
+        if metrics_server is not None:
+            await metrics_server.cleanup()
+        # Renders started by the precomputer or by handlers outlive their callers (asyncio.shield)
+        await chart_pool.drain()
+        chart_pool.shutdown()
+        close_stores()
 
     dp.include_router(start_router)
     dp.include_router(send_file_router)
     dp.include_router(add_action_router)
+    dp.include_router(edit_action_router)
     dp.include_router(add_medicine_router)
     dp.include_router(send_chart_router)
+    dp.include_router(stats_router)
+    dp.include_router(import_file_router)
+    setup_metrics(dp)
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+
+
+async def main():
+    setup_dispatcher()
 
     await command_menu()
     await bot.delete_webhook(drop_pending_updates=True)
     await dp.start_polling(bot)
 
+
+def serve_webhook():
+    """Serve Telegram webhook requests; several processes can share the port"""
+    from aiohttp import web
+    from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+    setup_dispatcher()
+    app = web.Application()
+    SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=webhook_secret).register(app, path=webhook_path)
+    setup_application(app, dp, bot=bot)
+    web.run_app(app, host=webhook_host, port=webhook_port, reuse_port=webhook_workers > 1)
+
+
+async def set_webhook():
+    await command_menu()
+    await bot.set_webhook(
+        f"{webhook_url.rstrip('/')}{webhook_path}",
+        secret_token=webhook_secret,
+        drop_pending_updates=True,
+    )
+    await bot.session.close()
+
+
+def run_webhook():
+    if not webhook_url:
+        raise RuntimeError("BOT_MODE=webhook needs WEBHOOK_URL")
+    asyncio.run(set_webhook())
+
+    if webhook_workers > 1 and fsm_storage == "memory":
+        logger.warning("WEBHOOK_WORKERS > 1 with FSM_STORAGE=memory: conversations are not shared between workers")
+
+    # Not daemonic: each worker starts its own chart pool processes
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=serve_webhook) for _ in range(webhook_workers - 1)]
+    for worker in workers:
+        worker.start()
+    try:
+        serve_webhook()
+    finally:
+        for worker in workers:
+            worker.terminate()
+
+
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    if bot_mode == "webhook":
+        run_webhook()
+    else:
+        asyncio.run(main())
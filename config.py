@@ -1,6 +1,11 @@
 import os
 path_to_csv = os.path.join(os.path.dirname(__file__), "data", "seizure.csv")
 path_to_medicine_csv = os.path.join(os.path.dirname(__file__), "data", "medicine.csv")
+path_to_sqlite = os.path.join(os.path.dirname(__file__), "data", "seizure.sqlite3")
+path_to_binary_log = os.path.join(os.path.dirname(__file__), "data", "seizure.bin")
+# "csv" keeps the spreadsheet files above, "sqlite" uses path_to_sqlite,
+# "binary" keeps the seizures in path_to_binary_log (see services/binary_log.py)
+storage_backend = os.getenv("STORAGE_BACKEND", "csv")
 admin_list = [
     5460055491, 997175404, 6529721479, 351620312
 ]
@@ -10,4 +15,44 @@ admin_json = {
     997175404: "Абдусалом",
     6529721479: "Акобир",
     351620312: "Абдумуталиб"
-}
\ No newline at end of file
+}
+
+# Patients and their admins, one data directory each (see services/patients.py).
+# Without this file there is a single patient kept in data/ with admin_json as admins.
+path_to_patients = os.getenv("PATIENTS_FILE", os.path.join(os.path.dirname(__file__), "data", "patients.json"))
+# Data directories of patients that do not set their own "data_dir"
+patients_dir = os.getenv("PATIENTS_DIR", os.path.join(os.path.dirname(__file__), "data", "patients"))
+
+# Chart rendering runs in a separate process pool (see services/chart_pool.py)
+chart_workers = int(os.getenv("CHART_WORKERS", 2))
+chart_max_concurrency = int(os.getenv("CHART_MAX_CONCURRENCY", 4))
+chart_timeout = float(os.getenv("CHART_TIMEOUT", 60))
+# Repeated identical chart requests from one user within this many seconds are ignored
+chart_debounce = float(os.getenv("CHART_DEBOUNCE", 5))
+# Longer logs are thinned out (LTTB) to this many points in the per-seizure charts
+chart_max_points = int(os.getenv("CHART_MAX_POINTS", 2000))
+# After a write, charts and statistics are rebuilt in the background once the log has been
+# quiet for this many seconds (see services/precompute.py); 0 or less turns it off
+precompute_delay = float(os.getenv("PRECOMPUTE_DELAY", 2))
+# Load pandas, the seizure log and the chart workers in the background once polling starts
+warm_up_on_start = os.getenv("WARM_UP", "1") != "0"
+
+# "polling" (default) or "webhook": Telegram posts updates to WEBHOOK_URL + WEBHOOK_PATH
+bot_mode = os.getenv("BOT_MODE", "polling")
+webhook_url = os.getenv("WEBHOOK_URL")
+webhook_path = os.getenv("WEBHOOK_PATH", "/webhook")
+webhook_secret = os.getenv("WEBHOOK_SECRET")
+webhook_host = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+webhook_port = int(os.getenv("PORT", 8080))
+# Processes serving the webhook port together (SO_REUSEPORT)
+webhook_workers = int(os.getenv("WEBHOOK_WORKERS", 1))
+
+# Prometheus metrics (see services/metrics.py) on http://METRICS_HOST:METRICS_PORT/metrics; 0 turns it off.
+# Local only by default; with several webhook workers only the first one to bind the port serves it.
+metrics_host = os.getenv("METRICS_HOST", "127.0.0.1")
+metrics_port = int(os.getenv("METRICS_PORT", 9108))
+
+# FSM storage for in-progress conversations: "memory", "sqlite" or "redis"
+fsm_storage = os.getenv("FSM_STORAGE", "memory")
+path_to_fsm_sqlite = os.getenv("FSM_SQLITE_PATH", os.path.join(os.path.dirname(__file__), "data", "fsm.sqlite3"))
+redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -1,6 +1,6 @@
-from config import admin_json
+from services.patients import patients
+
+
 def is_admin_function(tg_id):
-    if tg_id in admin_json:
-        return admin_json[tg_id]
-    else:
-        return False
+    """Admin's name if `tg_id` keeps some patient's log, False otherwise"""
+    return patients.admin_name(tg_id) or False
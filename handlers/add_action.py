@@ -6,8 +6,9 @@ from aiogram.fsm.state import State, StatesGroup
 from keyboards.kb import main_kb
 from filters.is_admin import is_admin_function
 from keyboards.inline_kb import check_date, no_comment
-from services.csv_manager import csv_manager
-from utils.date_parser import parse_user_datetime, format_datetime_for_csv
+from services.patients import patients
+from services.write_queue import write_queue
+from utils.date_parser import parse_user_datetime, format_datetime_for_csv, format_interval
 from utils.escape_markdown_v2 import escape_markdown_v2
 
 
@@ -119,15 +120,22 @@ async def process_duration(message: Message, state: FSMContext):
 async def process_comment(message: Message, state: FSMContext):
     comment = message.text.strip() if message.text else "нет"
     user_data = await state.get_data()
+    patient = patients.for_user(message.from_user.id)
+    if patient is None:
+        await message.answer("Вы не имеете права добавлять приступы, берите разрешение у Акобира")
+        await state.clear()
+        return
 
-    result, interval_days = csv_manager.add_seizure_record(
+    # Keyed per patient: writes to other patients' logs do not wait on this one
+    result, interval_days = await write_queue.submit(
+        patient.storage, patient.storage.add_seizure_record,
         user_data['formatted_date'],
         user_data['duration'],
         comment
     )
 
     if result:
-        interval_msg = f"\nИнтервал: {interval_days} дней с предыдущего приступа" if interval_days is not None else ""
+        interval_msg = f"\nИнтервал: {format_interval(interval_days)} с предыдущего приступа" if interval_days is not None else ""
         await message.answer(
             escape_markdown_v2(
                 f"✅ Данные о приступе сохранены:\n"
@@ -154,20 +162,26 @@ async def no_comment_callback(callback, state: FSMContext):
         return
 
     user_data = await state.get_data()
+    patient = patients.for_user(callback.from_user.id)
+    if patient is None:
+        await callback.answer("Вы не имеете права добавлять приступы", show_alert=True)
+        await state.clear()
+        return
 
-    result, interval_days = csv_manager.add_seizure_record(
+    result, interval_days = await write_queue.submit(
+        patient.storage, patient.storage.add_seizure_record,
         user_data['formatted_date'],
         user_data['duration'],
         ""
     )
 
     if result:
-        interval_msg = f"\nИнтервал: {interval_days} дней с предыдущего приступа" if interval_days is not None else ""
+        interval_msg = f"\nИнтервал: {format_interval(interval_days)} с предыдущего приступа" if interval_days is not None else ""
         await callback.message.answer(
             f"✅ Данные о приступе сохранены:\n"
             f"📅 Дата и время: `{user_data['formatted_date']}`\n"
             f"⏱️ Продолжительность: `{user_data['duration']}`\n"
-            f"📝 Комментарий: нет{interval_msg}",
+            f"📝 Комментарий: нет{escape_markdown_v2(interval_msg)}",
             reply_markup=main_kb(),
             parse_mode="MarkdownV2"
         )
@@ -6,9 +6,9 @@ from aiogram.fsm.state import State, StatesGroup
 from filters.is_admin import is_admin_function
 from keyboards.kb import main_kb
 from keyboards.inline_kb import check_date
-import pandas as pd
 from datetime import datetime
-from config import path_to_medicine_csv
+from services.patients import patients
+from services.write_queue import write_queue
 
 add_medicine_router = Router()
 
@@ -61,8 +61,14 @@ async def process_date(message: Message, state: FSMContext):
 async def process_comment(message: Message, state: FSMContext):
     comment = message.text
     user_data = await state.get_data()
+    patient = patients.for_user(message.from_user.id)
+    if patient is None:
+        await message.answer("У вас нет прав для добавления записей о лекарствах 🚫")
+        await state.clear()
+        return
 
-    result = add_medicine_record(
+    result = await write_queue.submit(
+        patient.medicine_storage, patient.medicine_storage.add_medicine_record,
         user_data['formatted_date'],
         comment
     )
@@ -80,34 +86,3 @@ async def process_comment(message: Message, state: FSMContext):
                              reply_markup=main_kb(),
                              parse_mode="MarkdownV2")
     await state.clear()
-
-
-def add_medicine_record(date_str, comment):
-    """
-    Add a new medicine record to the CSV file
-
-    Args:
-        date_str (str): Date in format 'MM/DD/YYYY'
-        comment (str): Treatment information or comment
-
-    Returns:
-        bool: Success status
-    """
-    try:
-        try:
-            df = pd.read_csv(path_to_medicine_csv)
-        except:
-            df = pd.DataFrame(columns=['Дата', 'Лечение/Комментарии'])
-
-        new_row = {
-            'Дата': date_str,
-            'Лечение/Комментарии': comment
-        }
-        df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-        df.to_csv(path_to_medicine_csv, index=False)
-
-        return True
-
-    except Exception as e:
-        print(f"Error adding medicine record: {e}")
-        return False
\ No newline at end of file
@@ -0,0 +1,188 @@
+import asyncio
+import html
+
+from aiogram.types import Message
+from aiogram import F, Router
+from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from keyboards.kb import main_kb
+from keyboards.inline_kb import edit_record, confirm_delete
+from services.patients import patients
+from services.write_queue import write_queue
+from utils.date_parser import parse_user_datetime, format_datetime_for_csv, format_interval
+
+
+edit_action_router = Router()
+
+
+class EditActionStates(StatesGroup):
+    waiting_for_record = State()
+    waiting_for_choice = State()
+    waiting_for_datetime = State()
+    waiting_for_duration = State()
+    waiting_for_comment = State()
+
+
+def describe_record(record):
+    """The SeizureRecord from find_seizure_record as a chat message (HTML, the bot's parse mode)"""
+    # Shown day-first, the way admins type dates, not in the log's month-first format
+    lines = [
+        f"📅 Дата и время: {record.timestamp.strftime('%d.%m.%Y %H:%M')}",
+        # Duration and comment are free text: "<3 мин" must not be read as a tag
+        f"⏱️ Продолжительность: {html.escape(record.duration) if record.duration else 'не указана'}",
+    ]
+    if record.interval_days is not None:
+        lines.append(f"↔️ Интервал: {format_interval(record.interval_days)}")
+    lines.append(f"📝 Комментарий: {html.escape(record.comment) if record.comment else 'нет'}")
+    return "\n".join(lines)
+
+
+def _saved_message(result, interval_days):
+    if not result:
+        return "❌ Произошла ошибка при сохранении данных."
+    interval_msg = f"\nИнтервал: {format_interval(interval_days)} с предыдущего приступа" if interval_days is not None else ""
+    return f"✅ Изменения сохранены{interval_msg}"
+
+
+@edit_action_router.message(Command("edit_action"))
+async def edit_action_handler(message: Message, state: FSMContext):
+    if patients.for_user(message.from_user.id) is None:
+        await message.answer("Вы не имеете права изменять приступы")
+        return
+    await message.answer(
+        "Напишите дату и время приступа, который нужно исправить или удалить, "
+        "так же, как при добавлении (например: 25.12.2023 14:30)"
+    )
+    await state.set_state(EditActionStates.waiting_for_record)
+
+
+@edit_action_router.message(EditActionStates.waiting_for_record)
+async def process_record(message: Message, state: FSMContext):
+    patient = patients.for_user(message.from_user.id)
+    if patient is None:
+        await message.answer("Вы не имеете права изменять приступы")
+        await state.clear()
+        return
+    datetime_obj = parse_user_datetime(message.text or "")
+    if datetime_obj is None:
+        await message.answer("❌ Не удалось распознать дату и время. Пожалуйста, попробуйте еще раз.")
+        return
+
+    formatted_date = format_datetime_for_csv(datetime_obj)
+    record = await asyncio.to_thread(patient.storage.find_seizure_record, formatted_date)
+    if record is None:
+        await message.answer(f"Приступ {datetime_obj.strftime('%d.%m.%Y %H:%M')} не найден в журнале. "
+                             "Проверьте дату и время.")
+        return
+
+    await state.update_data(record=formatted_date)
+    await message.answer(f"{describe_record(record)}\n\nЧто изменить?", reply_markup=edit_record())
+    await state.set_state(EditActionStates.waiting_for_choice)
+
+
+async def _choose(callback, state: FSMContext, next_state, prompt):
+    if await state.get_state() != EditActionStates.waiting_for_choice.state:
+        await callback.answer("Это действие больше недоступно", show_alert=True)
+        return
+    await callback.message.answer(prompt)
+    await state.set_state(next_state)
+    await callback.answer()
+
+
+@edit_action_router.callback_query(F.data == "edit_datetime")
+async def choose_datetime(callback, state: FSMContext):
+    await _choose(callback, state, EditActionStates.waiting_for_datetime,
+                  "Напишите новую дату и время приступа (например: 25.12.2023 14:30)")
+
+
+@edit_action_router.callback_query(F.data == "edit_duration")
+async def choose_duration(callback, state: FSMContext):
+    await _choose(callback, state, EditActionStates.waiting_for_duration,
+                  "Укажите продолжительность приступа (например: 30 сек)")
+
+
+@edit_action_router.callback_query(F.data == "edit_comment")
+async def choose_comment(callback, state: FSMContext):
+    await _choose(callback, state, EditActionStates.waiting_for_comment, "Напишите новый комментарий")
+
+
+@edit_action_router.callback_query(F.data == "edit_delete")
+async def choose_delete(callback, state: FSMContext):
+    if await state.get_state() != EditActionStates.waiting_for_choice.state:
+        await callback.answer("Это действие больше недоступно", show_alert=True)
+        return
+    await callback.message.answer("Удалить этот приступ из журнала?", reply_markup=confirm_delete())
+    await callback.answer()
+
+
+@edit_action_router.callback_query(F.data == "edit_cancel")
+async def cancel_edit(callback, state: FSMContext):
+    if await state.get_state() == EditActionStates.waiting_for_choice.state:
+        await state.clear()
+        await callback.message.answer("Ничего не изменено", reply_markup=main_kb())
+    await callback.answer()
+
+
+@edit_action_router.callback_query(F.data == "edit_delete_confirm")
+async def confirm_delete_record(callback, state: FSMContext):
+    if await state.get_state() != EditActionStates.waiting_for_choice.state:
+        await callback.answer("Это действие больше недоступно", show_alert=True)
+        return
+    patient = patients.for_user(callback.from_user.id)
+    if patient is None:
+        await callback.answer("Вы не имеете права изменять приступы", show_alert=True)
+        await state.clear()
+        return
+
+    user_data = await state.get_data()
+    deleted = await write_queue.submit(
+        patient.storage, patient.storage.delete_seizure_record, user_data['record']
+    )
+    await callback.message.answer(
+        "✅ Приступ удалён" if deleted else "❌ Не удалось удалить приступ.",
+        reply_markup=main_kb()
+    )
+    await state.clear()
+    await callback.answer()
+
+
+async def _update(message: Message, state: FSMContext, **changes):
+    patient = patients.for_user(message.from_user.id)
+    if patient is None:
+        await message.answer("Вы не имеете права изменять приступы")
+        await state.clear()
+        return
+
+    user_data = await state.get_data()
+    # Same per-patient queue as new records, so an edit can not interleave with an add
+    result, interval_days = await write_queue.submit(
+        patient.storage, patient.storage.update_seizure_record, user_data['record'], **changes
+    )
+    await message.answer(_saved_message(result, interval_days), reply_markup=main_kb())
+    await state.clear()
+
+
+@edit_action_router.message(EditActionStates.waiting_for_datetime)
+async def process_new_datetime(message: Message, state: FSMContext):
+    datetime_obj = parse_user_datetime(message.text or "")
+    if datetime_obj is None:
+        await message.answer("❌ Не удалось распознать дату и время. Пожалуйста, попробуйте еще раз.")
+        return
+    await _update(message, state, new_datetime_str=format_datetime_for_csv(datetime_obj))
+
+
+@edit_action_router.message(EditActionStates.waiting_for_duration)
+async def process_new_duration(message: Message, state: FSMContext):
+    duration = (message.text or "").strip()
+    if not duration.replace(" ", "").replace("сек", "").isdigit():
+        await message.answer("❌ Неверный формат продолжительности. Укажите продолжительность в секундах, например: 30 сек")
+        return
+    if duration.isdigit():
+        duration = f"{duration} сек"
+    await _update(message, state, duration=duration)
+
+
+@edit_action_router.message(EditActionStates.waiting_for_comment)
+async def process_new_comment(message: Message, state: FSMContext):
+    await _update(message, state, comment=(message.text or "").strip())
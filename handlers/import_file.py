@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime
+
+from aiogram import Router, F
+from aiogram.filters import Command
+from aiogram.types import Message
+from services.patients import patients
+from services.seizure_import import IMPORT_EXTENSIONS, ImportFormatError, parse_upload
+from services.write_queue import write_queue
+from utils.date_parser import TIMEZONE
+
+import_file_router = Router()
+
+# Bots can not download files larger than this through the Bot API
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+REJECT_REASONS = {
+    'date': "дата",
+    'time': "время",
+    'duration': "продолжительность",
+    'future': "дата в будущем",
+}
+IMPORT_HELP = (
+    "📥 Чтобы загрузить историю приступов, отправьте файл .csv или .xlsx.\n\n"
+    "Нужна строка заголовка с колонками «Дата» и «Время» (можно одной колонкой «Дата» "
+    "с датой и временем), по желанию «Продолж-сть» и «Комментарии». "
+    "Подойдёт и файл, полученный через /send_file.\n\n"
+    "Даты через точку — день первым (25.12.2023), через косую черту — месяц первым, "
+    "как в журнале (12/25/2023). Приступы, которые уже есть в журнале, пропускаются; "
+    "номера и интервалы пересчитываются."
+)
+
+
+def format_import_report(report, added, known):
+    lines = [
+        "✅ Импорт завершён",
+        f"Строк в файле: {report['rows']}",
+        f"Добавлено: {added}",
+    ]
+    if known:
+        lines.append(f"Уже были в журнале: {known}")
+    if report['repeated']:
+        lines.append(f"Повторы внутри файла: {report['repeated']}")
+    rejected = sum(report['rejected'].values())
+    if rejected:
+        reasons = ", ".join(f"{REJECT_REASONS.get(reason, reason)}: {count}"
+                            for reason, count in sorted(report['rejected'].items()))
+        lines.append(f"Отклонено: {rejected} ({reasons})")
+        lines.append("Например, строки " + ", ".join(map(str, report['rejected_lines'])))
+    return "\n".join(lines)
+
+
+@import_file_router.message(Command("import"))
+async def import_help_handler(message: Message):
+    if patients.for_user(message.from_user.id) is None:
+        await message.answer("У вас нет прав загружать данные")
+        return
+    await message.answer(IMPORT_HELP)
+
+
+@import_file_router.message(F.document)
+async def import_document_handler(message: Message):
+    patient = patients.for_user(message.from_user.id)
+    if patient is None:
+        await message.answer("У вас нет прав загружать данные")
+        return
+
+    document = message.document
+    if not (document.file_name or "").lower().endswith(IMPORT_EXTENSIONS):
+        await message.answer(IMPORT_HELP)
+        return
+    if document.file_size and document.file_size > MAX_UPLOAD_BYTES:
+        await message.answer("❌ Файл больше 20 МБ, разделите его на части")
+        return
+
+    await message.answer("Загружаю и проверяю файл, пожалуйста подождите...")
+    data = (await message.bot.download(document)).getvalue()
+    now = datetime.now(TIMEZONE).replace(tzinfo=None)
+    try:
+        # Parsing and validation run off the loop; only the merge waits for the patient's write lock
+        rows, report = await asyncio.to_thread(parse_upload, data, document.file_name, now)
+    except ImportFormatError as e:
+        await message.answer(f"❌ Не удалось прочитать файл: {e}")
+        return
+
+    result = await write_queue.submit(patient.storage, patient.storage.import_seizures, rows)
+    if result is None:
+        await message.answer("❌ Произошла ошибка при сохранении данных.")
+        return
+    await message.answer(format_import_report(report, *result))
@@ -1,12 +1,50 @@
 from aiogram import Router, F
 from aiogram.filters import Command
-from aiogram.types import Message, FSInputFile
-from filters.is_admin import is_admin_function
-from services.chart_generator import ChartGenerator
-from config import path_to_csv
-import os
+from aiogram.types import Message, BufferedInputFile, InputMediaPhoto
+from services import chart_pool
+from services.chart_cache import chart_cache
+from config import chart_debounce
+from services.patients import patients
+from utils.date_parser import TIMEZONE, extract_date_range, format_date_range
+from utils.debounce import Debouncer
+from datetime import datetime
+import asyncio
 
 send_chart_router = Router()
+# Repeated taps on "Отправить визуализацию" while the charts are on their way;
+# once they are sent (or fail) the next tap goes through
+chart_debouncer = Debouncer(chart_debounce)
+
+# "/send_visualisation месяц" -> monthly bins; no argument -> every seizure
+PERIOD_WORDS = {
+    'week': 'week', 'неделя': 'week', 'недели': 'week', 'неделям': 'week', 'нед': 'week',
+    'month': 'month', 'месяц': 'month', 'месяцы': 'month', 'месяцам': 'month', 'мес': 'month',
+}
+PERIOD_CAPTIONS = {
+    'week': " по неделям",
+    'month': " по месяцам",
+}
+# "/send_visualisation лечение" shades the treatment periods from the medicine log
+TREATMENT_WORDS = {'лечение', 'лечения', 'лечением', 'лекарства', 'медицина', 'treatment', 'treatments'}
+
+
+def parse_period(text):
+    """Return 'week', 'month' or None from the words after the command"""
+    for word in text.lower().split()[1:]:
+        if word in PERIOD_WORDS:
+            return PERIOD_WORDS[word]
+    return None
+
+
+def wants_treatments(text):
+    return any(word in TREATMENT_WORDS for word in text.lower().split()[1:])
+
+
+def range_caption(start, end):
+    """' за 01.01.2025 – 30.06.2025' for the (start, exclusive end) range, '' without one"""
+    if start is None and end is None:
+        return ""
+    return f" за {format_date_range(start, end, open_end='сегодня')}"
 
 
 @send_chart_router.message(lambda message: message.text == "Отправить визуализацию" or
@@ -14,35 +52,53 @@ send_chart_router = Router()
 async def send_charts_handler(message: Message):
     user_id = message.from_user.id
 
-    if not is_admin_function(user_id):
+    patient = patients.for_user(user_id)
+    if patient is None:
         await message.answer("У вас нет прав для просмотра графиков")
         return
+    debounce_key = (user_id, message.text)
+    if not chart_debouncer.allow(debounce_key):
+        return
+    try:
+        await send_charts(message, patient)
+    finally:
+        chart_debouncer.done(debounce_key)
 
+
+async def send_charts(message, patient):
     await message.answer("Генерирую графики, пожалуйста подождите...")
 
+    # "/send_visualisation 01.01.2025 30.06.2025 месяц", "/send_visualisation последние 90 дней"
+    date_range, rest = extract_date_range(message.text, datetime.now(TIMEZONE).date())
+    start, end = date_range or (None, None)
+    period = parse_period(rest)
+    treatments = patient.medicine_data_path if wants_treatments(rest) else None
+    suffix = PERIOD_CAPTIONS.get(period, "") + range_caption(start, end)
+    if treatments:
+        suffix += " с периодами лечения"
     try:
-        chart_gen = ChartGenerator(path_to_csv)
-        interval_buffer = chart_gen.generate_interval_chart()
-        temp_interval_path = "temp_interval_chart.png"
-        with open(temp_interval_path, 'wb') as f:
-            f.write(interval_buffer.getvalue())
-        await message.answer_photo(
-            FSInputFile(temp_interval_path),
-            caption="График интервалов между приступами 📊"
-        )
-        duration_buffer = chart_gen.generate_duration_chart()
-
-        temp_duration_path = "temp_duration_chart.png"
-        with open(temp_duration_path, 'wb') as f:
-            f.write(duration_buffer.getvalue())
-
-        await message.answer_photo(
-            FSInputFile(temp_duration_path),
-            caption="График продолжительности приступов 📊"
-        )
-
-        os.remove(temp_interval_path)
-        os.remove(temp_duration_path)
+        charts = [
+            ('interval', "interval_chart.png", f"График интервалов между приступами{suffix} 📊"),
+            ('duration', "duration_chart.png", f"График продолжительности приступов{suffix} 📊"),
+        ]
+        # Both charts render in parallel in the worker pool; each range is cached per data version
+        rendered = await asyncio.gather(*(
+            chart_pool.get_chart(patient.seizure_data_path, chart_type, period=period, start=start, end=end,
+                                 treatments=treatments)
+            for chart_type, _, _ in charts
+        ))
+
+        media = []
+        for (chart_type, filename, caption), (key, entry) in zip(charts, rendered):
+            # Same data as last time: Telegram already has this picture
+            photo = entry['file_id'] or BufferedInputFile(entry['png'], filename=filename)
+            media.append(InputMediaPhoto(media=photo, caption=caption))
+
+        sent = await message.answer_media_group(media=media)
+        for (key, entry), sent_message in zip(rendered, sent):
+            chart_cache.set_file_id(key, sent_message.photo[-1].file_id)
 
+    except asyncio.TimeoutError:
+        await message.answer("❌ Графики строятся слишком долго, попробуйте позже")
     except Exception as e:
         await message.answer(f"❌ Ошибка при генерации графиков: {str(e)}")
\ No newline at end of file
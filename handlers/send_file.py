@@ -1,8 +1,14 @@
+import asyncio
+
 from aiogram import Router, F
 from aiogram.filters import Command
-from aiogram.types import Message, FSInputFile
+from aiogram.types import Message, CallbackQuery, BufferedInputFile
+from aiogram.types.input_file import InputFile
 from filters.is_admin import is_admin_function
-from config import path_to_csv
+from keyboards.inline_kb import export_format
+from services.export_cache import export_cache
+from services.log_export import EXPORT_FORMATS, available_formats, get_export
+from services.patients import patients
 # from aiogram.filters.base
 
 
@@ -10,13 +16,75 @@ from config import path_to_csv
 send_file_router = Router()
 
 
+class StreamedInputFile(InputFile):
+    """Upload chunks from a (blocking) generator, pulling each chunk off the event loop"""
+
+    def __init__(self, chunks, filename):
+        super().__init__(filename=filename)
+        self.chunks = chunks
+
+    async def read(self, bot):
+        sentinel = object()
+        while (chunk := await asyncio.to_thread(next, self.chunks, sentinel)) is not sentinel:
+            yield chunk
+
+
+async def send_export(message: Message, patient, export_format_name, admin_name):
+    """Send the patient's log in one export format, reusing the Telegram file_id while the log is unchanged"""
+    spec = EXPORT_FORMATS[export_format_name]
+    try:
+        key, entry = await get_export(patient.storage, patient.seizure_data_path, export_format_name)
+    except Exception as e:
+        await message.answer(f"❌ Ошибка при подготовке файла: {str(e)}")
+        return
+
+    # Same data as last time: Telegram already has this file
+    if entry['file_id']:
+        document = entry['file_id']
+    elif entry['data'] is None:
+        document = StreamedInputFile(patient.storage.iter_seizure_csv(), filename=spec['filename'])
+    else:
+        document = BufferedInputFile(entry['data'], filename=spec['filename'])
+    sent = await message.answer_document(
+        document, caption=f"Вот файл с данными о судорогах ({spec['label']}). {admin_name}"
+    )
+    export_cache.set_file_id(key, sent.document.file_id)
+
+
 @send_file_router.message(lambda message: message.text == "Отправить файл" or
                          (message.text and message.text.startswith("/send_file")))
 async def send_file_handler(message: Message):
     user_id = message.from_user.id
     checker_admin = is_admin_function(user_id)
-    if checker_admin:
-        file = FSInputFile(path_to_csv)
-        await message.answer_document(file, caption=f"Вот оригинальный файл с данными о судорогах. {checker_admin}")
-    else:
-        await message.answer("У вас нет прав получать файл")
\ No newline at end of file
+    if not checker_admin:
+        await message.answer("У вас нет прав получать файл")
+        return
+
+    patient = patients.for_user(user_id)
+    formats = available_formats()
+    # "/send_file xlsx" skips the format menu
+    command, _, argument = message.text.partition(" ")
+    requested = argument.strip().lower().lstrip('.') if command.startswith("/send_file") else None
+    if requested in formats:
+        await send_export(message, patient, requested, checker_admin)
+        return
+    await message.answer(
+        "В каком формате отправить файл?",
+        reply_markup=export_format([(name, EXPORT_FORMATS[name]['label']) for name in formats])
+    )
+
+
+@send_file_router.callback_query(F.data.startswith("export:"))
+async def export_format_callback(callback: CallbackQuery):
+    user_id = callback.from_user.id
+    checker_admin = is_admin_function(user_id)
+    if not checker_admin:
+        await callback.answer("У вас нет прав получать файл", show_alert=True)
+        return
+    export_format_name = callback.data.split(":", 1)[1]
+    if export_format_name not in available_formats():
+        await callback.answer("Этот формат недоступен", show_alert=True)
+        return
+
+    await callback.answer()
+    await send_export(callback.message, patients.for_user(user_id), export_format_name, checker_admin)
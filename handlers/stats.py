@@ -0,0 +1,72 @@
+import asyncio
+import html
+from datetime import datetime
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+from services.metrics import storage_seconds
+from services.patients import patients
+from utils.date_parser import TIMEZONE
+
+stats_router = Router()
+
+
+def _number(value):
+    if value is None:
+        return "—"
+    return f"{value:.1f}".removesuffix(".0")
+
+
+def _series_line(title, summary, unit):
+    if not summary["count"]:
+        return f"{title}: нет данных"
+    return (f"{title}: среднее {_number(summary['mean'])}, медиана {_number(summary['median'])}, "
+            f"мин {_number(summary['min'])}, макс {_number(summary['max'])} {unit}")
+
+
+def format_statistics(stats):
+    """Render the dict from get_statistics as a chat message (HTML, the bot's parse mode)"""
+    lines = ["📈 Статистика приступов", "", f"Всего приступов: {stats['total_seizures']}"]
+
+    last = stats["last_seizure"]
+    if last:
+        # Cells of the log as written, e.g. "<1 мин": escaped so they are not read as tags
+        duration = html.escape(last['duration']) if last['duration'] else 'длительность не указана'
+        lines.append(f"Последний: {html.escape(last['date'])} {html.escape(last['time'])}, {duration}")
+    lines.append(
+        f"За 7 дней: {stats['last_7_days']} · за 30 дней: {stats['last_30_days']} · "
+        f"за 90 дней: {stats['last_90_days']}"
+    )
+    lines.append("")
+    lines.append(_series_line("Интервал", stats["interval"], "дн."))
+    lines.append(_series_line("Продолжительность", stats["duration"], "сек"))
+
+    if stats["current_streak_days"] is not None:
+        lines.append("")
+        lines.append(f"Без приступов: {int(stats['current_streak_days'])} дн.")
+    longest = stats["longest_streak"]
+    if longest:
+        end = longest["end"].strftime("%d.%m.%Y") if longest["end"] else "сегодня"
+        lines.append(
+            f"Самый долгий период без приступов: {int(longest['days'])} дн. "
+            f"({longest['start'].strftime('%d.%m.%Y')} — {end})"
+        )
+    return "\n".join(lines)
+
+
+@stats_router.message(Command("stats"))
+async def stats_handler(message: Message):
+    patient = patients.for_user(message.from_user.id)
+    if patient is None:
+        await message.answer("У вас нет прав для просмотра статистики")
+        return
+
+    now = datetime.now(TIMEZONE).replace(tzinfo=None)
+    # Only the first call after a restart parses the log; later ones are O(1)
+    with storage_seconds.time("get_statistics"):
+        stats = await asyncio.to_thread(patient.storage.get_statistics, now)
+    if not stats:
+        await message.answer("❌ Не удалось посчитать статистику")
+        return
+    await message.answer(format_statistics(stats))
@@ -12,4 +12,27 @@ def no_comment():
     inline_kb = [
         [InlineKeyboardButton(text="Нет", callback_data="no")],
     ]
+    return InlineKeyboardMarkup(inline_keyboard=inline_kb)
+
+def edit_record():
+    inline_kb = [
+        [InlineKeyboardButton(text="Дата и время", callback_data="edit_datetime")],
+        [InlineKeyboardButton(text="Продолжительность", callback_data="edit_duration")],
+        [InlineKeyboardButton(text="Комментарий", callback_data="edit_comment")],
+        [InlineKeyboardButton(text="Удалить", callback_data="edit_delete")],
+        [InlineKeyboardButton(text="Отмена", callback_data="edit_cancel")],
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=inline_kb)
+
+def confirm_delete():
+    inline_kb = [
+        [InlineKeyboardButton(text="Да, удалить", callback_data="edit_delete_confirm")],
+        [InlineKeyboardButton(text="Нет", callback_data="edit_cancel")],
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=inline_kb)
+
+def export_format(formats):
+    inline_kb = [
+        [InlineKeyboardButton(text=label, callback_data=f"export:{name}")] for name, label in formats
+    ]
     return InlineKeyboardMarkup(inline_keyboard=inline_kb)
\ No newline at end of file
@@ -18,7 +18,10 @@ async def command_menu():
     commands = [
         BotCommand(command='send_file', description="Получите файл Excel или CSV"),
         BotCommand(command='add_action', description="Добавить дату приступа"),
+        BotCommand(command='edit_action', description="Исправить или удалить приступ"),
         BotCommand(command='add_medicine', description="Добавить медицину прописанное доктором"),
-        BotCommand(command="send_visualisation", description="Визуализированный вид судорог")
+        BotCommand(command="send_visualisation", description="Графики судорог: можно указать даты, «последние 90 дней», неделя/месяц, лечение"),
+        BotCommand(command="stats", description="Статистика приступов"),
+        BotCommand(command="import", description="Загрузить историю приступов из CSV/XLSX")
     ]
     await bot.set_my_commands(commands, BotCommandScopeDefault())
\ No newline at end of file
@@ -0,0 +1,60 @@
+import time
+
+from aiogram import BaseMiddleware
+
+from services.metrics import updates_total, update_seconds, handler_seconds, handler_errors_total
+
+
+def handler_name(handler):
+    """'add_action.process_comment' for a handler object (several modules reuse handler names)"""
+    callback = handler.callback
+    return f"{callback.__module__.rsplit('.', 1)[-1]}.{getattr(callback, '__name__', type(callback).__name__)}"
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Outer middleware on dp.update: counts every update and times its whole processing"""
+
+    async def __call__(self, handler, event, data):
+        event_type = event.event_type
+        updates_total.inc(event_type)
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            update_seconds.observe(time.perf_counter() - start, event_type)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """
+    Inner middleware: latency and errors per handler.
+
+    Inner middlewares only run once a handler matched, so data['handler']
+    tells which one. Registered on the dispatcher's observers, it applies to
+    the handlers of every included router.
+    """
+
+    def __init__(self):
+        self._names = {}
+
+    async def __call__(self, handler, event, data):
+        handler_object = data["handler"]
+        # Keyed by the callback: handler objects are (unhashable) dataclasses
+        name = self._names.get(handler_object.callback)
+        if name is None:
+            name = self._names[handler_object.callback] = handler_name(handler_object)
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            handler_errors_total.inc(name)
+            raise
+        finally:
+            handler_seconds.observe(time.perf_counter() - start, name)
+
+
+def setup_metrics(dp):
+    """Register the metrics middlewares on the dispatcher"""
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    handler_metrics = HandlerMetricsMiddleware()
+    dp.message.middleware(handler_metrics)
+    dp.callback_query.middleware(handler_metrics)
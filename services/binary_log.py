@@ -0,0 +1,484 @@
+import csv
+import io
+import mmap
+import os
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from services.csv_manager import CSVManager
+from services.records import SeizureRecord
+from services.seizure_import import LOG_COLUMNS, read_log_text
+from services.seizure_store import (
+    INTERVAL_DECIMALS, SeizureStore, interval_text, parse_duration_strings, parse_seconds, parse_timestamps,
+)
+from utils.atomic_file import atomic_write
+from utils.file_lock import file_lock
+from utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+MAGIC = b"SZLOG\x00\x00\x01"
+STRINGS_MAGIC = b"SZSTR\x00\x00\x01"
+# Both files start with their magic and the generation (8 random bytes) of the
+# rewrite that created them, so a log is never read with another log's strings
+HEADER_SIZE = 16
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<i8'),  # local date and time, seconds since 1970-01-01; NAT_SECONDS if unreadable
+    ('seconds', '<f4'),    # duration in seconds, NaN if blank or not a number
+    ('interval', '<f4'),   # Интервал in days, NaN if blank or not a number
+    ('comment', '<i4'),    # offset of the comment in the strings file, -1 if blank
+    ('text', '<i4'),       # STYLE_PADDED, STYLE_PLAIN or the offset of the row's original cells
+])
+# Same bit pattern as NaT, so the timestamps can be viewed as datetime64[s]
+NAT_SECONDS = np.iinfo(np.int64).min
+# The row's cells follow from its fields: № is its position + 1 and the date
+# and time are written zero-padded (as the bot writes them) or without padding
+# (as in the original spreadsheet)
+STYLE_PADDED = -1
+STYLE_PLAIN = -2
+MAX_OFFSET = 2 ** 31 - 1
+OPEN_ATTEMPTS = 50
+EPOCH = datetime(1970, 1, 1)
+SEIZURE_TITLE = ["Судорожные приступы", "", "", "", "", ""]
+
+
+def strings_path(path):
+    """The strings file kept next to a binary log"""
+    return f"{path}.strings"
+
+
+def _date_texts(days, plain):
+    """Дата of days counted from 1970-01-01: '05/13/2020', or '5/13/2020' if plain"""
+    days = np.asarray(days).astype('datetime64[D]')
+    months = days.astype('datetime64[M]')
+    years = months.astype('datetime64[Y]').astype(np.int64) + 1970
+    day_of_month = (days - months).astype(np.int64) + 1
+    month = months.astype(np.int64) % 12 + 1
+    text = "{1}/{2}/{0}" if plain else "{1:02d}/{2:02d}/{0}"
+    return [text.format(*ymd) for ymd in zip(years.tolist(), month.tolist(), day_of_month.tolist())]
+
+
+def _time_text(minute, plain):
+    """Время of a minute of the day: '09:05', or '9:05' if plain"""
+    hour, minute = divmod(int(minute), 60)
+    return f"{hour}:{minute:02d}" if plain else f"{hour:02d}:{minute:02d}"
+
+
+def _duration_text(seconds):
+    return "" if np.isnan(seconds) else f"{float(seconds):g} сек"
+
+
+def _interval_cell(days):
+    return "" if np.isnan(days) else interval_text(float(days))
+
+
+def _distinct(values, format_all):
+    """format_all (values -> list) of each distinct value only, "" for NaN"""
+    codes, uniques = pd.factorize(values)
+    text = np.empty(len(uniques) + 1, dtype=object)
+    text[:-1] = format_all(uniques)
+    text[-1] = ""
+    return text[codes]
+
+
+def _each(format_one):
+    return lambda values: [format_one(value) for value in values]
+
+
+def _date_time_text(stamps, plain):
+    """Дата and Время cells of record timestamps, "" where unreadable; `plain` per row"""
+    dates = np.full(len(stamps), "", dtype=object)
+    times = np.full(len(stamps), "", dtype=object)
+    valid = stamps != NAT_SECONDS
+    days, seconds = np.divmod(np.where(valid, stamps, 0), 86400)
+    for style in (False, True):
+        rows = valid & (plain == style)
+        if rows.any():
+            dates[rows] = _distinct(days[rows], lambda values: _date_texts(values, style))
+            times[rows] = _distinct(seconds[rows] // 60, _each(lambda minute: _time_text(minute, style)))
+    return dates, times
+
+
+def _row_line(cells):
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator='\n').writerow(cells)
+    return buf.getvalue()
+
+
+class _Strings:
+    """Strings to append to a strings file that is `size` bytes long now"""
+
+    def __init__(self, size):
+        self.size = size
+        self.data = bytearray()
+
+    def add(self, text):
+        """Queue a string; returns its offset in the file"""
+        offset = self.size + len(self.data)
+        if offset > MAX_OFFSET:
+            raise ValueError("The strings file of the binary log is full")
+        encoded = text.encode('utf-8')
+        self.data += len(encoded).to_bytes(4, 'little') + encoded
+        return offset
+
+
+def encode_frame(frame, strings, first_number=1):
+    """
+    Records of log rows given as text cells in LOG_COLUMNS
+
+    Comments, and the cells of rows their fields do not give back exactly,
+    are added to `strings`.
+
+    Args:
+        frame (DataFrame): rows as text, "" for blank cells
+        strings (_Strings): the strings file they go to
+        first_number (int): № the first row has when it follows its position
+    """
+    n = len(frame)
+    records = np.empty(n, dtype=RECORD_DTYPE)
+    records['timestamp'] = parse_timestamps(frame).to_numpy().astype('datetime64[s]').view(np.int64)
+    records['seconds'] = parse_seconds(frame).to_numpy(dtype=np.float32)
+    records['interval'] = pd.to_numeric(frame['Интервал'], errors='coerce').to_numpy(dtype=np.float32)
+
+    cells = {column: frame[column].to_numpy(dtype=object) for column in LOG_COLUMNS}
+    exact = cells["№"] == np.arange(first_number, first_number + n).astype(str)
+    exact &= cells["Продолж-сть"] == _distinct(records['seconds'], _each(_duration_text))
+    exact &= cells["Интервал"] == _distinct(records['interval'], _each(_interval_cell))
+    styles = {}
+    for plain in (False, True):
+        dates, times = _date_time_text(records['timestamp'], np.full(n, plain))
+        styles[plain] = (cells["Дата"] == dates) & (cells["Время"] == times)
+    records['text'] = np.where(styles[False], STYLE_PADDED, STYLE_PLAIN)
+    for position in np.flatnonzero(~(exact & (styles[False] | styles[True]))):
+        records['text'][position] = strings.add(_row_line([cells[column][position] for column in LOG_COLUMNS[:5]]))
+
+    records['comment'] = -1
+    offsets = {}
+    for position in np.flatnonzero(cells["Комментарии"] != ""):
+        comment = cells["Комментарии"][position]
+        if comment not in offsets:
+            offsets[comment] = strings.add(comment)
+        records['comment'][position] = offsets[comment]
+    return records
+
+
+def encode_record(record, position, strings):
+    """One SeizureRecord at a row position as a record, like encode_frame without pandas"""
+    row = np.empty(1, dtype=RECORD_DTYPE)
+    timestamp, seconds = record.timestamp, record.seconds
+    row['timestamp'] = NAT_SECONDS if timestamp is None else (timestamp - EPOCH) // timedelta(seconds=1)
+    row['seconds'] = np.nan if seconds is None else seconds
+    row['interval'] = np.nan if record.interval_days is None else record.interval_days
+    row['comment'] = strings.add(record.comment) if record.comment else -1
+
+    cells = [str(cell) for cell in record.to_row()[:5]]
+    stamp = int(row['timestamp'][0])
+    style = None
+    if (cells[0] == str(position + 1) and cells[3] == _duration_text(row['seconds'][0])
+            and cells[4] == _interval_cell(row['interval'][0])):
+        for candidate, plain in ((STYLE_PADDED, False), (STYLE_PLAIN, True)):
+            if stamp == NAT_SECONDS:
+                expected = ["", ""]
+            else:
+                day, second = divmod(stamp, 86400)
+                expected = [_date_texts([day], plain)[0], _time_text(second // 60, plain)]
+            if cells[1:3] == expected:
+                style = candidate
+                break
+    row['text'] = strings.add(_row_line(cells)) if style is None else style
+    return row
+
+
+def _map(path):
+    """Read-only memory map of a whole file (the header is always there, so it is never empty)"""
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class BinaryLogColumns:
+    """
+    A binary seizure log, memory-mapped.
+
+    The log file is a header and then one fixed-width RECORD_DTYPE record
+    per row; comments and the original cells of rows that can not be
+    rebuilt from their fields live in the strings file next to it. The
+    timestamp column is a zero-copy NumPy view of the mapping; durations and
+    intervals are read once as the numbers their cells show, and text cells
+    are only built when asked for. Offers what the seizure store reads from
+    SeizureColumns.
+
+    The mapping is a snapshot: records appended or a rewrite after it was
+    opened are only seen by opening the log again.
+    """
+
+    def __init__(self, records, strings):
+        self._records = records
+        self._strings = strings
+        self._intervals = None
+        self._seconds = None
+
+    @classmethod
+    def open(cls, path):
+        for _ in range(OPEN_ATTEMPTS):
+            log = _map(path)
+            strings = _map(strings_path(path))
+            if log[:8] != MAGIC or strings[:8] != STRINGS_MAGIC:
+                raise ValueError(f"{path} is not a binary seizure log")
+            if log[8:HEADER_SIZE] == strings[8:HEADER_SIZE]:
+                # A record cut short by a crash is left out; the next append overwrites it
+                count = (len(log) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+                return cls(np.frombuffer(log, dtype=RECORD_DTYPE, count=count, offset=HEADER_SIZE), strings)
+            # A rewrite has replaced the strings file but not the log yet
+            time.sleep(0.01)
+        raise RuntimeError(f"{path} does not match its strings file")
+
+    def __len__(self):
+        return len(self._records)
+
+    def _string(self, offset):
+        length = int.from_bytes(self._strings[offset:offset + 4], 'little')
+        return self._strings[offset + 4:offset + 4 + length].decode('utf-8')
+
+    def _cells(self, offset):
+        """The original №, Дата, Время, Продолж-сть and Интервал of a row kept in the strings file"""
+        return next(csv.reader(io.StringIO(self._string(offset))))
+
+    @property
+    def numbers(self):
+        numbers = np.arange(1, len(self) + 1, dtype=float)
+        text = self._records['text']
+        for position in np.flatnonzero(text >= 0):
+            number = SeizureRecord.from_row(self._cells(text[position])).number
+            numbers[position] = np.nan if number is None else number
+        return numbers
+
+    def _cell_values(self, field, shown, column, parse):
+        """
+        A float32 field as the numbers its cells show, NaN where blank or not a number
+
+        float32 keeps 323.5799 as 323.57989501953125, so statistics would not match
+        the CSV and SQLite backends; `shown` gives back the value of the cell text,
+        and cells kept in the strings file are parsed with `parse` as the CSV log is.
+        """
+        codes, uniques = pd.factorize(self._records[field])
+        values = np.array([shown(float(value)) for value in uniques] + [np.nan])[codes]
+        text = self._records['text']
+        kept = np.flatnonzero(text >= 0)
+        if len(kept):
+            index = LOG_COLUMNS.index(column)
+            cells = pd.Series([self._cells(offset)[index] for offset in text[kept]], dtype=object)
+            values[kept] = parse(cells).to_numpy(dtype=float)
+        return values
+
+    @property
+    def intervals(self):
+        """Интервал in days, NaN where blank or not a number"""
+        if self._intervals is None:
+            self._intervals = self._cell_values(
+                'interval', lambda days: round(days, INTERVAL_DECIMALS), "Интервал",
+                lambda cells: pd.to_numeric(cells, errors='coerce'),
+            )
+        return self._intervals
+
+    @property
+    def timestamps(self):
+        """Date and time of each row (datetime64[s]), NaT where they do not parse"""
+        return self._records['timestamp'].view('datetime64[s]')
+
+    @property
+    def seconds(self):
+        """Duration in seconds, NaN where blank or not a number"""
+        if self._seconds is None:
+            self._seconds = self._cell_values(
+                'seconds', lambda seconds: float(f"{seconds:g}"), "Продолж-сть", parse_duration_strings,
+            )
+        return self._seconds
+
+    def _comments(self, records):
+        comments = np.full(len(records), "", dtype=object)
+        for position in np.flatnonzero(records['comment'] >= 0):
+            comments[position] = self._string(records['comment'][position])
+        return comments
+
+    def _text_columns(self, start=0, stop=None):
+        """Text cells of rows start:stop as object arrays, by LOG_COLUMNS"""
+        records = self._records[start:stop]
+        text = records['text']
+        columns = {"№": np.array(list(map(str, range(start + 1, start + len(records) + 1))), dtype=object)}
+        columns["Дата"], columns["Время"] = _date_time_text(records['timestamp'], text == STYLE_PLAIN)
+        columns["Продолж-сть"] = _distinct(records['seconds'], _each(_duration_text))
+        columns["Интервал"] = _distinct(records['interval'], _each(_interval_cell))
+        for position in np.flatnonzero(text >= 0):
+            for column, cell in zip(LOG_COLUMNS, self._cells(text[position])):
+                columns[column][position] = cell
+        columns["Комментарии"] = self._comments(records)
+        return columns
+
+    def record(self, position):
+        """The SeizureRecord at a row position"""
+        columns = self._text_columns(position, position + 1)
+        return SeizureRecord.from_row([columns[column][0] for column in LOG_COLUMNS])
+
+    def last(self):
+        """The last row as a SeizureRecord, None for an empty log"""
+        return self.record(len(self) - 1) if len(self) else None
+
+    def text_frame(self):
+        """The log as text cells in LOG_COLUMNS, like read_log_text reads the CSV"""
+        return pd.DataFrame(self._text_columns(), columns=LOG_COLUMNS)
+
+    def frame(self):
+        """The log the way pd.read_csv(skiprows=1) reads its CSV: № and Интервал numeric, blank text cells NaN"""
+        columns = self._text_columns()
+        numbers = self.numbers
+        data = {"№": numbers.astype(np.int64) if not np.isnan(numbers).any() else numbers}
+        for column in ("Дата", "Время", "Продолж-сть", "Комментарии"):
+            values = columns[column]
+            values[values == ""] = np.nan
+            data[column] = values
+        data["Интервал"] = self.intervals.copy()
+        return pd.DataFrame(data, columns=LOG_COLUMNS)
+
+    def typed_frame(self):
+        """Typed columns: 'timestamp', 'seconds', 'interval_days' and 'comment' ("" for blank)"""
+        return pd.DataFrame({
+            'timestamp': self.timestamps.astype('datetime64[ns]'),
+            'seconds': self.seconds.copy(),
+            'interval_days': self.intervals.copy(),
+            'comment': self._comments(self._records),
+        })
+
+    def iter_csv(self, chunk_rows=10_000):
+        """The log as UTF-8 CSV chunks in the two-header-row layout, cell for cell as imported"""
+        yield (_row_line(SEIZURE_TITLE) + _row_line(LOG_COLUMNS)).encode('utf-8')
+        for start in range(0, len(self), chunk_rows):
+            columns = self._text_columns(start, start + chunk_rows)
+            buf = io.StringIO()
+            csv.writer(buf, lineterminator='\n').writerows(zip(*(columns[column] for column in LOG_COLUMNS)))
+            yield buf.getvalue().encode('utf-8')
+
+
+def write_log(path, frame):
+    """Replace the binary log at `path` with rows given as text cells in LOG_COLUMNS"""
+    generation = os.urandom(8)
+    strings = _Strings(HEADER_SIZE)
+    records = encode_frame(frame.reset_index(drop=True), strings)
+    # Strings first: a reader that maps the old log with the new strings
+    # sees the generations differ and opens both again
+    with atomic_write(strings_path(path), 'wb') as f:
+        f.write(STRINGS_MAGIC + generation)
+        f.write(strings.data)
+    with atomic_write(path, 'wb') as f:
+        f.write(MAGIC + generation)
+        f.write(records.tobytes())
+
+
+def append_record(path, record):
+    """
+    Append one SeizureRecord to the binary log in O(1); call with the log's file lock held
+
+    Its strings go to the end of the strings file first, so a reader never
+    sees a record whose strings are not there yet.
+    """
+    with open(path, 'r+b') as log, open(strings_path(path), 'r+b') as strings_file:
+        count = (log.seek(0, os.SEEK_END) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        strings = _Strings(strings_file.seek(0, os.SEEK_END))
+        row = encode_record(record, count, strings)
+        strings_file.write(strings.data)
+        strings_file.flush()
+        # Drop a record cut short by a crash
+        log.truncate(HEADER_SIZE + count * RECORD_DTYPE.itemsize)
+        log.seek(0, os.SEEK_END)
+        log.write(row.tobytes())
+
+
+class BinarySeizureStore(SeizureStore):
+    """SeizureStore over a binary log: loading maps the file, nothing is parsed"""
+
+    def _load(self):
+        self._records = BinaryLogColumns.open(self.csv_path)
+        self._frame = None
+        self._columns = None
+        self._index = None
+        self._pending_lines = []
+
+    def _flush_pending(self):
+        """Map the log again to see the records appended since the last read"""
+        if not self._pending_lines:
+            return
+        self._pending_lines = []
+        self._records = BinaryLogColumns.open(self.csv_path)
+        self._frame = None
+        self._columns = None
+
+
+class BinaryLogManager(CSVManager):
+    """
+    Seizure log kept as a memory-mapped binary file (see BinaryLogColumns).
+
+    Same contract as CSVManager. A seizure after the last one is one
+    fixed-width record appended to the file; back-dated seizures, edits,
+    deletes and imports rewrite it, as the CSV backend does. The log reads
+    back as the two-header-row CSV it was imported from, so /send_file
+    still hands out the spreadsheet.
+    """
+
+    def _create_empty_csv(self):
+        """Create an empty binary log"""
+        write_log(self.csv_path, pd.DataFrame(columns=LOG_COLUMNS))
+
+    def is_empty(self):
+        self._ensure_file()
+        return len(self.store.records()) == 0
+
+    def _read_tail(self):
+        return self.store.records().last(), True
+
+    def _append_record(self, record, ends_with_newline):
+        append_record(self.csv_path, record)
+        return record.to_line()
+
+    def _read_log_text(self):
+        return self.store.records().text_frame()
+
+    def _write_log_text(self, frame):
+        write_log(self.csv_path, frame)
+
+    def iter_seizure_csv(self, chunk_rows=10_000):
+        """Stream the seizure log as CSV for send_file_handler"""
+        self._ensure_file()
+        return self.store.records().iter_csv(chunk_rows)
+
+    def migrate_from_csv(self, csv_path):
+        """
+        One-shot import of the CSV log into an empty binary log
+
+        Cells are kept exactly, so exporting back gives the same spreadsheet.
+
+        Returns:
+            int: seizure rows imported
+        """
+        if not self.is_empty():
+            raise RuntimeError(f"{self.csv_path} already has data, refusing to migrate twice")
+        frame = read_log_text(csv_path)
+        with self._write_lock, file_lock(self.csv_path):
+            write_log(self.csv_path, frame)
+        return len(frame)
+
+
+if __name__ == "__main__":
+    # python -m services.binary_log import seizure.csv seizure.bin
+    # python -m services.binary_log export seizure.bin seizure.csv
+    import sys
+
+    command, source, target = sys.argv[1:4]
+    if command == "import":
+        write_log(target, read_log_text(source))
+    elif command == "export":
+        with atomic_write(target, 'wb') as f:
+            for chunk in BinaryLogColumns.open(source).iter_csv():
+                f.write(chunk)
+    else:
+        sys.exit(f"Unknown command {command!r}, expected import or export")
@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+
+from services.seizure_store import get_seizure_store
+
+
+def chart_key(data_path, chart_type, **params):
+    """Cache key of a chart: data version of the log plus chart type and parameters"""
+    store = get_seizure_store(data_path)
+    if params.get('treatments'):
+        # The treatment overlay also changes with the medicine log
+        params['medicine_version'] = store.medicine_signature(params['treatments'])
+    return store.csv_path, store.current_version(), chart_type, tuple(sorted(params.items()))
+
+
+class ChartCache:
+    """
+    In-memory cache of rendered chart PNGs.
+
+    Keys are (csv path, data version, chart type, params) tuples, so a new
+    seizure changes the version and old entries are simply never hit again;
+    they are dropped as soon as a chart for the newer version is stored.
+    Each entry also remembers the Telegram file_id of the uploaded photo so
+    repeat sends do not upload the image again.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached entry {'png': bytes, 'file_id': str or None} or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, png):
+        """
+        Store rendered PNG bytes and drop entries of older data versions
+
+        A slow render that finishes after a chart of a newer version was
+        stored is returned to its caller but not cached.
+        """
+        path, version = key[0], key[1]
+        entry = {'png': png, 'file_id': None}
+        with self._lock:
+            if any(k[0] == path and k[1] > version for k in self._entries):
+                return entry
+            stale = [k for k in self._entries if k[0] == path and k[1] < version]
+            for k in stale:
+                del self._entries[k]
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
+
+    def set_file_id(self, key, file_id):
+        """Remember the Telegram file_id of an uploaded chart"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['file_id'] = file_id
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Create a singleton instance
+chart_cache = ChartCache()
@@ -1,181 +1,347 @@
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 import io
-from datetime import datetime
 import matplotlib.dates as mdates
+from matplotlib.collections import PolyCollection
 from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.ticker import MaxNLocator
+from config import chart_max_points
+from services.seizure_store import get_seizure_store, parse_timestamps, parse_seconds
+from utils.date_parser import format_date_range
+
+# Bins of the aggregated view: pandas frequency and approximate length in days
+PERIODS = {
+    'week': ('W-MON', 7),
+    'month': ('MS', 30),
+}
+PERIOD_TITLES = {
+    'week': "по неделям",
+    'month': "по месяцам",
+}
+# Beyond this many visible treatment changes only thin markers are drawn, no spans or labels
+MAX_TREATMENT_SPANS = 40
+TREATMENT_COLORS = ('tab:green', 'tab:olive')
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Pick `n_out` points that keep the shape of the series (Largest-Triangle-Three-Buckets)
+
+    Args:
+        x, y (ndarray): float coordinates without NaN, x ascending
+        n_out (int): point budget; the first and last points are always kept
+
+    Returns:
+        ndarray: sorted indices of the kept points
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets over the inner points; each contributes one point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    sizes = ends - starts
+    # Average point of every bucket, used as the third triangle corner of the bucket before it
+    avg_x = np.append(np.add.reduceat(x, starts) / sizes, x[-1])
+    avg_y = np.append(np.add.reduceat(y, starts) / sizes, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
 
 
 class ChartGenerator:
-    def __init__(self, seizure_csv_path):
-        """Initialize chart generator with path to seizure data"""
+    def __init__(self, seizure_csv_path, max_points=chart_max_points):
+        """
+        Initialize chart generator with path to seizure data
+
+        Args:
+            seizure_csv_path (str): Seizure log (CSV or SQLite database)
+            max_points (int): Most points drawn in the raw view; longer logs are decimated
+        """
         self.seizure_csv_path = seizure_csv_path
+        self.max_points = max_points
 
-    def _load_data(self):
-        """Load and clean the seizure data"""
-        df = pd.read_csv(self.seizure_csv_path, skiprows=1)
-        if 'Unnamed: 0' in df.columns and '№' not in df.columns:
-            df = df.rename(columns={'Unnamed: 0': '№'})
+    def render(self, chart_type, period=None, start=None, end=None, treatments=None):
+        """
+        Render a chart by type ('interval' or 'duration') and return the PNG buffer
 
-        return df
+        Args:
+            period (str): None for every seizure, 'week' or 'month' for aggregated bins
+            start, end (datetime): Only seizures with start <= time < end; None for no limit
+            treatments (str): Medicine log (CSV or SQLite path) to overlay treatment periods from
+        """
+        renderers = {
+            'interval': self.generate_interval_chart,
+            'duration': self.generate_duration_chart,
+        }
+        return renderers[chart_type](period, start, end, treatments)
+
+    def _load_data(self, start=None, end=None):
+        """Load the seizure data from the shared store (parsed once per file change)"""
+        store = get_seizure_store(self.seizure_csv_path)
+        if start is None and end is None:
+            return store.frame()
+        return store.frame().iloc[store.positions_between(start, end)]
+
+    def _load_treatments(self, medicine_path):
+        """Treatment timeline cached by the seizure store, or None without an overlay"""
+        if not medicine_path:
+            return None
+        return get_seizure_store(self.seizure_csv_path).treatment_timeline(medicine_path)
+
+    @staticmethod
+    def _draw_treatments(ax, timeline):
+        """Shade treatment periods and label where each one starts, within the current x range"""
+        if timeline is None or timeline.empty:
+            return
+        left, right = ax.get_xlim()
+        starts = mdates.date2num(timeline['start'].to_numpy())
+        ends = timeline['end'].to_numpy()
+        ends = np.where(np.isnat(ends), right, mdates.date2num(ends))
+        visible = np.flatnonzero((ends > left) & (starts < right))
+
+        # x in data units, y in axes units (0..1): spans and markers cover the full height
+        transform = ax.get_xaxis_transform()
+        shown = visible[starts[visible] >= left]
+        if len(visible) > MAX_TREATMENT_SPANS:
+            ax.vlines(starts[shown], 0, 1, transform=transform, colors='tab:green', linewidth=0.5, alpha=0.5)
+            return
+
+        # One collection for all spans and one for all markers, not an artist per treatment
+        spans = [
+            [(max(starts[i], left), 0), (max(starts[i], left), 1), (min(ends[i], right), 1), (min(ends[i], right), 0)]
+            for i in visible
+        ]
+        ax.add_collection(PolyCollection(
+            spans, facecolors=[TREATMENT_COLORS[i % 2] for i in visible], alpha=0.12,
+            linewidths=0, transform=transform,
+        ), autolim=False)
+        ax.vlines(starts[shown], 0, 1, transform=transform, colors='tab:green', linestyles=':', linewidth=1)
+        for i in shown:
+            label = timeline['label'].iat[i]
+            label = label if len(label) <= 40 else label[:39] + "…"
+            ax.text(starts[i], 0.98, f" {label} ({timeline['seizures'].iat[i]} пр.)",
+                    transform=transform, rotation=90, va='top', ha='right', fontsize=7, color='darkgreen')
+        # Markers must not widen the axis
+        ax.set_xlim(left, right)
+
+    @staticmethod
+    def _range_title(start, end):
+        """' (01.01.2025 – 30.06.2025)' for a date range, '' for the whole history"""
+        if start is None and end is None:
+            return ""
+        return f" ({format_date_range(start, end)})"
+
+    @staticmethod
+    def _normalize(values):
+        """Divide by the maximum, keeping the built-in max() rule that a leading NaN wins"""
+        if not len(values):
+            return values
+        max_value = values[0] if np.isnan(values[0]) else np.nanmax(values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return values / max_value
 
     def _prepare_interval_data(self, df):
         """Extract dates and intervals from data"""
-        dates = []
-        intervals = []
-
-        for idx, row in df.iterrows():
-            try:
-                date_str = row['Дата']
-                time_str = row['Время']
-                dt = datetime.strptime(f"{date_str} {time_str}", "%m/%d/%Y %H:%M")
-                dates.append(dt)
-
-                interval_str = str(row.get('Интервал', ''))
-                if interval_str and interval_str.strip():
-                    try:
-                        intervals.append(float(interval_str))
-                    except ValueError:
-                        intervals.append(None)
-                else:
-                    intervals.append(None)
-            except Exception as e:
-                print(f"Error processing row {idx}: {e}")
-
-        # Filter out None values
-        valid_indices = [i for i, val in enumerate(intervals) if val is not None]
-        filtered_dates = [dates[i] for i in valid_indices]
-        filtered_intervals = [intervals[i] for i in valid_indices]
-        normalized_intervals = []
-        if filtered_intervals:
-            max_interval = max(filtered_intervals)
-            normalized_intervals = [i / max_interval for i in filtered_intervals]
+        timestamps = parse_timestamps(df)
+        if 'Интервал' in df:
+            raw = df['Интервал']
+            intervals = pd.to_numeric(raw, errors='coerce')
+            # Blank cells stay in as NaN, text that is not a number is dropped
+            mask = timestamps.notna() & (intervals.notna() | raw.isna())
+        else:
+            intervals = pd.Series(np.nan, index=df.index)
+            mask = pd.Series(False, index=df.index)
+
+        mask = mask.to_numpy()
+        filtered_dates = timestamps.to_numpy()[mask]
+        filtered_intervals = intervals.to_numpy(dtype=float)[mask]
+        normalized_intervals = self._normalize(filtered_intervals)
 
         return filtered_dates, filtered_intervals, normalized_intervals
 
     def _prepare_duration_data(self, df):
         """Extract dates and durations from data"""
-        dates = []
-        durations = []
-
-        for idx, row in df.iterrows():
-            try:
-                date_str = row['Дата']
-                time_str = row['Время']
-                dt = datetime.strptime(f"{date_str} {time_str}", "%m/%d/%Y %H:%M")
-                dates.append(dt)
-
-                duration_str = str(row.get('Продолж-сть', ''))
-                if 'сек' in duration_str:
-                    duration_str = duration_str.replace('сек', '').strip()
-                if duration_str and duration_str.strip() and duration_str.strip().replace('.', '', 1).isdigit():
-                    durations.append(float(duration_str))
-                else:
-                    durations.append(None)
-            except Exception as e:
-                print(f"Error processing row {idx}: {e}")
-
-        valid_indices = [i for i, val in enumerate(durations) if val is not None]
-        filtered_dates = [dates[i] for i in valid_indices]
-        filtered_durations = [durations[i] for i in valid_indices]
-
-        normalized_durations = []
-        if filtered_durations:
-            max_duration = max(filtered_durations)
-            normalized_durations = [d / max_duration for d in filtered_durations]
+        timestamps = parse_timestamps(df)
+        durations = parse_seconds(df)
+
+        mask = (timestamps.notna() & durations.notna()).to_numpy()
+        filtered_dates = timestamps.to_numpy()[mask]
+        filtered_durations = durations.to_numpy(dtype=float)[mask]
+        normalized_durations = self._normalize(filtered_durations)
 
         return filtered_dates, filtered_durations, normalized_durations
 
-    def generate_interval_chart(self):
+    @staticmethod
+    def _new_figure():
+        """Create a standalone Agg figure; no global pyplot state is involved"""
+        fig = Figure(figsize=(10, 6))
+        FigureCanvasAgg(fig)
+        return fig
+
+    @staticmethod
+    def _to_png(fig):
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png')
+        buf.seek(0)
+        return buf
+
+    def _empty_chart(self, title):
+        fig = self._new_figure()
+        ax = fig.add_subplot()
+        ax.text(0.5, 0.5, "Недостаточно данных для построения графика",
+                horizontalalignment='center', verticalalignment='center',
+                transform=ax.transAxes, fontsize=14)
+        ax.set_title(title)
+        return self._to_png(fig)
+
+    def _decimate(self, dates, values, normalized):
+        """Keep at most max_points points, chosen by LTTB; short series are returned as is"""
+        if len(dates) <= self.max_points:
+            return dates, values, normalized
+        finite = np.flatnonzero(~np.isnan(values))
+        if len(finite) <= self.max_points:
+            # Mostly blank cells (none at all when every interval is blank): nothing to thin out
+            return dates[finite], values[finite], normalized[finite]
+        x = (dates[finite] - dates[finite[0]]) / np.timedelta64(1, 'D')
+        keep = finite[lttb_indices(x.astype(float), values[finite], self.max_points)]
+        return dates[keep], values[keep], normalized[keep]
+
+    def _aggregate(self, dates, values, period, rows):
+        """
+        Bin a series by week or month
+
+        Args:
+            rows (Index): Rows of the seizure log the chart covers, for the seizure counts
+
+        Returns:
+            DataFrame: indexed by bin start, with 'count' (seizures in the bin, all of
+                       them, not only those with a value), 'mean' and 'max'
+        """
+        freq = PERIODS[period][0]
+        timestamps = get_seizure_store(self.seizure_csv_path).columns()['timestamp'].loc[rows].dropna()
+        counts = pd.Series(1, index=timestamps.to_numpy()).resample(freq, label='left', closed='left').size()
+        series = pd.Series(values, index=dates).dropna()
+        bins = series.resample(freq, label='left', closed='left').agg(['mean', 'max'])
+        return bins.join(counts.rename('count'), how='outer').fillna({'count': 0})
+
+    def _aggregate_chart(self, dates, values, period, rows, color, title, ylabel, treatments=None):
+        bins = self._aggregate(dates, values, period, rows)
+        freq, days = PERIODS[period]
+
+        fig = self._new_figure()
+        ax = fig.add_subplot()
+        count_ax = ax.twinx()
+        # One stepped area instead of a bar patch per bin keeps decades of weeks cheap to draw
+        edges = pd.date_range(bins.index[0], periods=len(bins) + 1, freq=freq)
+        counts = np.append(bins['count'].to_numpy(), bins['count'].iloc[-1])
+        count_ax.fill_between(edges, counts, step='post', color='lightgray', label='Количество приступов')
+        count_ax.set_ylabel("Количество приступов")
+        count_ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+        # Value lines above the count bars
+        ax.set_zorder(count_ax.get_zorder() + 1)
+        ax.patch.set_visible(False)
+
+        centers = bins.index + pd.Timedelta(days=days / 2)
+        ax.fill_between(centers, bins['mean'], bins['max'], color=color, alpha=0.25, label='Среднее – максимум')
+        # Markers keep bins without neighbours visible; empty bins leave gaps
+        ax.plot(centers, bins['mean'], '-o', markersize=3, color=color, label='Среднее')
+        ax.plot(centers, bins['max'], '--', marker='^', markersize=3, color=color, alpha=0.7, label='Максимум')
+
+        handles, labels = ax.get_legend_handles_labels()
+        count_handles, count_labels = count_ax.get_legend_handles_labels()
+        ax.legend(handles + count_handles, labels + count_labels, loc='upper left')
+        self._draw_treatments(ax, treatments)
+
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d/%Y'))
+        fig.autofmt_xdate()
+
+        ax.set_title(title)
+        ax.set_xlabel("Дата")
+        ax.set_ylabel(ylabel)
+        ax.grid(True, alpha=0.3)
+
+        return self._to_png(fig)
+
+    def _scatter_chart(self, dates, values, normalized, cmap, cbar_label, title, ylabel, treatments=None):
+        dates, values, normalized = self._decimate(dates, values, normalized)
+        fig = self._new_figure()
+        ax = fig.add_subplot()
+        scatter = ax.scatter(dates, values, c=normalized, cmap=cmap, s=100, alpha=0.7)
+        ax.plot(dates, values, '-', color='gray', alpha=0.5)
+
+        cbar = fig.colorbar(scatter, ax=ax)
+        cbar.set_label(cbar_label)
+        self._draw_treatments(ax, treatments)
+
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d/%Y'))
+        fig.autofmt_xdate()
+
+        ax.set_title(title)
+        ax.set_xlabel("Дата")
+        ax.set_ylabel(ylabel)
+        ax.grid(True, alpha=0.3)
+
+        return self._to_png(fig)
+
+    def generate_interval_chart(self, period=None, start=None, end=None, treatments=None):
         """
         Generate chart showing intervals between seizures
-        Longer intervals (good) are shown in blue, shorter in red
+        Longer intervals (good) are shown in blue, shorter in red;
+        with `period` ('week'/'month') seizure counts and mean/max bands per bin;
+        `start`/`end` limit the chart to a date range, `treatments` overlays the medicine log
         """
-        df = self._load_data()
+        df = self._load_data(start, end)
         dates, intervals, normalized_intervals = self._prepare_interval_data(df)
+        date_range = self._range_title(start, end)
+        timeline = self._load_treatments(treatments)
 
-        if not dates or not intervals:
-            plt.figure(figsize=(10, 6))
-            plt.text(0.5, 0.5, "Недостаточно данных для построения графика",
-                     horizontalalignment='center', verticalalignment='center',
-                     transform=plt.gca().transAxes, fontsize=14)
-            plt.title("График интервалов между приступами")
+        if not len(dates) or not len(intervals):
+            return self._empty_chart("График интервалов между приступами" + date_range)
 
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png')
-            buf.seek(0)
-            plt.close()
-            return buf
+        if period:
+            return self._aggregate_chart(dates, intervals, period, df.index, 'blue',
+                                         f"Интервалы между приступами {PERIOD_TITLES[period]}" + date_range,
+                                         "Интервал (дни)", timeline)
 
         cmap = LinearSegmentedColormap.from_list('interval_cmap', ['red', 'yellow', 'blue'])
+        return self._scatter_chart(dates, intervals, normalized_intervals, cmap,
+                                   'Относительная длина интервала',
+                                   "Интервалы между приступами" + date_range, "Интервал (дни)", timeline)
 
-        plt.figure(figsize=(10, 6))
-        scatter = plt.scatter(dates, intervals, c=normalized_intervals, cmap=cmap,
-                              s=100, alpha=0.7)
-        plt.plot(dates, intervals, '-', color='gray', alpha=0.5)
-
-        cbar = plt.colorbar(scatter)
-        cbar.set_label('Относительная длина интервала')
-
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%m/%d/%Y'))
-        plt.gcf().autofmt_xdate()
-
-        plt.title("Интервалы между приступами")
-        plt.xlabel("Дата")
-        plt.ylabel("Интервал (дни)")
-        plt.grid(True, alpha=0.3)
-
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        plt.close()
-
-        return buf
-
-    def generate_duration_chart(self):
+    def generate_duration_chart(self, period=None, start=None, end=None, treatments=None):
         """
         Generate chart showing seizure durations
-        Shorter durations (good) are shown in blue, longer in red
+        Shorter durations (good) are shown in blue, longer in red;
+        with `period` ('week'/'month') seizure counts and mean/max bands per bin;
+        `start`/`end` limit the chart to a date range, `treatments` overlays the medicine log
         """
-        df = self._load_data()
+        df = self._load_data(start, end)
         dates, durations, normalized_durations = self._prepare_duration_data(df)
+        date_range = self._range_title(start, end)
+        timeline = self._load_treatments(treatments)
 
-        if not dates or not durations:
-            plt.figure(figsize=(10, 6))
-            plt.text(0.5, 0.5, "Недостаточно данных для построения графика",
-                     horizontalalignment='center', verticalalignment='center',
-                     transform=plt.gca().transAxes, fontsize=14)
-            plt.title("График продолжительности приступов")
+        if not len(dates) or not len(durations):
+            return self._empty_chart("График продолжительности приступов" + date_range)
 
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png')
-            buf.seek(0)
-            plt.close()
-            return buf
+        if period:
+            return self._aggregate_chart(dates, durations, period, df.index, 'red',
+                                         f"Продолжительность приступов {PERIOD_TITLES[period]}" + date_range,
+                                         "Продолжительность (сек)", timeline)
 
         # Blue for short durations, red for long durations
         cmap = LinearSegmentedColormap.from_list('duration_cmap', ['blue', 'yellow', 'red'])
-
-        plt.figure(figsize=(10, 6))
-        scatter = plt.scatter(dates, durations, c=normalized_durations, cmap=cmap,
-                              s=100, alpha=0.7)
-        plt.plot(dates, durations, '-', color='gray', alpha=0.5)
-
-        cbar = plt.colorbar(scatter)
-        cbar.set_label('Относительная продолжительность')
-
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%m/%d/%Y'))
-        plt.gcf().autofmt_xdate()
-
-        plt.title("Продолжительность приступов")
-        plt.xlabel("Дата")
-        plt.ylabel("Продолжительность (сек)")
-        plt.grid(True, alpha=0.3)
-
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        plt.close()
-
-        return buf
\ No newline at end of file
+        return self._scatter_chart(dates, durations, normalized_durations, cmap,
+                                   'Относительная продолжительность',
+                                   "Продолжительность приступов" + date_range, "Продолжительность (сек)",
+                                   timeline)
@@ -0,0 +1,138 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from config import chart_workers, chart_max_concurrency, chart_timeout
+from services.chart_cache import chart_cache, chart_key
+from services.metrics import chart_render_seconds, chart_cache_total
+
+_executor = None
+_semaphore = asyncio.Semaphore(chart_max_concurrency)
+# Cache key -> task rendering that chart right now; identical requests await it
+_in_flight = {}
+
+
+def _render_in_worker(csv_path, chart_type, params):
+    """Runs inside a worker process; each worker keeps its own seizure store cache"""
+    # matplotlib is only ever imported in the workers, never by the bot process
+    from services.chart_generator import ChartGenerator
+
+    return ChartGenerator(csv_path).render(chart_type, **params).getvalue()
+
+
+def _warm_up_worker(csv_path):
+    """Import matplotlib and parse the log in a worker ahead of the first render"""
+    from services.chart_generator import ChartGenerator
+
+    ChartGenerator(csv_path)._load_data()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # spawn: never fork a process that is running the event loop and its threads
+        _executor = ProcessPoolExecutor(
+            max_workers=chart_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _executor
+
+
+async def render_chart(csv_path, chart_type, timeout=chart_timeout, **params):
+    """
+    Render a chart in the worker pool without blocking the event loop
+
+    Extra keyword arguments (e.g. period='month') go to ChartGenerator.render.
+
+    Raises:
+        asyncio.TimeoutError: if rendering takes longer than `timeout` seconds
+    """
+    await _semaphore.acquire()
+    try:
+        work = _get_executor().submit(_render_in_worker, csv_path, chart_type, params)
+    except Exception:
+        _semaphore.release()
+        raise
+    # The slot is given back when the worker is done with the chart, not when we stop
+    # waiting: a render that timed out keeps its process busy until it finishes
+    work.add_done_callback(partial(_release_slot, asyncio.get_running_loop()))
+    with chart_render_seconds.time(chart_type):
+        # Timing out (or being cancelled) drops the render if no worker has started it yet
+        return await asyncio.wait_for(asyncio.wrap_future(work), timeout)
+
+
+def _release_slot(loop, work):
+    try:
+        loop.call_soon_threadsafe(_semaphore.release)
+    except RuntimeError:
+        # The loop is closed: nothing waits for a slot any more
+        pass
+
+
+async def warm_up(csv_path):
+    """Start the worker processes and let each load matplotlib and the seizure log"""
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    await asyncio.gather(*(
+        loop.run_in_executor(executor, _warm_up_worker, csv_path) for _ in range(chart_workers)
+    ))
+
+
+async def _render_and_cache(key, csv_path, chart_type, params):
+    png = await render_chart(csv_path, chart_type, **params)
+    return chart_cache.put(key, png)
+
+
+def _render_done(key, task):
+    if _in_flight.get(key) is task:
+        del _in_flight[key]
+    if not task.cancelled():
+        # Mark the error as retrieved even if every waiter has gone away
+        task.exception()
+
+
+async def get_chart(csv_path, chart_type, **params):
+    """
+    Return a chart from the cache, rendering it in the pool only if the log changed
+
+    Charts with different parameters (see ChartGenerator.render) are cached separately.
+    Requests for a chart that is being rendered right now (several admins
+    opening the charts after a new seizure) wait for that render instead of
+    starting their own.
+
+    Returns:
+        tuple: (cache key, cache entry with 'png' bytes and Telegram 'file_id')
+    """
+    # The version check may wait for the store's lock while another thread reloads the log
+    key = await asyncio.to_thread(chart_key, csv_path, chart_type, **params)
+    entry = chart_cache.get(key)
+    if entry is not None:
+        chart_cache_total.inc("hit")
+        return key, entry
+
+    task = _in_flight.get(key)
+    if task is None:
+        chart_cache_total.inc("miss")
+        task = _in_flight[key] = asyncio.ensure_future(_render_and_cache(key, csv_path, chart_type, params))
+        task.add_done_callback(partial(_render_done, key))
+    else:
+        chart_cache_total.inc("coalesced")
+    # One waiter giving up (e.g. its handler was cancelled) must not cancel the others' render
+    return key, await asyncio.shield(task)
+
+
+async def drain():
+    """Cancel the renders in flight and wait until they are done; call before shutdown()"""
+    tasks = list(_in_flight.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def shutdown():
+    """Stop the worker processes, dropping renders that have not started yet"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
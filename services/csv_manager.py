@@ -1,18 +1,44 @@
-import pandas as pd
+import csv
+import logging
 import os
+import threading
 from datetime import datetime
-from config import path_to_csv
+from services.records import SeizureRecord
+from services.seizure_edit import SortedLog
+from services.seizure_import import merge_rows, read_log_text, write_log_text
+from services.seizure_store import DATE_FORMAT, TIME_FORMAT, get_seizure_store, interval_days
+from services.write_events import write_events
+from utils.atomic_file import atomic_write
+from utils.file_lock import file_lock
+from utils.lazy_import import lazy_import
+
+logger = logging.getLogger(__name__)
+
+pd = lazy_import("pandas")
 
 
 class CSVManager:
     def __init__(self, csv_path):
         self.csv_path = csv_path
+        # Last record of the file, invalidated by the file's mtime/size
+        self._tail = None
+        # Serializes appends within the process; file_lock covers other processes
+        self._write_lock = threading.Lock()
+        self.store = get_seizure_store(csv_path)
+        # The file is checked/created on first use, not at import time
+        self._file_ready = False
+
+    def _ensure_file(self):
+        """Create the directory and an empty CSV with headers if they do not exist yet"""
+        if self._file_ready:
+            return
         # Ensure the directory exists
-        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        os.makedirs(os.path.dirname(self.csv_path), exist_ok=True)
 
         # Check if file exists, if not create it with headers
-        if not os.path.exists(csv_path):
+        if not os.path.exists(self.csv_path):
             self._create_empty_csv()
+        self._file_ready = True
 
     def _create_empty_csv(self):
         """Create an empty CSV file with appropriate headers"""
@@ -25,20 +51,77 @@ class CSVManager:
 
         # Create DataFrame with headers
         df = pd.DataFrame([headers, subheaders])
-        df.to_csv(self.csv_path, index=False, header=False)
+        with atomic_write(self.csv_path) as f:
+            df.to_csv(f, index=False, header=False)
 
     def get_data(self):
-        """Read the CSV file and return as DataFrame"""
+        """Return the seizure log as DataFrame (shared, read-only)"""
         try:
-            df = pd.read_csv(self.csv_path, skiprows=1)  # Skip the title row
-            return df
-        except Exception as e:
-            print(f"Error reading CSV: {e}")
+            self._ensure_file()
+            return self.store.frame()
+        except Exception:
+            logger.exception("Error reading CSV")
             return pd.DataFrame()
 
+    def _file_signature(self):
+        """Return (mtime, size) of the CSV file, used to detect outside edits"""
+        st = os.stat(self.csv_path)
+        return st.st_mtime_ns, st.st_size
+
+    def _read_tail(self):
+        """
+        Read the last record of the CSV file without parsing the whole file
+
+        Returns:
+            tuple: (last SeizureRecord or None, whether the file ends with a newline)
+        """
+        with open(self.csv_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return None, True
+
+            block = 4096
+            while True:
+                start = max(0, size - block)
+                f.seek(start)
+                chunk = f.read(size - start)
+                lines = chunk.decode('utf-8', errors='replace').splitlines()
+                if start > 0:
+                    # The first line of the chunk may be cut in the middle
+                    lines = lines[1:]
+                rows = [row for row in csv.reader(lines) if any(cell.strip() for cell in row)]
+                # Need at least two complete rows so a quoted multi-line comment
+                # in the last record can not be mistaken for a record on its own
+                if start == 0 or len(rows) >= 2:
+                    break
+                block *= 4
+
+        ends_with_newline = chunk.endswith(b'\n')
+        if not rows:
+            return None, ends_with_newline
+        return SeizureRecord.from_row(rows[-1]), ends_with_newline
+
+    def _get_tail(self):
+        """Return the cached tail index, refreshing it if the file changed on disk"""
+        signature = self._file_signature()
+        if self._tail is None or self._tail['signature'] != signature:
+            record, ends_with_newline = self._read_tail()
+            self._tail = {
+                'signature': signature,
+                'record': record,
+                'ends_with_newline': ends_with_newline,
+            }
+        return self._tail
+
     def add_seizure_record(self, datetime_str, duration, comment=""):
         """
-        Add a new seizure record to the CSV file
+        Add a new seizure record to the CSV file.
+
+        A seizure at or after the last row is appended to the end of the file;
+        the number and interval are taken from an in-memory tail index instead
+        of re-reading the whole log. An earlier (back-dated) one is put in its
+        place in time order, see SortedLog.insert.
 
         Args:
             datetime_str (str): Date and time in format 'YYYY-MM-DD HH:MM'
@@ -46,106 +129,221 @@ class CSVManager:
             comment (str): Optional comment
 
         Returns:
-            tuple: (Success status, interval in days)
+            tuple: (Success status, interval in days since the previous seizure)
         """
         try:
             # Parse the datetime
             dt = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
 
-            # Format date as MM/DD/YYYY for CSV
-            date_str = dt.strftime("%m/%d/%Y")
-            # Format time as HH:MM for CSV
-            time_str = dt.strftime("%H:%M")
-
-            # Read existing data
-            df = self.get_data()
-
-            # Calculate the row number for the new entry
-            if df.empty or len(df.columns) < 6:
-                new_row_num = 1
-                interval = ""
-            else:
-                # Clean up column names if needed
-                if '№' not in df.columns and 'Unnamed: 0' in df.columns:
-                    df = df.rename(columns={'Unnamed: 0': '№'})
-
-                # Get the last row number
-                try:
-                    last_row_num = int(df['№'].iloc[-1])
-                    new_row_num = last_row_num + 1
-                except:
+            with self._write_lock, file_lock(self.csv_path):
+                self._ensure_file()
+                tail = self._get_tail()
+                last = tail['record']
+
+                days = None
+                if last is None or last.number is None:
+                    # Empty log, or a header/garbage row at the end: numbering starts over
                     new_row_num = 1
+                else:
+                    new_row_num = last.number + 1
+                    last_dt = last.timestamp
+                    if last_dt is None or dt < last_dt:
+                        # Not after the last row (or that row is unreadable): find its place
+                        log = self._sorted_log()
+                        days = log.insert(dt, duration, comment)
+                        self._write_log(log)
+                        write_events.publish(self.csv_path)
+                        return True, days
 
-                # Calculate interval if possible
-                interval_days = None
-                try:
-                    last_date = df['Дата'].iloc[-1]
-                    last_time = df['Время'].iloc[-1]
-                    last_dt = datetime.strptime(f"{last_date} {last_time}", "%m/%d/%Y %H:%M")
-
-                    # Calculate days between seizures
-                    delta = (dt - last_dt).days
-                    interval = str(delta) if delta > 0 else "0"
-                    interval_days = delta
-                except:
-                    interval = ""
-
-            # Create new row
-            new_row = {
-                '№': new_row_num,
-                'Дата': date_str,
-                'Время': time_str,
-                'Продолж-сть': duration,
-                'Интервал': interval,
-                'Комментарии': comment
-            }
+                    days = interval_days(dt - last_dt)
 
-            # Append to DataFrame
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+                # Date as MM/DD/YYYY and time as HH:MM, like the rest of the log
+                record = SeizureRecord(new_row_num, dt.strftime(DATE_FORMAT), dt.strftime(TIME_FORMAT),
+                                       duration, days, comment)
+                line = self._append_record(record, tail['ends_with_newline'])
 
-            # Write back to CSV, preserving the header
-            with open(self.csv_path, 'r') as f:
-                header = f.readline().strip()
+                new_signature = self._file_signature()
+                self.store.notify_append(line, tail['signature'], new_signature)
 
-            with open(self.csv_path, 'w') as f:
-                f.write(header + '\n')
-                df.to_csv(f, index=False)
+                self._tail = {
+                    'signature': new_signature,
+                    'record': record,
+                    'ends_with_newline': True,
+                }
 
-            return True, interval_days
+            write_events.publish(self.csv_path)
+            return True, days
 
-        except Exception as e:
-            print(f"Error adding seizure record: {e}")
+        except Exception:
+            logger.exception("Error adding seizure record")
             return False, None
 
-    def get_statistics(self):
+    def _append_record(self, record, ends_with_newline):
         """
-        Calculate statistics from the seizure data
+        Write one record at the end of the file; call with the write and file locks held
+
+        Returns:
+            str: the record as the CSV line the seizure store is notified with
+        """
+        line = record.to_line()
+        if not ends_with_newline:
+            line = '\n' + line
+
+        with open(self.csv_path, 'a', encoding='utf-8', newline='') as f:
+            f.write(line)
+        return line
+
+    def _read_log_text(self):
+        """The whole log as text cells in LOG_COLUMNS"""
+        return read_log_text(self.csv_path)
+
+    def _write_log_text(self, frame):
+        """Replace the whole log with text cells in LOG_COLUMNS in one atomic rewrite"""
+        with atomic_write(self.csv_path) as f:
+            write_log_text(f, frame)
+
+    def _sorted_log(self):
+        """The log as text with its sorted timestamp index; call with the write and file locks held"""
+        return SortedLog(self._read_log_text(), *self.store.sorted_timestamps())
+
+    def _write_log(self, log):
+        """Write a changed SortedLog back in one atomic rewrite (the store reloads on the new mtime)"""
+        self._write_log_text(log.frame)
+
+    def find_seizure_record(self, datetime_str):
+        """
+        Look up the seizure recorded at the given date and time
+
+        Args:
+            datetime_str (str): Date and time in format 'YYYY-MM-DD HH:MM'
 
         Returns:
-            dict: Statistics about seizures
+            SeizureRecord: the record, None if there is no such record
         """
         try:
-            df = self.get_data()
-            stats = {
-                "total_seizures": len(df),
-                "avg_interval": df["Интервал"].astype(float).mean() if "Интервал" in df else 0,
-                "avg_duration": None,  # Would need to parse duration strings
-                "last_seizure": None,
-            }
+            self._ensure_file()
+            return self.store.record_at(datetime.strptime(datetime_str, "%Y-%m-%d %H:%M"))
+        except Exception:
+            logger.exception("Error finding seizure record")
+            return None
 
-            if not df.empty:
-                last_row = df.iloc[-1]
-                stats["last_seizure"] = {
-                    "date": last_row["Дата"],
-                    "time": last_row["Время"],
-                    "duration": last_row["Продолж-сть"]
-                }
+    def update_seizure_record(self, datetime_str, new_datetime_str=None, duration=None, comment=None):
+        """
+        Change the seizure recorded at the given date and time
 
-            return stats
-        except Exception as e:
-            print(f"Error calculating statistics: {e}")
-            return {}
+        A new date/time moves the row to its place in time order; only the
+        intervals around the old and the new place are recomputed.
 
+        Args:
+            datetime_str (str): Date and time of the record, 'YYYY-MM-DD HH:MM'
+            new_datetime_str (str): New date and time in the same format, None to keep it
+            duration (str): New duration, None to keep it
+            comment (str): New comment, None to keep it
 
-# Create a singleton instance
-csv_manager = CSVManager(path_to_csv)
\ No newline at end of file
+        Returns:
+            tuple: (Success status, interval in days since the previous seizure);
+                   (False, None) if there is no such record
+        """
+        try:
+            dt = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
+            new_dt = datetime.strptime(new_datetime_str, "%Y-%m-%d %H:%M") if new_datetime_str else dt
+
+            with self._write_lock, file_lock(self.csv_path):
+                self._ensure_file()
+                log = self._sorted_log()
+                k = log.find(dt)
+                if k is None:
+                    return False, None
+                if new_dt == dt:
+                    log.update(k, duration, comment)
+                    days = log.interval(k)
+                else:
+                    days = log.move(k, new_dt, duration, comment)
+                self._write_log(log)
+            write_events.publish(self.csv_path)
+            return True, days
+
+        except Exception:
+            logger.exception("Error updating seizure record")
+            return False, None
+
+    def delete_seizure_record(self, datetime_str):
+        """
+        Delete the seizure recorded at the given date and time
+
+        The rows after it are renumbered and the next seizure's interval is
+        counted from the one before the deleted record.
+
+        Args:
+            datetime_str (str): Date and time of the record, 'YYYY-MM-DD HH:MM'
+
+        Returns:
+            bool: True if a record was deleted
+        """
+        try:
+            dt = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
+            with self._write_lock, file_lock(self.csv_path):
+                self._ensure_file()
+                log = self._sorted_log()
+                k = log.find(dt)
+                if k is None:
+                    return False
+                log.remove(k)
+                self._write_log(log)
+            write_events.publish(self.csv_path)
+            return True
+
+        except Exception:
+            logger.exception("Error deleting seizure record")
+            return False
+
+    def import_seizures(self, rows):
+        """
+        Merge uploaded seizures into the log with a single rewrite of the file
+
+        Args:
+            rows (DataFrame): timestamp, duration, comment (see seizure_import.parse_upload)
+
+        Returns:
+            tuple: (rows added, rows already in the log), or None on error
+        """
+        try:
+            with self._write_lock, file_lock(self.csv_path):
+                self._ensure_file()
+                merged, added, known = merge_rows(self._read_log_text(), rows)
+                if added:
+                    # The seizure store and the tail index notice the new mtime/size and reload
+                    self._write_log_text(merged)
+            if added:
+                write_events.publish(self.csv_path)
+            return added, known
+
+        except Exception:
+            logger.exception("Error importing seizure records")
+            return None
+
+    def iter_seizure_csv(self, chunk_size=64 * 1024):
+        """Stream the seizure CSV file as it is on disk, in byte chunks"""
+        self._ensure_file()
+        with open(self.csv_path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    def get_statistics(self, now=None):
+        """
+        Calculate statistics from the seizure data
+
+        Aggregates are kept up to date per appended row by the seizure store,
+        so this does not rescan the log.
+
+        Args:
+            now (datetime): Naive local time the 7/30/90-day windows end at (default: now)
+
+        Returns:
+            dict: Statistics about seizures (see SeizureStats.summary)
+        """
+        try:
+            return self.store.statistics(now)
+        except Exception:
+            logger.exception("Error calculating statistics")
+            return {}
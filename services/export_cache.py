@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+
+from services.seizure_store import get_seizure_store
+
+
+def export_key(data_path, export_format):
+    """Cache key of an exported file: data version of the log plus the format"""
+    store = get_seizure_store(data_path)
+    return store.csv_path, store.current_version(), export_format
+
+
+class ExportCache:
+    """
+    In-memory cache of exported log files (XLSX, Parquet, gzip CSV).
+
+    Works like ChartCache: keys carry the data version, so a changed log is
+    simply never hit again and its files are dropped once a newer version is
+    stored. Each entry also remembers the Telegram file_id of the uploaded
+    document, so sending an unchanged log again uploads nothing.
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached entry {'data': bytes or None, 'file_id': str or None} or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, data):
+        """
+        Store an exported file and drop entries of older data versions
+
+        `data` is None for formats streamed straight from the log (plain CSV);
+        only their file_id is cached. An export that finishes after one of a
+        newer version was stored is returned to its caller but not cached.
+        """
+        path, version = key[0], key[1]
+        entry = {'data': data, 'file_id': None}
+        with self._lock:
+            if any(k[0] == path and k[1] > version for k in self._entries):
+                return entry
+            stale = [k for k in self._entries if k[0] == path and k[1] < version]
+            for k in stale:
+                del self._entries[k]
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
+
+    def set_file_id(self, key, file_id):
+        """Remember the Telegram file_id of an uploaded export"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['file_id'] = file_id
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Create a singleton instance
+export_cache = ExportCache()
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from functools import partial
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from config import fsm_storage, path_to_fsm_sqlite, redis_url
+
+# FSM data may hold datetimes (see handlers/add_action.py); store them as ISO strings
+json_dumps = partial(json.dumps, ensure_ascii=False, default=str)
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    FSM storage in a SQLite file.
+
+    Conversations survive restarts, and several bot processes on the same host
+    (e.g. webhook workers) share them. Queries run in a worker thread so the
+    event loop never waits on the disk.
+    """
+
+    def __init__(self, db_path, key_builder=None):
+        self.db_path = db_path
+        self.key_builder = key_builder or DefaultKeyBuilder(with_destiny=True)
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fsm (key TEXT PRIMARY KEY, state TEXT, data TEXT)"
+        )
+        self._lock = threading.Lock()
+
+    def _execute(self, query, params=()):
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()
+
+    async def set_state(self, key, state=None):
+        state = state.state if isinstance(state, State) else state
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO fsm (key, state) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET state = excluded.state",
+            (self.key_builder.build(key), state),
+        )
+
+    async def get_state(self, key):
+        row = await asyncio.to_thread(
+            self._execute, "SELECT state FROM fsm WHERE key = ?", (self.key_builder.build(key),)
+        )
+        return row[0] if row else None
+
+    async def set_data(self, key, data):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO fsm (key, data) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET data = excluded.data",
+            (self.key_builder.build(key), json_dumps(dict(data))),
+        )
+
+    async def get_data(self, key):
+        row = await asyncio.to_thread(
+            self._execute, "SELECT data FROM fsm WHERE key = ?", (self.key_builder.build(key),)
+        )
+        return json.loads(row[0]) if row and row[0] else {}
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_fsm_storage(kind=fsm_storage):
+    """
+    Build the FSM storage selected by FSM_STORAGE
+
+    "memory" is per-process and lost on restart; "sqlite" is shared by all
+    processes on one host; "redis" (needs the `redis` package and REDIS_URL)
+    is shared by workers on any host.
+    """
+    if kind == "memory":
+        return MemoryStorage()
+    if kind == "sqlite":
+        return SQLiteStorage(path_to_fsm_sqlite)
+    if kind == "redis":
+        from aiogram.fsm.storage.redis import RedisStorage
+
+        return RedisStorage.from_url(redis_url, json_dumps=json_dumps)
+    raise ValueError(f"Unknown FSM_STORAGE: {kind!r}")
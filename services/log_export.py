@@ -0,0 +1,169 @@
+import asyncio
+import functools
+import gzip
+import importlib.util
+import io
+
+from services.export_cache import export_cache, export_key
+from services.metrics import export_build_seconds, export_cache_total
+from services.seizure_import import LOG_COLUMNS, read_log_text
+from services.seizure_store import DATE_FORMAT, TIME_FORMAT, parse_seconds, parse_timestamps
+from utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+# Cache key -> task building that file right now; identical requests await it
+_in_flight = {}
+
+
+def _read_text(chunks):
+    """The log streamed by iter_seizure_csv() as text cells in LOG_COLUMNS"""
+    return read_log_text(io.BytesIO(b''.join(chunks)))
+
+
+def _typed(parsed, text):
+    """Parsed values where parsing worked, the cell's text elsewhere (None for empty cells)"""
+    return parsed.astype(object).where(parsed.notna(), text.where(text != "", None)).tolist()
+
+
+def build_csv_gz(chunks):
+    """The log as it is on disk, gzip-compressed"""
+    buf = io.BytesIO()
+    # mtime=0: the same log always compresses to the same bytes
+    with gzip.GzipFile(filename="seizure.csv", mode='wb', fileobj=buf, compresslevel=6, mtime=0) as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return buf.getvalue()
+
+
+def build_xlsx(chunks):
+    """
+    The log as an Excel sheet with typed cells
+
+    № is a number, Дата and Время are date and time cells, Продолж-сть is a
+    number of seconds and Интервал a number of days. Cells that do not parse
+    keep their text. Title row and column names are the CSV log's, so the
+    file can be loaded back with /import.
+    """
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+
+    frame = _read_text(chunks)
+    columns = [
+        _typed(pd.to_numeric(frame['№'], errors='coerce').astype('Int64'), frame['№']),
+        _typed(pd.to_datetime(frame['Дата'], format=DATE_FORMAT, errors='coerce').dt.date, frame['Дата']),
+        _typed(pd.to_datetime(frame['Время'], format=TIME_FORMAT, errors='coerce').dt.time, frame['Время']),
+        _typed(parse_seconds(frame), frame['Продолж-сть']),
+        _typed(pd.to_numeric(frame['Интервал'], errors='coerce'), frame['Интервал']),
+        frame['Комментарии'].where(frame['Комментарии'] != "", None).tolist(),
+    ]
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Приступы")
+    for letter, width in zip("ABCDEF", (6, 12, 8, 12, 10, 40)):
+        sheet.column_dimensions[letter].width = width
+    # write_only sheets serialize each row on append, so one styled cell per column can be reused
+    styled = {}
+    for index, number_format in ((1, 'DD.MM.YYYY'), (2, 'HH:MM'), (3, 'General" сек"')):
+        styled[index] = WriteOnlyCell(sheet)
+        styled[index].number_format = number_format
+
+    sheet.append(["Судорожные приступы"])
+    sheet.append(LOG_COLUMNS)
+    for row in zip(*columns):
+        row = list(row)
+        for index, cell in styled.items():
+            if row[index] is not None and not isinstance(row[index], str):
+                cell.value = row[index]
+                row[index] = cell
+        sheet.append(row)
+
+    buf = io.BytesIO()
+    workbook.save(buf)
+    return buf.getvalue()
+
+
+def build_parquet(chunks):
+    """
+    The log as a typed Parquet table
+
+    Date and time are one timestamp column, duration is in seconds and the
+    interval in days; cells that do not parse are null.
+    """
+    frame = _read_text(chunks)
+    table = pd.DataFrame({
+        "№": pd.to_numeric(frame['№'], errors='coerce').astype('Int64'),
+        "Дата и время": parse_timestamps(frame),
+        "Продолж-сть, сек": parse_seconds(frame),
+        "Интервал, дни": pd.to_numeric(frame['Интервал'], errors='coerce'),
+        "Комментарии": frame['Комментарии'],
+    })
+    buf = io.BytesIO()
+    table.to_parquet(buf, index=False)
+    return buf.getvalue()
+
+
+# Format -> button label, file name, builder (None: streamed from the log) and
+# the packages it needs (any one of them)
+EXPORT_FORMATS = {
+    'xlsx': {'label': "Excel (.xlsx)", 'filename': "seizure.xlsx", 'build': build_xlsx, 'requires': ('openpyxl',)},
+    'csv': {'label': "CSV", 'filename': "seizure.csv", 'build': None, 'requires': ()},
+    'csv.gz': {'label': "CSV, сжатый (.csv.gz)", 'filename': "seizure.csv.gz", 'build': build_csv_gz, 'requires': ()},
+    'parquet': {'label': "Parquet", 'filename': "seizure.parquet", 'build': build_parquet,
+                'requires': ('pyarrow', 'fastparquet')},
+}
+
+
+@functools.cache
+def available_formats():
+    """Export formats whose packages are installed, in menu order (checked once)"""
+    return [
+        name for name, spec in EXPORT_FORMATS.items()
+        if not spec['requires'] or any(importlib.util.find_spec(module) for module in spec['requires'])
+    ]
+
+
+async def _build_and_cache(key, storage, export_format):
+    build = EXPORT_FORMATS[export_format]['build']
+    data = None
+    if build is not None:
+        with export_build_seconds.time(export_format):
+            data = await asyncio.to_thread(build, storage.iter_seizure_csv())
+    return export_cache.put(key, data)
+
+
+def _build_done(key, task):
+    if _in_flight.get(key) is task:
+        del _in_flight[key]
+    if not task.cancelled():
+        # Mark the error as retrieved even if every waiter has gone away
+        task.exception()
+
+
+async def get_export(storage, data_path, export_format):
+    """
+    Return the log exported in `export_format`, building it only if the log changed
+
+    The file is built in a thread on first request for a data version;
+    requests for a file that is being built right now wait for that build.
+
+    Returns:
+        tuple: (cache key, cache entry with 'data' bytes, None for plain CSV,
+                and Telegram 'file_id')
+    """
+    # The version check may wait for the store's lock while another thread reloads the log
+    key = await asyncio.to_thread(export_key, data_path, export_format)
+    entry = export_cache.get(key)
+    if entry is not None:
+        export_cache_total.inc(export_format, "hit")
+        return key, entry
+
+    task = _in_flight.get(key)
+    if task is None:
+        export_cache_total.inc(export_format, "miss")
+        task = _in_flight[key] = asyncio.ensure_future(_build_and_cache(key, storage, export_format))
+        task.add_done_callback(functools.partial(_build_done, key))
+    else:
+        export_cache_total.inc(export_format, "coalesced")
+    # One waiter giving up must not cancel the others' build
+    return key, await asyncio.shield(task)
@@ -0,0 +1,67 @@
+import csv
+import io
+import logging
+import os
+import threading
+
+from services.records import MEDICINE_COLUMNS, MedicineRecord
+from services.write_events import write_events
+from utils.file_lock import file_lock
+from utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+
+class MedicineManager:
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self._write_lock = threading.Lock()
+
+    def get_medicine_data(self):
+        """Read the medicine CSV file and return as DataFrame"""
+        try:
+            return pd.read_csv(self.csv_path)
+        except Exception:
+            return pd.DataFrame(columns=MEDICINE_COLUMNS)
+
+    def _ends_with_newline(self):
+        with open(self.csv_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def add_medicine_record(self, date_str, comment):
+        """
+        Add a new medicine record to the CSV file
+
+        The row is appended to the end of the file, the log is not read or
+        rewritten.
+
+        Args:
+            date_str (str): Date in format 'MM/DD/YYYY'
+            comment (str): Treatment information or comment
+
+        Returns:
+            bool: Success status
+        """
+        try:
+            record = MedicineRecord(date_str, comment)
+            with self._write_lock, file_lock(self.csv_path):
+                buf = io.StringIO()
+                writer = csv.writer(buf, lineterminator='\n')
+                if not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) == 0:
+                    writer.writerow(MEDICINE_COLUMNS)
+                elif not self._ends_with_newline():
+                    buf.write('\n')
+                writer.writerow(record.to_row())
+
+                with open(self.csv_path, 'a', encoding='utf-8', newline='') as f:
+                    f.write(buf.getvalue())
+
+            write_events.publish(self.csv_path)
+            return True
+
+        except Exception:
+            logger.exception("Error adding medicine record")
+            return False
@@ -0,0 +1,178 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; handler, storage and chart timings all fall in this range
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter per label combination"""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            yield f"{self.name}{_labels(self.labels, label_values)} {value}"
+
+
+class Histogram:
+    """
+    Prometheus-style histogram per label combination.
+
+    Observing is a bisect over the bucket bounds and three additions under a
+    lock; the cumulative bucket counts are only built when the metrics are
+    scraped.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values):
+        """Number of observations so far for these label values"""
+        with self._lock:
+            series = self._series.get(label_values)
+            return series[2] if series else 0
+
+    @contextmanager
+    def time(self, *label_values):
+        """Observe the wall time of the `with` block, also when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def samples(self):
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for label_values, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                bucket = f'le="{bound}"'
+                yield f"{self.name}_bucket{_labels(self.labels, label_values, bucket)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, label_values)} {total}"
+            yield f"{self.name}_count{_labels(self.labels, label_values)} {count}"
+
+
+class MetricsRegistry:
+    """The bot's metrics, rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labels=()):
+        metric = Counter(name, documentation, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, documentation, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+async def start_metrics_server(host, port, registry=None):
+    """
+    Serve GET /metrics on host:port
+
+    Returns:
+        aiohttp.web.AppRunner: call `await runner.cleanup()` to stop the server
+    """
+    from aiohttp import web
+
+    registry = registry or metrics
+
+    async def handle(request):
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+    except BaseException:
+        await runner.cleanup()
+        raise
+    return runner
+
+
+# Create a singleton instance
+metrics = MetricsRegistry()
+
+updates_total = metrics.counter(
+    "bot_updates_total", "Telegram updates received, by update type", ("event_type",))
+update_seconds = metrics.histogram(
+    "bot_update_seconds", "Time to process one update, middlewares, filters and handler included",
+    ("event_type",))
+handler_seconds = metrics.histogram(
+    "bot_handler_seconds", "Handler latency", ("handler",))
+handler_errors_total = metrics.counter(
+    "bot_handler_errors_total", "Handlers that raised an exception", ("handler",))
+storage_seconds = metrics.histogram(
+    "bot_storage_seconds", "Time spent in storage calls (log reads and writes)", ("operation",))
+chart_render_seconds = metrics.histogram(
+    "bot_chart_render_seconds", "Chart rendering time in the worker pool, queueing excluded", ("chart_type",))
+chart_cache_total = metrics.counter(
+    "bot_chart_cache_total", "Chart cache lookups: hit, miss, or coalesced into a render already running", ("result",))
+precompute_seconds = metrics.histogram(
+    "bot_precompute_seconds", "Background rebuild of charts and statistics after a write, by log", ("log",))
+export_build_seconds = metrics.histogram(
+    "bot_export_build_seconds", "Time to build an exported log file (XLSX, Parquet, gzip CSV)", ("format",))
+export_cache_total = metrics.counter(
+    "bot_export_cache_total", "Export cache lookups by format: hit, miss, or coalesced into a build already running",
+    ("format", "result"))
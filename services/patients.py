@@ -0,0 +1,123 @@
+import json
+import os
+import re
+import threading
+
+from config import (
+    admin_json, path_to_patients, patients_dir, storage_backend,
+    path_to_csv, path_to_medicine_csv, path_to_sqlite, path_to_binary_log,
+)
+from services.storage import create_storage, partition_paths
+
+# Patient used when there is no patients file: the original single log in data/
+DEFAULT_PATIENT = "default"
+# Patient ids become directory names
+PATIENT_ID_PATTERN = re.compile(r'^[\w-]+$')
+
+
+class Patient:
+    """One patient's partition: its own log files (or database) and the storage writing them"""
+
+    def __init__(self, patient_id, storage, medicine_storage, seizure_data_path, medicine_data_path):
+        self.id = patient_id
+        self.storage = storage
+        self.medicine_storage = medicine_storage
+        self.seizure_data_path = seizure_data_path
+        self.medicine_data_path = medicine_data_path
+
+
+def load_patients(path=path_to_patients):
+    """
+    Read the patients file
+
+    Format: {"<patient id>": {"admins": {"<telegram id>": "<name>", ...},
+                              "data_dir": "<optional, relative to the file>"}, ...}
+
+    Returns:
+        dict: patient id -> {"admins": {int telegram id: name}, "data_dir": str or None}
+    """
+    if not os.path.exists(path):
+        return {DEFAULT_PATIENT: {"admins": dict(admin_json), "data_dir": None}}
+
+    with open(path, encoding='utf-8') as f:
+        raw = json.load(f)
+    patients = {}
+    for patient_id, entry in raw.items():
+        if not PATIENT_ID_PATTERN.match(patient_id):
+            raise ValueError(f"Invalid patient id in {path}: {patient_id!r}")
+        data_dir = entry.get("data_dir")
+        if data_dir is not None:
+            data_dir = os.path.join(os.path.dirname(os.path.abspath(path)), data_dir)
+        admins = {int(tg_id): name for tg_id, name in entry.get("admins", {}).items()}
+        patients[patient_id] = {"admins": admins, "data_dir": data_dir}
+    return patients
+
+
+class PatientRegistry:
+    """
+    Maps Telegram admins to patients and opens each patient's partition on first use.
+
+    Partitions share nothing: every patient has its own files, its own storage
+    objects (and so its own write locks, seizure store and cache keys), so
+    writes for different patients never wait for each other. Opening a
+    partition is guarded per patient, so a slow first open (e.g. a CSV to
+    SQLite migration) does not hold up the others.
+    """
+
+    def __init__(self, patients, backend=storage_backend):
+        self.backend = backend
+        self._config = patients
+        # Telegram id -> (patient id, admin name)
+        self._admins = {}
+        for patient_id, entry in patients.items():
+            for tg_id, name in entry["admins"].items():
+                if tg_id in self._admins:
+                    raise ValueError(
+                        f"Admin {tg_id} is listed for both {self._admins[tg_id][0]!r} and {patient_id!r}"
+                    )
+                self._admins[tg_id] = (patient_id, name)
+        self._patients = {}
+        self._open_locks = {patient_id: threading.Lock() for patient_id in patients}
+
+    def admin_name(self, tg_id):
+        """Name of the admin with this Telegram id, None for everyone else"""
+        admin = self._admins.get(tg_id)
+        return admin[1] if admin else None
+
+    def for_user(self, tg_id):
+        """The patient this Telegram user keeps the log of, None if they are not an admin"""
+        admin = self._admins.get(tg_id)
+        return self.get(admin[0]) if admin else None
+
+    def get(self, patient_id):
+        """Open (once) and return the partition of `patient_id`"""
+        patient = self._patients.get(patient_id)
+        if patient is not None:
+            return patient
+        with self._open_locks[patient_id]:
+            patient = self._patients.get(patient_id)
+            if patient is None:
+                patient = self._patients[patient_id] = self._open(patient_id)
+        return patient
+
+    def all(self):
+        """Partitions of every configured patient"""
+        return [self.get(patient_id) for patient_id in self._config]
+
+    def opened(self):
+        """Partitions opened so far, without opening the others"""
+        return list(self._patients.values())
+
+    def _open(self, patient_id):
+        data_dir = self._config[patient_id]["data_dir"]
+        if data_dir is None and patient_id == DEFAULT_PATIENT:
+            paths = path_to_csv, path_to_medicine_csv, path_to_sqlite, path_to_binary_log
+        else:
+            paths = partition_paths(data_dir or os.path.join(patients_dir, patient_id))
+        # Lock files sit next to the logs, so the directory must exist before the first write
+        os.makedirs(os.path.dirname(paths[0]), exist_ok=True)
+        return Patient(patient_id, *create_storage(self.backend, *paths))
+
+
+# Create a singleton instance
+patients = PatientRegistry(load_patients())
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import os
+from contextlib import suppress
+
+from config import precompute_delay
+from services import chart_pool
+from services.metrics import precompute_seconds
+from services.patients import patients
+from services.write_events import write_events
+
+logger = logging.getLogger(__name__)
+
+# The charts behind the plain "Отправить визуализацию" button (see send_chart.py)
+CHART_TYPES = ('interval', 'duration')
+
+
+class Precomputer:
+    """
+    Rebuilds charts and statistics in the background after each write.
+
+    The storage classes publish every write (see write_events); once a log has
+    been quiet for `delay` seconds, the charts of the patients writing it are
+    rendered into the chart cache in the chart process pool and the running
+    statistics are rebuilt in a thread. A burst of writes (an import, a few
+    edits in a row) gives one rebuild, and the next button press is answered
+    from the cache.
+
+    Only writes made by this process are seen: with several webhook workers
+    each one precomputes for the writes it handled.
+    """
+
+    def __init__(self, registry=patients, delay=precompute_delay):
+        self.registry = registry
+        self.delay = delay
+        self._loop = None
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        """Start listening for writes; call from the running event loop"""
+        if self.delay <= 0 or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = self._loop.create_task(self._run())
+        write_events.subscribe(self._on_write)
+
+    async def stop(self):
+        """Stop listening and cancel the pending and running rebuilds"""
+        if self._task is None:
+            return
+        write_events.unsubscribe(self._on_write)
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def _on_write(self, path):
+        # Called in the writing thread (asyncio.to_thread / write_queue)
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, os.path.abspath(path))
+        except RuntimeError:
+            # The loop is already closed: the bot is shutting down
+            pass
+
+    async def _run(self):
+        # Log path -> loop time its rebuild is due; each new write pushes it back
+        pending = {}
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(0.0, min(pending.values()) - self._loop.time())
+            try:
+                path = await asyncio.wait_for(self._queue.get(), timeout)
+                pending[path] = self._loop.time() + self.delay
+            except asyncio.TimeoutError:
+                now = self._loop.time()
+                for path in [path for path, due in pending.items() if due <= now]:
+                    del pending[path]
+                    await self._refresh(path)
+
+    async def _refresh(self, path):
+        for patient in self.registry.opened():
+            try:
+                if os.path.abspath(patient.seizure_data_path) == path:
+                    with precompute_seconds.time("seizures"):
+                        await asyncio.to_thread(patient.storage.get_statistics)
+                        await self._render(patient.seizure_data_path)
+                if os.path.abspath(patient.medicine_data_path) == path:
+                    # Only the charts with the treatment periods show the medicine log
+                    with precompute_seconds.time("medicine"):
+                        await self._render(patient.seizure_data_path, treatments=patient.medicine_data_path)
+            except Exception:
+                logger.exception("Precompute for %s failed", patient.id)
+
+    @staticmethod
+    async def _render(seizure_path, treatments=None):
+        # Same parameters as the button press, so it finds them under the same cache keys
+        await asyncio.gather(*(
+            chart_pool.get_chart(seizure_path, chart_type, period=None, start=None, end=None, treatments=treatments)
+            for chart_type in CHART_TYPES
+        ))
+
+
+# Create a singleton instance
+precomputer = Precomputer()
@@ -0,0 +1,272 @@
+import csv
+import io
+import math
+import re
+from dataclasses import dataclass
+from datetime import datetime
+
+from services.seizure_import import LOG_COLUMNS
+from services.seizure_store import (
+    DATE_FORMAT, TIME_FORMAT, DURATION_PATTERN, interval_text, parse_dates, parse_duration_strings, parse_times,
+)
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+MEDICINE_COLUMNS = ["Дата", "Лечение/Комментарии"]
+# Text cells kept dictionary-encoded by SeizureColumns: record field -> log column
+TEXT_FIELDS = {"date": "Дата", "time": "Время", "duration": "Продолж-сть", "comment": "Комментарии"}
+
+_duration_re = re.compile(DURATION_PATTERN)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+@dataclass(slots=True)
+class SeizureRecord:
+    """
+    One row of the seizure log.
+
+    № and Интервал are numbers; date, time, duration and comment keep the text
+    written in the log, so a record written back gives the same cells. The
+    parsed timestamp and seconds follow the same rules as parse_timestamps
+    and parse_seconds.
+    """
+
+    number: int | None
+    date: str
+    time: str
+    duration: str = ""
+    interval_days: float | None = None
+    comment: str = ""
+
+    @classmethod
+    def from_row(cls, row):
+        """A record from the CSV cells of one log row (missing cells are blank)"""
+        row = list(row) + [""] * (len(LOG_COLUMNS) - len(row))
+        try:
+            number = int(float(row[0]))
+        except (ValueError, OverflowError):
+            number = None
+        interval = _to_float(row[4])
+        return cls(number, row[1], row[2], row[3], None if math.isnan(interval) else interval, row[5])
+
+    @classmethod
+    def from_line(cls, line):
+        """A record from one CSV line of the log"""
+        return cls.from_row(next(csv.reader([line.strip('\r\n')]), []))
+
+    @property
+    def timestamp(self):
+        """Date and time as datetime, None if they do not parse"""
+        try:
+            return datetime.strptime(f"{self.date} {self.time}", f"{DATE_FORMAT} {TIME_FORMAT}")
+        except ValueError:
+            return None
+
+    @property
+    def seconds(self):
+        """Duration in seconds ('40 сек' -> 40.0), None if blank or not a number"""
+        duration = self.duration.replace('сек', '').strip()
+        return float(duration) if _duration_re.match(duration) else None
+
+    def to_row(self):
+        """The record as CSV cells in LOG_COLUMNS order"""
+        return [
+            "" if self.number is None else self.number,
+            self.date,
+            self.time,
+            self.duration,
+            "" if self.interval_days is None else interval_text(self.interval_days),
+            self.comment,
+        ]
+
+    def to_line(self):
+        """The record as one CSV line of the log"""
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator='\n').writerow(self.to_row())
+        return buf.getvalue()
+
+
+@dataclass(slots=True)
+class MedicineRecord:
+    """One row of the medicine log: the date (MM/DD/YYYY) and the treatment or comment"""
+
+    date: str
+    comment: str = ""
+
+    @classmethod
+    def from_row(cls, row):
+        row = list(row) + [""] * (len(MEDICINE_COLUMNS) - len(row))
+        return cls(row[0], row[1])
+
+    @property
+    def day(self):
+        """The date as datetime.date, None if it does not parse"""
+        try:
+            return datetime.strptime(self.date, DATE_FORMAT).date()
+        except ValueError:
+            return None
+
+    def to_row(self):
+        return [self.date, self.comment]
+
+
+class SeizureColumns:
+    """
+    The full seizure history as NumPy columns.
+
+    № and Интервал are float arrays (NaN for blank), the parsed timestamp and
+    seconds are datetime64/float arrays, and the text cells are
+    dictionary-encoded: an int32 code per row plus each distinct string once
+    (dates, times, durations and comments repeat a lot). Appending a record
+    writes one slot of each array; the arrays grow geometrically, so an
+    append is amortized O(1). DataFrames are only built when asked for.
+
+    Rows are only ever appended; the owner builds a new instance when the log
+    is rewritten.
+    """
+
+    def __init__(self, capacity=0):
+        self._size = 0
+        self._numbers = np.empty(capacity, dtype=float)
+        self._intervals = np.empty(capacity, dtype=float)
+        self._timestamps = np.empty(capacity, dtype='datetime64[ns]')
+        self._seconds = np.empty(capacity, dtype=float)
+        self._codes = {field: np.empty(capacity, dtype=np.int32) for field in TEXT_FIELDS}
+        self._values = {field: [] for field in TEXT_FIELDS}
+        # text -> code, built on the first append of each field
+        self._lookup = {}
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Build from the whole log, vectorized
+
+        Dates, times and durations are parsed once per distinct string.
+
+        Args:
+            frame (DataFrame): LOG_COLUMNS as read_log_cells (or read_log_text)
+                returns them, "" for blank text cells
+        """
+        columns = cls(len(frame))
+        columns._size = len(frame)
+        columns._numbers[:] = pd.to_numeric(frame['№'], errors='coerce')
+        columns._intervals[:] = pd.to_numeric(frame['Интервал'], errors='coerce')
+        for field, column in TEXT_FIELDS.items():
+            codes, uniques = pd.factorize(frame[column].astype(str))
+            columns._codes[field][:] = codes
+            columns._values[field] = list(uniques)
+
+        def parsed(field, parse):
+            return parse(pd.Series(columns._values[field], dtype=object)).to_numpy()[columns._codes[field]]
+
+        columns._timestamps[:] = parsed("date", parse_dates) + parsed("time", parse_times)
+        columns._seconds[:] = parsed("duration", parse_duration_strings)
+        return columns
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def numbers(self):
+        return self._numbers[:self._size]
+
+    @property
+    def intervals(self):
+        """Интервал in days, NaN where blank or not a number"""
+        return self._intervals[:self._size]
+
+    @property
+    def timestamps(self):
+        """Date and time of each row, NaT where they do not parse"""
+        return self._timestamps[:self._size]
+
+    @property
+    def seconds(self):
+        """Duration in seconds, NaN where blank or not a number"""
+        return self._seconds[:self._size]
+
+    def _grow(self):
+        # 1.25x plus a constant: amortized O(1) appends without doubling the memory of a big log
+        capacity = len(self._numbers) + len(self._numbers) // 4 + 1024
+        arrays = {'_numbers': self._numbers, '_intervals': self._intervals,
+                  '_timestamps': self._timestamps, '_seconds': self._seconds}
+        for name, old in arrays.items():
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+        for field, old in self._codes.items():
+            self._codes[field] = np.empty(capacity, dtype=np.int32)
+            self._codes[field][:self._size] = old[:self._size]
+
+    def _code(self, field, text):
+        lookup = self._lookup.get(field)
+        if lookup is None:
+            lookup = self._lookup[field] = {value: code for code, value in enumerate(self._values[field])}
+        code = lookup.get(text)
+        if code is None:
+            code = lookup[text] = len(self._values[field])
+            self._values[field].append(text)
+        return code
+
+    def append(self, record):
+        """Add a SeizureRecord after the last row"""
+        if self._size == len(self._numbers):
+            self._grow()
+        i = self._size
+        self._numbers[i] = math.nan if record.number is None else record.number
+        self._intervals[i] = math.nan if record.interval_days is None else record.interval_days
+        timestamp = record.timestamp
+        self._timestamps[i] = np.datetime64('NaT') if timestamp is None else np.datetime64(timestamp, 'ns')
+        seconds = record.seconds
+        self._seconds[i] = math.nan if seconds is None else seconds
+        for field in TEXT_FIELDS:
+            self._codes[field][i] = self._code(field, getattr(record, field))
+        self._size += 1
+
+    def record(self, position):
+        """The SeizureRecord at a row position"""
+        number, interval = self._numbers[position], self._intervals[position]
+        text = {field: self._values[field][self._codes[field][position]] for field in TEXT_FIELDS}
+        return SeizureRecord(
+            None if math.isnan(number) else int(number),
+            text["date"], text["time"], text["duration"],
+            None if math.isnan(interval) else float(interval),
+            text["comment"],
+        )
+
+    def last(self):
+        """The last row as a SeizureRecord, None for an empty log"""
+        return self.record(self._size - 1) if self._size else None
+
+    def _decode(self, field, blank=""):
+        values = np.empty(len(self._values[field]), dtype=object)
+        values[:] = self._values[field]
+        if blank != "":
+            values[values == ""] = blank
+        return values[self._codes[field][:self._size]]
+
+    def frame(self):
+        """The log the way pd.read_csv(skiprows=1) reads it: № and Интервал numeric, blank text cells NaN"""
+        numbers = self.numbers
+        data = {"№": numbers.astype(np.int64) if not np.isnan(numbers).any() else numbers.copy()}
+        for field, column in TEXT_FIELDS.items():
+            data[column] = self._decode(field, blank=np.nan)
+        data["Интервал"] = self.intervals.copy()
+        return pd.DataFrame(data, columns=LOG_COLUMNS)
+
+    def typed_frame(self):
+        """Typed columns: 'timestamp', 'seconds', 'interval_days' and 'comment' ("" for blank)"""
+        return pd.DataFrame({
+            'timestamp': self.timestamps.copy(),
+            'seconds': self.seconds.copy(),
+            'interval_days': self.intervals.copy(),
+            'comment': self._decode("comment"),
+        })
@@ -0,0 +1,114 @@
+from services.seizure_store import DATE_FORMAT, TIME_FORMAT, interval_days, interval_text
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class SortedLog:
+    """
+    The seizure log as text cells plus its sorted timestamp index.
+
+    Single-row changes find their place by binary search on the index
+    (timestamps in time order, ties in file order, unreadable rows left out)
+    and touch only what the change affects: № of the rows after it and
+    Интервал of the changed row and of the next seizure in time. Everything
+    else keeps its text as it was in the file.
+    """
+
+    def __init__(self, frame, stamps, positions):
+        """
+        Args:
+            frame (DataFrame): the log as text in LOG_COLUMNS, in file order
+            stamps, positions: SeizureStore.sorted_timestamps() of the same rows
+        """
+        self.frame = frame.reset_index(drop=True)
+        self.stamps = np.asarray(stamps, dtype='datetime64[ns]')
+        self.positions = np.asarray(positions, dtype=np.int64)
+
+    def find(self, timestamp):
+        """Index into the sorted order of the first seizure at `timestamp`, None if there is none"""
+        k = int(self.stamps.searchsorted(np.datetime64(timestamp, 'ns'), 'left'))
+        if k == len(self.stamps) or self.stamps[k] != np.datetime64(timestamp, 'ns'):
+            return None
+        return k
+
+    def _renumber(self, start):
+        """№ of the rows from `start` on follow their position (the rows before keep theirs)"""
+        self.frame.loc[start:, "№"] = np.arange(start + 1, len(self.frame) + 1).astype(str)
+
+    def interval(self, k):
+        """Days from the seizure before the k-th one in time, None for the first"""
+        return interval_days(self.stamps[k] - self.stamps[k - 1]) if k else None
+
+    def _set_interval(self, k):
+        """Recompute Интервал of the k-th seizure in time from the one before it"""
+        if k >= len(self.stamps):
+            return
+        days = self.interval(k)
+        self.frame.at[int(self.positions[k]), "Интервал"] = "" if days is None else interval_text(days)
+
+    def insert(self, timestamp, duration, comment):
+        """
+        Add a seizure after the last one at or before `timestamp`
+
+        The row goes right before the next seizure in time, so unreadable rows
+        stay after the row they followed.
+
+        Returns:
+            float: interval in days since the previous seizure, None for the first one
+        """
+        stamp = np.datetime64(timestamp, 'ns')
+        k = int(self.stamps.searchsorted(stamp, 'right'))
+        position = int(self.positions[k]) if k < len(self.stamps) else len(self.frame)
+        row = pd.DataFrame([{
+            "№": "",
+            "Дата": timestamp.strftime(DATE_FORMAT),
+            "Время": timestamp.strftime(TIME_FORMAT),
+            "Продолж-сть": duration,
+            "Интервал": "",
+            "Комментарии": comment,
+        }])
+        self.frame = pd.concat([self.frame.iloc[:position], row, self.frame.iloc[position:]], ignore_index=True)
+        self._renumber(position)
+
+        self.positions = np.insert(np.where(self.positions >= position, self.positions + 1, self.positions),
+                                   k, position)
+        self.stamps = np.insert(self.stamps, k, stamp)
+        self._set_interval(k)
+        self._set_interval(k + 1)
+        return self.interval(k)
+
+    def remove(self, k):
+        """Delete the k-th seizure in time; the next one's interval then counts from the one before"""
+        position = int(self.positions[k])
+        self.frame = self.frame.drop(index=position).reset_index(drop=True)
+        self._renumber(position)
+
+        positions = np.delete(self.positions, k)
+        self.positions = np.where(positions > position, positions - 1, positions)
+        self.stamps = np.delete(self.stamps, k)
+        self._set_interval(k)
+
+    def update(self, k, duration=None, comment=None):
+        """Change the duration and/or comment of the k-th seizure in place"""
+        position = int(self.positions[k])
+        if duration is not None:
+            self.frame.at[position, "Продолж-сть"] = duration
+        if comment is not None:
+            self.frame.at[position, "Комментарии"] = comment
+
+    def move(self, k, timestamp, duration=None, comment=None):
+        """
+        Give the k-th seizure a new date and time (and optionally new cells)
+
+        Returns:
+            float: its interval in days at the new place, None if it is now the first
+        """
+        row = self.frame.iloc[int(self.positions[k])]
+        self.remove(k)
+        return self.insert(
+            timestamp,
+            row["Продолж-сть"] if duration is None else duration,
+            row["Комментарии"] if comment is None else comment,
+        )
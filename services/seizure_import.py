@@ -0,0 +1,380 @@
+import codecs
+import csv
+import io
+import os
+import zipfile
+from collections import Counter
+from datetime import datetime, time as dt_time
+
+from services.seizure_store import DATE_FORMAT, TIME_FORMAT, DURATION_PATTERN, interval_text, parse_timestamps
+from utils.date_parser import parse_user_datetime, parse_strict_time
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+LOG_COLUMNS = ["№", "Дата", "Время", "Продолж-сть", "Интервал", "Комментарии"]
+IMPORT_EXTENSIONS = ('.csv', '.xlsx')
+CHUNK_ROWS = 50_000
+# Header cell (lower case) -> log column; the bot's own export and common spreadsheet names
+COLUMN_ALIASES = {
+    'дата': 'Дата', 'date': 'Дата',
+    'время': 'Время', 'time': 'Время',
+    'продолж-сть': 'Продолж-сть', 'продолжительность': 'Продолж-сть', 'duration': 'Продолж-сть',
+    'комментарии': 'Комментарии', 'комментарий': 'Комментарии', 'comment': 'Комментарии', 'comments': 'Комментарии',
+}
+# Day-first dates with dots, the way admins type them in the bot's dialog (parsed the same way there)
+TYPED_DATE_FORMAT = "%d.%m.%Y"
+# The header is looked for in the first rows (the bot's export has a title row above it)
+HEADER_SEARCH_ROWS = 10
+
+
+class ImportFormatError(ValueError):
+    """The upload is not a seizure table we can read"""
+
+
+def _header_columns(cells):
+    """Map header cells to log columns; None if the row has no date column"""
+    columns = [COLUMN_ALIASES.get(str(cell).strip().lower()) if cell is not None else None for cell in cells]
+    return columns if 'Дата' in columns else None
+
+
+def _cell_text(value):
+    """Spreadsheet cell -> the text the same value has in the CSV log"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        if value.time() == dt_time():
+            return value.strftime(DATE_FORMAT)
+        return value.strftime(f"{DATE_FORMAT} {TIME_FORMAT}")
+    if isinstance(value, dt_time):
+        return value.strftime(TIME_FORMAT)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _select(frame, columns):
+    """Keep the recognised columns under their log names, add missing ones as empty"""
+    frame = frame.loc[:, [column is not None for column in columns]].copy()
+    frame.columns = [column for column in columns if column is not None]
+    frame = frame.loc[:, ~frame.columns.duplicated()]
+    for column in ('Время', 'Продолж-сть', 'Комментарии'):
+        if column not in frame:
+            frame[column] = None if column == 'Время' else ""
+    return frame
+
+
+def _read_csv_chunks(data):
+    try:
+        # Incremental, so a character cut at the end of the slice is not taken for cp1251
+        head = codecs.getincrementaldecoder('utf-8-sig')().decode(data[:64 * 1024])
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError:
+        # Excel on a Russian Windows saves CSV as cp1251
+        head, encoding = data[:64 * 1024].decode('cp1251'), 'cp1251'
+
+    lines = head.splitlines()[:HEADER_SEARCH_ROWS]
+    for skip, line in enumerate(lines):
+        # Excel with a Russian locale separates with ';'
+        sep = ';' if line.count(';') > line.count(',') else ','
+        columns = _header_columns(next(csv.reader([line], delimiter=sep), []))
+        if columns:
+            break
+    else:
+        raise ImportFormatError("не найдена строка заголовка с колонкой «Дата»")
+
+    first_line = skip + 2
+    try:
+        chunks = pd.read_csv(io.BytesIO(data), sep=sep, encoding=encoding, skiprows=skip + 1, header=None,
+                             dtype=str, keep_default_na=False, chunksize=CHUNK_ROWS,
+                             names=range(len(columns)), usecols=range(len(columns)), skip_blank_lines=True)
+        for chunk in chunks:
+            chunk['line'] = chunk.index + first_line
+            yield _select(chunk, columns + ['line'])
+    except UnicodeDecodeError:
+        # Only the first 64 KB decide the encoding; the rest of the file is in another one
+        raise ImportFormatError(f"в файле есть символы не в кодировке {encoding.split('-sig')[0]}") from None
+    except pd.errors.ParserError as e:
+        raise ImportFormatError(f"файл CSV повреждён ({e})") from None
+
+
+def _read_xlsx_chunks(data):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportFormatError("для XLSX на сервере нужен пакет openpyxl")
+
+    try:
+        workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    except (zipfile.BadZipFile, KeyError):
+        # Not a zip at all (e.g. a renamed .xls or CSV), or a zip without a workbook inside
+        raise ImportFormatError("файл XLSX повреждён или это не XLSX") from None
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        for line, cells in enumerate(rows, start=1):
+            columns = _header_columns(cells)
+            if columns or line >= HEADER_SEARCH_ROWS:
+                break
+        if not columns:
+            raise ImportFormatError("не найдена строка заголовка с колонкой «Дата»")
+
+        width = len(columns)
+        batch = []
+        for line, cells in enumerate(rows, start=line + 1):
+            batch.append([_cell_text(value) for value in cells[:width]] + [""] * (width - len(cells)) + [line])
+            if len(batch) == CHUNK_ROWS:
+                yield _select(pd.DataFrame(batch), columns + ['line'])
+                batch = []
+        if batch:
+            yield _select(pd.DataFrame(batch), columns + ['line'])
+    finally:
+        workbook.close()
+
+
+def read_upload(data, filename):
+    """
+    Read an uploaded CSV/XLSX table in chunks of CHUNK_ROWS rows
+
+    Yields:
+        DataFrame: text columns Дата, Время (None if the table has no time column),
+                   Продолж-сть, Комментарии plus the source line number
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == '.csv':
+        return _read_csv_chunks(data)
+    if extension == '.xlsx':
+        return _read_xlsx_chunks(data)
+    raise ImportFormatError(f"поддерживаются только файлы {', '.join(IMPORT_EXTENSIONS)}")
+
+
+def _parse_distinct(values, fast_formats, fallback):
+    """
+    Parse text values, each distinct one once: vectorized with the log's own
+    formats first, `fallback(text)` (or None) for whatever they do not match
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.to_datetime(uniques, format=fast_formats[0], errors='coerce')
+    for fast_format in fast_formats[1:]:
+        parsed = parsed.fillna(pd.to_datetime(uniques, format=fast_format, errors='coerce'))
+    for i in np.flatnonzero(parsed.isna().to_numpy()):
+        text = uniques.iat[i]
+        parsed.iat[i] = fallback(text) if text else None
+    result = parsed.to_numpy()[codes]
+    result[codes < 0] = np.datetime64('NaT')
+    return pd.Series(result, index=values.index)
+
+
+def _user_date(text):
+    """Dates typed the way the bot accepts them ("25.12.2023", "25 декабря 2023")"""
+    parsed = parse_user_datetime(text)
+    return parsed.replace(hour=0, minute=0, tzinfo=None) if parsed else None
+
+
+def _user_datetime(text):
+    parsed = parse_user_datetime(text)
+    return parsed.replace(tzinfo=None) if parsed else None
+
+
+def _user_time(text):
+    try:
+        return datetime.strptime(parse_strict_time(text), TIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def normalize_chunk(chunk, now):
+    """
+    Validate one chunk of uploaded rows
+
+    Slash dates follow the log's own month-first format (that is what
+    /send_file exports); anything else goes through the bot's date parser
+    (day-first, like the dates admins type).
+
+    Returns:
+        tuple: (DataFrame with timestamp, duration, comment, line of the valid rows,
+                Series of the reject reason per rejected row indexed like `chunk`)
+    """
+    dates = chunk['Дата'].fillna("").astype(str).str.strip()
+    if chunk['Время'].isna().all():
+        # No time column: the date cell holds date and time together
+        timestamps = _parse_distinct(
+            dates, (f"{DATE_FORMAT} {TIME_FORMAT}", DATE_FORMAT, f"{TYPED_DATE_FORMAT} {TIME_FORMAT}"), _user_datetime)
+        bad_time = pd.Series(False, index=chunk.index)
+    else:
+        times = chunk['Время'].fillna("").astype(str).str.strip()
+        days = _parse_distinct(dates, (DATE_FORMAT, TYPED_DATE_FORMAT, f"{DATE_FORMAT} {TIME_FORMAT}"), _user_date)
+        clock = _parse_distinct(times, (TIME_FORMAT,), _user_time) - pd.Timestamp(1900, 1, 1)
+        timestamps = days.dt.normalize() + clock
+        bad_time = days.notna() & clock.isna()
+
+    durations = chunk['Продолж-сть'].fillna("").astype(str).str.strip()
+    seconds = durations.str.replace('сек', '', regex=False).str.strip()
+    bad_duration = (seconds != "") & ~seconds.str.match(DURATION_PATTERN)
+
+    reasons = pd.Series(None, index=chunk.index, dtype=object)
+    reasons[bad_duration] = 'duration'
+    reasons[timestamps > pd.Timestamp(now)] = 'future'
+    reasons[bad_time] = 'time'
+    reasons[timestamps.isna() & ~bad_time] = 'date'
+    valid = reasons.isna()
+
+    rows = pd.DataFrame({
+        'timestamp': timestamps[valid].astype('datetime64[ns]'),
+        'duration': (seconds[valid] + " сек").where(seconds[valid] != "", ""),
+        'comment': chunk['Комментарии'][valid].fillna("").astype(str).str.strip(),
+        'line': chunk['line'][valid].astype(int),
+    })
+    return rows, reasons[~valid]
+
+
+def parse_upload(data, filename, now=None):
+    """
+    Read and validate a whole upload, chunk by chunk
+
+    Returns:
+        tuple: (DataFrame timestamp/duration/comment of the valid rows, sorted by time
+                and without repeats within the upload,
+                report dict: rows, valid, repeated, rejected {reason: count},
+                rejected_lines (first few line numbers))
+    """
+    now = now or datetime.now()
+    valid, rejected, rejected_lines, total = [], Counter(), [], 0
+    for chunk in read_upload(data, filename):
+        # Fully empty lines (e.g. trailing rows of a spreadsheet) are not rows
+        chunk = chunk[chunk[['Дата', 'Время', 'Продолж-сть', 'Комментарии']].fillna("").astype(str).ne("").any(axis=1)]
+        total += len(chunk)
+        rows, reasons = normalize_chunk(chunk, now)
+        valid.append(rows)
+        rejected.update(reasons.value_counts().to_dict())
+        if len(rejected_lines) < 5:
+            rejected_lines.extend(chunk.loc[reasons.index, 'line'].astype(int).tolist()[:5 - len(rejected_lines)])
+
+    rows = pd.concat(valid, ignore_index=True) if valid else pd.DataFrame(
+        {'timestamp': pd.Series(dtype='datetime64[ns]'), 'duration': [], 'comment': [], 'line': []})
+    rows = rows.sort_values('timestamp', kind='mergesort')
+    unique = rows.drop_duplicates('timestamp')
+    report = {
+        "rows": total,
+        "valid": len(rows),
+        "repeated": len(rows) - len(unique),
+        "rejected": dict(rejected),
+        "rejected_lines": rejected_lines,
+    }
+    return unique.drop(columns='line').reset_index(drop=True), report
+
+
+def read_log_text(source):
+    """The seizure log (path or file object, two-header-row layout) as text cells in LOG_COLUMNS"""
+    frame = pd.read_csv(source, skiprows=1, dtype=str, keep_default_na=False)
+    if 'Unnamed: 0' in frame.columns and '№' not in frame.columns:
+        frame = frame.rename(columns={'Unnamed: 0': '№'})
+    return frame.reindex(columns=LOG_COLUMNS, fill_value="")
+
+
+def read_log_cells(source):
+    """
+    The seizure log like read_log_text, but with № and Интервал parsed by the CSV reader
+
+    Those two come back as numbers (NaN for blank cells), much faster than
+    converting their text afterwards; a column with other text in it stays text.
+    """
+    frame = pd.read_csv(
+        source, skiprows=1, keep_default_na=False,
+        dtype={column: str for column in LOG_COLUMNS if column not in ("№", "Интервал")},
+        na_values={"№": [""], "Интервал": [""]},
+    )
+    if 'Unnamed: 0' in frame.columns and '№' not in frame.columns:
+        frame = frame.rename(columns={'Unnamed: 0': '№'})
+    return frame.reindex(columns=LOG_COLUMNS, fill_value="")
+
+
+def write_log_text(f, frame):
+    """Write text cells in LOG_COLUMNS as the seizure CSV (title row, column names, rows)"""
+    writer = csv.writer(f, lineterminator='\n')
+    writer.writerow(["Судорожные приступы", "", "", "", "", ""])
+    writer.writerow(LOG_COLUMNS)
+    frame[LOG_COLUMNS].to_csv(f, index=False, header=False, lineterminator='\n')
+
+
+def _format_distinct(timestamps, fmt):
+    """strftime on each distinct value only ("" for NaT); it is slow per element"""
+    codes, uniques = pd.factorize(timestamps)
+    text = np.append(np.asarray(uniques.strftime(fmt), dtype=object), "")
+    return pd.Series(text[codes], index=timestamps.index)
+
+
+def format_timestamps(timestamps, date_format=DATE_FORMAT, time_format=TIME_FORMAT):
+    """
+    Date and time text of a datetime Series, "" for NaT
+
+    Days and clock times repeat a lot, so each distinct one is formatted once.
+    """
+    days = timestamps.dt.normalize()
+    clock = timestamps - days + pd.Timestamp(2000, 1, 1)
+    return _format_distinct(days, date_format), _format_distinct(clock, time_format)
+
+
+def merge_rows(existing, new):
+    """
+    Merge new seizures into the raw log rows
+
+    Args:
+        existing (DataFrame): the log as text, LOG_COLUMNS, in file order
+        new (DataFrame): timestamp, duration, comment (see parse_upload)
+
+    Returns:
+        tuple: (merged log as text in LOG_COLUMNS plus its parsed 'timestamp' (NaT if
+                unreadable), rows added, rows already in the log)
+
+    Rows already in the log (same date and time) are skipped. The result is
+    in time order; log rows whose date can not be read stay right after the
+    row they followed. № is renumbered; Интервал is recomputed for every row
+    that follows a different row than before (the new rows, the rows right
+    after them, and log rows that were out of order), the rest keep their values.
+    """
+    existing = existing.reset_index(drop=True)
+    existing_times = parse_timestamps(existing) if len(existing) else pd.Series([], dtype='datetime64[ns]')
+    is_duplicate = new['timestamp'].isin(existing_times.dropna())
+    new = new[~is_duplicate]
+
+    dates, times = format_timestamps(new['timestamp'])
+    added = pd.DataFrame({
+        "№": "",
+        "Дата": dates,
+        "Время": times,
+        "Продолж-сть": new['duration'],
+        "Интервал": "",
+        "Комментарии": new['comment'],
+    })
+    merged = pd.concat([existing[LOG_COLUMNS], added], ignore_index=True)
+    timestamps = pd.concat([existing_times, new['timestamp']], ignore_index=True)
+    is_new = np.r_[np.zeros(len(existing), dtype=bool), np.ones(len(added), dtype=bool)]
+    # Previous seizure with a readable date of each row in the log (-1: none); new rows have none yet
+    readable_rows = np.where(existing_times.notna().to_numpy(), np.arange(len(existing)), -1)
+    previous = np.r_[-1, np.maximum.accumulate(readable_rows)[:-1]] if len(existing) else readable_rows
+    source = np.r_[np.arange(len(existing)), np.full(len(added), -2)]
+    previous = np.r_[previous, np.full(len(added), -2)]
+
+    # Unreadable log rows sort with the row before them; existing rows first on ties
+    sort_key = timestamps.ffill().fillna(pd.Timestamp.min)
+    order = np.lexsort((is_new, sort_key.to_numpy()))
+    merged = merged.iloc[order].reset_index(drop=True)
+    timestamps = timestamps.iloc[order].reset_index(drop=True)
+    is_new, source, previous = is_new[order], source[order], previous[order]
+
+    merged["№"] = np.arange(1, len(merged) + 1).astype(str)
+    merged["timestamp"] = timestamps
+    # Same rule as add_seizure_record and SortedLog: fractional days since the previous
+    # seizure with a readable date; rows without one keep their text
+    readable = timestamps.notna().to_numpy()
+    stamps = timestamps[readable]
+    days = ((stamps - stamps.shift()) / pd.Timedelta(days=1)).clip(lower=0)
+    # Recomputed where the previous seizure is not the one the row followed in the log
+    changed = is_new[readable] | (np.r_[-1, source[readable][:-1]] != previous[readable])
+    rows = merged.index[readable][changed]
+    merged.loc[rows, "Интервал"] = [
+        "" if np.isnan(value) else interval_text(value) for value in days[changed].to_numpy()
+    ]
+    return merged, len(added), int(is_duplicate.sum())
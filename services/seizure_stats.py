@@ -0,0 +1,191 @@
+import bisect
+import heapq
+import math
+from datetime import timedelta
+
+import numpy as np
+
+from services.records import SeizureRecord
+
+WINDOWS_DAYS = (7, 30, 90)
+
+
+def _to_datetime(value):
+    """numpy datetime64 -> datetime.datetime"""
+    return value.astype('datetime64[us]').item()
+
+
+class RunningStats:
+    """
+    Count, sum, min and max of a series plus its running median.
+
+    The median is kept with two heaps, the lower half as a max-heap and the
+    upper half as a min-heap: adding a value is O(log n) and reading the
+    median O(1), also for fractional intervals where nearly every value is
+    distinct.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._lower = []  # Negated, so heapq's min-heap gives the largest of the lower half
+        self._upper = []
+
+    def add(self, value):
+        if value is None or math.isnan(value):
+            return
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        if self._lower and value > -self._lower[0]:
+            heapq.heappush(self._upper, value)
+        else:
+            heapq.heappush(self._lower, -value)
+        # The lower half holds the middle value when the count is odd
+        if len(self._lower) > len(self._upper) + 1:
+            heapq.heappush(self._upper, -heapq.heappop(self._lower))
+        elif len(self._upper) > len(self._lower):
+            heapq.heappush(self._lower, -heapq.heappop(self._upper))
+
+    def update(self, values):
+        """Add a whole float array at once (NaN skipped)"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += float(values.sum())
+        low, high = float(values.min()), float(values.max())
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+        # Re-split all values at once; an ascending array is a valid min-heap
+        values = np.sort(np.concatenate([-np.array(self._lower), self._upper, values]))
+        half = (len(values) + 1) // 2
+        self._lower = (-values[:half][::-1]).tolist()
+        self._upper = values[half:].tolist()
+
+    def median(self):
+        if not self.count:
+            return None
+        if self.count % 2:
+            return -self._lower[0]
+        return (-self._lower[0] + self._upper[0]) / 2
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "median": self.median(),
+            "min": self.minimum,
+            "max": self.maximum,
+        }
+
+
+class SeizureStats:
+    """
+    Running aggregates of one seizure log, kept up to date per appended row.
+
+    Built once from the parsed log (vectorized), then each row appended by the
+    bot is added in O(1): interval/duration stats, recent seizures for the
+    7/30/90-day windows and the longest gap between seizures. A row dated
+    before the newest one cannot be merged into the longest gap, so add_line
+    returns False and the owner rebuilds the stats from the log.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.intervals = RunningStats()
+        self.durations = RunningStats()
+        self.first = None
+        self.last = None
+        self.longest_gap = None  # (start, end) of the longest gap between seizures
+        self.last_row = None
+        # Sorted timestamps within the largest window of the newest seizure
+        self._recent = []
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from the whole log as SeizureColumns (see SeizureStore.records)"""
+        stats = cls()
+        stats.total = len(records)
+        stats.intervals.update(records.intervals)
+        stats.durations.update(records.seconds)
+        last = records.last()
+        if last is not None:
+            stats.last_row = {"date": last.date, "time": last.time, "duration": last.duration}
+
+        stamps = records.timestamps
+        stamps = np.sort(stamps[~np.isnat(stamps)])
+        if len(stamps):
+            stats.first, stats.last = _to_datetime(stamps[0]), _to_datetime(stamps[-1])
+            if len(stamps) > 1:
+                i = int(np.diff(stamps).argmax())
+                stats.longest_gap = (_to_datetime(stamps[i]), _to_datetime(stamps[i + 1]))
+            cutoff = stamps[-1] - np.timedelta64(max(WINDOWS_DAYS), 'D')
+            stats._recent = stamps[stamps.searchsorted(cutoff):].astype('datetime64[us]').tolist()
+        return stats
+
+    def add_line(self, line):
+        """Add a CSV line appended to the log; False if the stats must be rebuilt"""
+        record = SeizureRecord.from_line(line)
+        timestamp = record.timestamp
+        self.total += 1
+        self.intervals.add(record.interval_days)
+        self.durations.add(record.seconds)
+        self.last_row = {"date": record.date, "time": record.time, "duration": record.duration}
+        if timestamp is None:
+            return True
+        if self.last is not None and timestamp < self.last:
+            return False
+
+        if self.last is None:
+            self.first = timestamp
+        elif self.longest_gap is None or timestamp - self.last > self.longest_gap[1] - self.longest_gap[0]:
+            self.longest_gap = (self.last, timestamp)
+        self.last = timestamp
+
+        self._recent.append(timestamp)
+        cutoff = timestamp - timedelta(days=max(WINDOWS_DAYS))
+        # Amortized O(1): every timestamp is dropped at most once
+        if self._recent[0] < cutoff:
+            del self._recent[:bisect.bisect_left(self._recent, cutoff)]
+        return True
+
+    def summary(self, now):
+        """
+        Statistics as of `now` (naive local datetime)
+
+        Returns:
+            dict: total_seizures, avg_interval, avg_duration, last_seizure,
+                  interval/duration ({count, mean, median, min, max}),
+                  last_7_days/last_30_days/last_90_days, current_streak_days,
+                  longest_streak ({days, start, end} or None)
+        """
+        intervals, durations = self.intervals.summary(), self.durations.summary()
+        stats = {
+            "total_seizures": self.total,
+            "avg_interval": intervals["mean"],
+            "avg_duration": durations["mean"],
+            "last_seizure": self.last_row,
+            "interval": intervals,
+            "duration": durations,
+        }
+        for days in WINDOWS_DAYS:
+            since = bisect.bisect_left(self._recent, now - timedelta(days=days))
+            stats[f"last_{days}_days"] = len(self._recent) - since
+
+        stats["current_streak_days"] = None
+        stats["longest_streak"] = None
+        candidates = []
+        if self.longest_gap is not None:
+            candidates.append(self.longest_gap)
+        if self.last is not None and now > self.last:
+            stats["current_streak_days"] = (now - self.last) / timedelta(days=1)
+            candidates.append((self.last, None))
+        if candidates:
+            start, end = max(candidates, key=lambda gap: (gap[1] or now) - gap[0])
+            stats["longest_streak"] = {"days": ((end or now) - start) / timedelta(days=1), "start": start, "end": end}
+        return stats
@@ -0,0 +1,364 @@
+import csv
+import io
+import os
+import threading
+from datetime import datetime
+
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+DATE_FORMAT = "%m/%d/%Y"
+TIME_FORMAT = "%H:%M"
+# Same rule as the old per-row parser: "40 сек", "40", "12.5 сек"
+DURATION_PATTERN = r'^(?:\d+\.?\d*|\.\d+)$'
+# Интервал is stored as fractional days; 4 decimals (~9 s) keep every minute apart
+INTERVAL_DECIMALS = 4
+
+
+def interval_days(delta):
+    """Time between two seizures in days, rounded the way the log stores it"""
+    return round(pd.Timedelta(delta) / pd.Timedelta(days=1), INTERVAL_DECIMALS)
+
+
+def interval_text(days):
+    """Fractional days as Интервал text: 3.0 -> '3', 2.541666 -> '2.5417'"""
+    return f"{days:.{INTERVAL_DECIMALS}f}".rstrip('0').rstrip('.')
+
+
+def _parse_unique(values, parse):
+    """Apply a vectorized parser to the distinct values only and map the result back"""
+    codes, uniques = pd.factorize(values.astype(str))
+    parsed = parse(pd.Series(uniques)).to_numpy()
+    return pd.Series(parsed[codes], index=values.index)
+
+
+def parse_dates(text):
+    """Parse a Series of 'Дата' strings (M/D/YYYY) into datetime64, NaT where unparseable"""
+    return pd.to_datetime(text, format=DATE_FORMAT, errors='coerce')
+
+
+def parse_times(text):
+    """Parse a Series of 'Время' strings (H:MM) into the time since midnight, NaT where unparseable"""
+    return pd.to_datetime(text, format=TIME_FORMAT, errors='coerce') - pd.Timestamp(1900, 1, 1)
+
+
+def parse_timestamps(frame):
+    """Parse 'Дата' + 'Время' columns into datetime64, NaT where unparseable"""
+    if frame.empty:
+        return pd.Series([], dtype='datetime64[ns]', index=frame.index)
+    # Dates and times repeat a lot, so parse each distinct string once
+    return _parse_unique(frame['Дата'], parse_dates) + _parse_unique(frame['Время'], parse_times)
+
+
+def parse_duration_strings(text):
+    """Parse a Series of 'Продолж-сть' strings like '40 сек' into float seconds, NaN otherwise"""
+    text = text.str.replace('сек', '', regex=False).str.strip()
+    valid = text.str.match(DURATION_PATTERN)
+    return pd.to_numeric(text.where(valid), errors='coerce').astype(float)
+
+
+def parse_seconds(frame):
+    """Parse 'Продолж-сть' strings like '40 сек' into float seconds, NaN otherwise"""
+    if frame.empty:
+        return pd.Series([], dtype=float, index=frame.index)
+    return _parse_unique(frame['Продолж-сть'], parse_duration_strings)
+
+
+class SeizureStore:
+    """
+    Process-wide parsed view of one seizure CSV file.
+
+    The file is parsed once into a SeizureColumns (typed NumPy columns) and
+    re-read only when its mtime/size changes. Rows appended by CSVManager are
+    added to the columns in place, so the bot's own writes do not cause a full
+    re-parse. DataFrames are only built when a caller asks for one and are
+    kept until the log changes.
+
+    Frames and arrays returned by this class are shared between callers and
+    must be treated as read-only.
+    """
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        # Bumped on every reload or append, usable as a cache key for derived data
+        self.version = 0
+        self._signature = None
+        self._records = None
+        # DataFrames built from _records on demand
+        self._frame = None
+        self._columns = None
+        self._pending_lines = []
+        self._stats = None
+        # (rows covered, sorted timestamps, their row positions) for range lookups
+        self._index = None
+        # (seizure version, medicine path, medicine signature) and the treatment timeline built for it
+        self._treatments = None
+        self._lock = threading.RLock()
+
+    def _file_signature(self):
+        st = os.stat(self.csv_path)
+        return st.st_mtime_ns, st.st_size
+
+    def _check_file(self):
+        """Drop the cache and bump the version if the file changed on disk (stat only)"""
+        signature = self._file_signature()
+        if signature != self._signature:
+            self._signature = signature
+            self._records = None
+            self._frame = None
+            self._columns = None
+            self._pending_lines = []
+            self._stats = None
+            self._index = None
+            self.version += 1
+
+    def _read_log(self):
+        """The log as read_log_cells reads it"""
+        from services.seizure_import import read_log_cells
+
+        return read_log_cells(self.csv_path)
+
+    def _load(self):
+        from services.records import SeizureColumns
+
+        self._records = SeizureColumns.from_frame(self._read_log())
+        self._frame = None
+        self._columns = None
+        self._index = None
+        self._pending_lines = []
+
+    def _flush_pending(self):
+        """Append rows written since the last read to the cached columns"""
+        from services.records import SeizureRecord
+
+        if not self._pending_lines:
+            return
+        text = ''.join(self._pending_lines)
+        self._pending_lines = []
+        rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+        if any(len(row) != 6 for row in rows):
+            # Layout we do not understand, fall back to a full reload
+            self._load()
+            return
+        for row in rows:
+            self._records.append(SeizureRecord.from_row(row))
+        self._frame = None
+        self._columns = None
+
+    def _refresh(self):
+        self._check_file()
+        if self._records is None:
+            self._load()
+        else:
+            self._flush_pending()
+
+    def records(self):
+        """Return the seizure log as SeizureColumns (shared, read-only)"""
+        with self._lock:
+            self._refresh()
+            return self._records
+
+    def frame(self):
+        """Return the raw seizure log as pd.read_csv(skiprows=1) reads it, built on demand"""
+        with self._lock:
+            self._refresh()
+            if self._frame is None:
+                self._frame = self._records.frame()
+            return self._frame
+
+    def columns(self):
+        """
+        Return typed columns of the seizure log
+
+        Returns:
+            DataFrame: 'timestamp' (datetime64), 'seconds' (float),
+                       'interval_days' (float) and 'comment' (str)
+        """
+        with self._lock:
+            self._refresh()
+            if self._columns is None:
+                self._columns = self._records.typed_frame()
+            return self._columns
+
+    def _timestamp_index(self):
+        """
+        Sorted timestamps of the log and their row positions
+
+        Built once per load; rows appended in time order are added at the end
+        instead of sorting again.
+        """
+        self._refresh()
+        all_stamps = self._records.timestamps
+        covered = 0 if self._index is None else self._index[0]
+        if covered == len(all_stamps):
+            return self._index
+        stamps = all_stamps[covered:]
+        positions = np.arange(covered, len(all_stamps))
+        valid = ~np.isnat(stamps)
+        stamps, positions = stamps[valid], positions[valid]
+        if self._index is not None and (not len(stamps) or (
+                (not len(self._index[1]) or stamps[0] >= self._index[1][-1])
+                and (np.diff(stamps) >= np.timedelta64(0)).all())):
+            self._index = (
+                len(all_stamps),
+                np.concatenate([self._index[1], stamps]),
+                np.concatenate([self._index[2], positions]),
+            )
+        else:
+            positions = np.flatnonzero(~np.isnat(all_stamps))
+            order = np.argsort(all_stamps[positions], kind='stable')
+            self._index = (len(all_stamps), all_stamps[positions][order], positions[order])
+        return self._index
+
+    def sorted_timestamps(self):
+        """
+        The log's valid timestamps in time order and their row positions
+
+        Rows with the same timestamp keep file order. The arrays are shared and
+        must be treated as read-only.
+
+        Returns:
+            tuple: (datetime64 array, int array of row positions)
+        """
+        with self._lock:
+            _, stamps, positions = self._timestamp_index()
+            return stamps, positions
+
+    def record_at(self, timestamp):
+        """
+        The first seizure recorded at exactly `timestamp` (binary search on the sorted index)
+
+        Returns:
+            SeizureRecord: the row, None if there is no such seizure
+        """
+        with self._lock:
+            _, stamps, positions = self._timestamp_index()
+            stamp = np.datetime64(timestamp, 'ns')
+            k = stamps.searchsorted(stamp, 'left')
+            if k == len(stamps) or stamps[k] != stamp:
+                return None
+            return self._records.record(int(positions[k]))
+
+    def positions_between(self, start=None, end=None):
+        """
+        Row positions of seizures with start <= timestamp < end, in file order
+
+        Found by binary search on the sorted timestamp index; rows without a
+        valid date/time are never included.
+
+        Args:
+            start, end (datetime): Naive local bounds; None leaves that side open
+        """
+        with self._lock:
+            _, stamps, positions = self._timestamp_index()
+            low = 0 if start is None else stamps.searchsorted(np.datetime64(start), 'left')
+            high = len(stamps) if end is None else stamps.searchsorted(np.datetime64(end), 'left')
+            return np.sort(positions[low:high])
+
+    def medicine_signature(self, medicine_path):
+        """Change marker of the medicine log (mtime/size), None if it does not exist"""
+        try:
+            st = os.stat(medicine_path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load_medicine(self, medicine_path):
+        try:
+            return pd.read_csv(medicine_path)
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return pd.DataFrame(columns=['Дата', 'Лечение/Комментарии'])
+
+    def treatment_timeline(self, medicine_path):
+        """
+        Treatment periods from the medicine log with the seizures during each one
+
+        Built with a vectorized as-of merge (see build_treatment_timeline) and
+        kept until either log changes.
+        """
+        from services.treatment_timeline import build_treatment_timeline
+
+        with self._lock:
+            self._check_file()
+            key = (self.version, medicine_path, self.medicine_signature(medicine_path))
+            if self._treatments is None or self._treatments[0] != key:
+                timeline = build_treatment_timeline(self.columns(), self._load_medicine(medicine_path))
+                self._treatments = (key, timeline)
+            return self._treatments[1]
+
+    def statistics(self, now=None):
+        """
+        Return running statistics of the log (see SeizureStats.summary)
+
+        The first call parses the log; after that each appended row updates the
+        aggregates in place, so the cost does not grow with the history.
+        """
+        from services.seizure_stats import SeizureStats
+
+        with self._lock:
+            self._check_file()
+            if self._stats is None:
+                self._refresh()
+                self._stats = SeizureStats.from_records(self._records)
+            return self._stats.summary(now or datetime.now())
+
+    def current_version(self):
+        """Return the data version after checking the file for outside changes"""
+        with self._lock:
+            self._check_file()
+            return self.version
+
+    def close(self):
+        """Release what the store keeps open between reads (nothing for a CSV file)"""
+
+    def notify_append(self, line, old_signature, new_signature):
+        """
+        Record a CSV line the bot has just appended to the file.
+
+        If the cache was up to date before the write, the line is merged in place
+        on the next read; otherwise the next read notices the changed file and
+        reloads it.
+        """
+        with self._lock:
+            if self._signature == old_signature:
+                if self._records is not None:
+                    self._pending_lines.append(line)
+                if self._stats is not None and not self._stats.add_line(line):
+                    self._stats = None
+                self._signature = new_signature
+                self.version += 1
+
+
+SQLITE_EXTENSIONS = ('.sqlite3', '.sqlite', '.db')
+BINARY_LOG_EXTENSION = '.bin'
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_seizure_store(csv_path):
+    """Return the shared SeizureStore for a CSV path (or a SQLite database / binary log path)"""
+    key = os.path.abspath(csv_path)
+    # Imported before taking the lock, so a store module that asks for a store
+    # while it is imported can not deadlock on it
+    if key.endswith(SQLITE_EXTENSIONS):
+        from services.sqlite_manager import SQLiteSeizureStore as store_class
+    elif key.endswith(BINARY_LOG_EXTENSION):
+        from services.binary_log import BinarySeizureStore as store_class
+    else:
+        store_class = SeizureStore
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = store_class(key)
+        return store
+
+
+def close_stores():
+    """Close every shared store, e.g. on shutdown; they stay usable and reopen on demand"""
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.close()
@@ -0,0 +1,679 @@
+import csv
+import io
+import logging
+import math
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from services.seizure_import import LOG_COLUMNS, format_timestamps, merge_rows, read_log_cells
+from services.seizure_store import SeizureStore, get_seizure_store, interval_days, interval_text
+from services.write_events import write_events
+from utils.lazy_import import lazy_import
+
+logger = logging.getLogger(__name__)
+
+pd = lazy_import("pandas")
+
+ISO_FORMAT = "%Y-%m-%d %H:%M"
+SEIZURE_TITLE = ["Судорожные приступы", "", "", "", "", ""]
+SEIZURE_COLUMNS = ["№", "Дата", "Время", "Продолж-сть", "Интервал", "Комментарии"]
+MEDICINE_COLUMNS = ["Дата", "Лечение/Комментарии"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seizures (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    row_num INTEGER,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    duration TEXT NOT NULL DEFAULT '',
+    interval TEXT NOT NULL DEFAULT '',
+    comment TEXT NOT NULL DEFAULT '',
+    occurred_at TEXT,
+    position REAL
+);
+CREATE INDEX IF NOT EXISTS seizures_occurred_at ON seizures (occurred_at);
+
+CREATE TABLE IF NOT EXISTS medicine (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    comment TEXT NOT NULL DEFAULT '',
+    taken_on TEXT
+);
+CREATE INDEX IF NOT EXISTS medicine_taken_on ON medicine (taken_on);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('seizure_version', 0);
+
+CREATE TRIGGER IF NOT EXISTS seizures_insert AFTER INSERT ON seizures BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'seizure_version';
+END;
+CREATE TRIGGER IF NOT EXISTS seizures_delete AFTER DELETE ON seizures BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'seizure_version';
+END;
+"""
+# Not for № and position: they only change along with an insert or a delete
+UPDATE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS seizures_update
+AFTER UPDATE OF date, time, duration, interval, comment, occurred_at ON seizures BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'seizure_version';
+END
+"""
+
+
+def connect(db_path):
+    """Open a connection in WAL mode; callers close it when done"""
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _upgrade_schema(conn):
+    """
+    Bring a database made by an older version up to SCHEMA, inside an open transaction
+
+    Seizures get their position (log order was id order then) and the update
+    trigger is replaced by UPDATE_TRIGGER.
+    """
+    if not any(column[1] == 'position' for column in conn.execute("PRAGMA table_info(seizures)")):
+        conn.execute("ALTER TABLE seizures ADD COLUMN position REAL")
+        _respace_positions(conn)
+    trigger = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'seizures_update'"
+    ).fetchone()
+    if trigger is None or 'UPDATE OF' not in trigger[0]:
+        conn.execute("DROP TRIGGER IF EXISTS seizures_update")
+        conn.execute(UPDATE_TRIGGER)
+
+
+def _respace_positions(conn):
+    """Number the positions 0, 1, 2, ... in log order (id order for rows without one)"""
+    conn.execute(
+        "UPDATE seizures SET position = numbered.position "
+        "FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY position, id) - 1 AS position FROM seizures) AS numbered "
+        "WHERE seizures.id = numbered.id"
+    )
+
+
+def _to_iso(date_str, time_str=None):
+    """'7/24/2025' + '2:05' -> '2025-07-24 02:05' (sortable), None if unparseable"""
+    try:
+        if time_str is None:
+            return datetime.strptime(date_str, "%m/%d/%Y").strftime("%Y-%m-%d")
+        return datetime.strptime(f"{date_str} {time_str}", "%m/%d/%Y %H:%M").strftime("%Y-%m-%d %H:%M")
+    except (TypeError, ValueError):
+        return None
+
+
+def _csv_line(row):
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator='\n').writerow(row)
+    return buf.getvalue()
+
+
+# Rows are in log order by position, a sort key with gaps: a row can go
+# anywhere without moving the others. Neighbours in time are found by binary search on
+# the occurred_at index; rows with the same time keep log order, unreadable
+# rows are skipped
+def _previous_seizure(conn, occurred_at, position=None):
+    """Last seizure (id, occurred_at, position) seizure before (occurred_at, position), or at/before occurred_at"""
+    if position is None:
+        return conn.execute(
+            "SELECT id, occurred_at, position FROM seizures WHERE occurred_at <= ? "
+            "ORDER BY occurred_at DESC, position DESC LIMIT 1", (occurred_at,)
+        ).fetchone()
+    return conn.execute(
+        "SELECT id, occurred_at, position FROM seizures WHERE (occurred_at, position) < (?, ?) "
+        "ORDER BY occurred_at DESC, position DESC LIMIT 1", (occurred_at, position)
+    ).fetchone()
+
+
+def _next_seizure(conn, occurred_at, position=None):
+    """(id, occurred_at, position) of the first seizure after (occurred_at, position), or after occurred_at"""
+    if position is None:
+        return conn.execute(
+            "SELECT id, occurred_at, position FROM seizures WHERE occurred_at > ? "
+            "ORDER BY occurred_at, position LIMIT 1", (occurred_at,)
+        ).fetchone()
+    return conn.execute(
+        "SELECT id, occurred_at, position FROM seizures WHERE (occurred_at, position) > (?, ?) "
+        "ORDER BY occurred_at, position LIMIT 1", (occurred_at, position)
+    ).fetchone()
+
+
+def _days_between(earlier, later):
+    """Interval in days between two occurred_at values, None without an earlier one"""
+    if earlier is None:
+        return None
+    return interval_days(datetime.strptime(later, ISO_FORMAT) - datetime.strptime(earlier, ISO_FORMAT))
+
+
+def _set_interval(conn, row_id, days):
+    """Store a recomputed interval for one seizure (None: it is the first one)"""
+    conn.execute(
+        "UPDATE seizures SET interval = ? WHERE id = ?",
+        ("" if days is None else interval_text(days), row_id),
+    )
+
+
+def _insert_seizure(conn, dt, duration, comment):
+    """
+    Insert a seizure in time order inside an open transaction
+
+    A seizure after all others is appended; an earlier one goes right before
+    the next seizure in time, at a position between it and the row before
+    it, so no other row moves. The № of the rows after it go up by one in a
+    single UPDATE, and only the new row's interval and the next seizure's
+    are recomputed.
+
+    Returns:
+        tuple: (interval in days, the appended CSV line or None if the row went in the middle)
+    """
+    occurred_at = dt.strftime(ISO_FORMAT)
+    date_str, time_str = dt.strftime("%m/%d/%Y"), dt.strftime("%H:%M")
+    previous = _previous_seizure(conn, occurred_at)
+    days = _days_between(previous and previous[1], occurred_at)
+    interval = "" if days is None else interval_text(days)
+    following = _next_seizure(conn, occurred_at)
+
+    if following is None:
+        last = conn.execute("SELECT row_num, position FROM seizures ORDER BY position DESC LIMIT 1").fetchone()
+        new_row_num = 1 if last is None or last[0] is None else int(last[0]) + 1
+        position = 0 if last is None else math.floor(last[1]) + 1
+        conn.execute(
+            "INSERT INTO seizures (row_num, date, time, duration, interval, comment, occurred_at, position) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (new_row_num, date_str, time_str, duration, interval, comment, occurred_at, position),
+        )
+        return days, _csv_line([new_row_num, date_str, time_str, duration, interval, comment])
+
+    following_id, following_at, following_position = following
+    position = _position_before(conn, following_position)
+    if position is None:
+        # The gap has been halved down to nothing: spread all rows out again (rare)
+        _respace_positions(conn)
+        following_position = conn.execute("SELECT position FROM seizures WHERE id = ?", (following_id,)).fetchone()[0]
+        position = _position_before(conn, following_position)
+
+    new_row_num = conn.execute("SELECT COUNT(*) FROM seizures WHERE position < ?", (position,)).fetchone()[0] + 1
+    conn.execute("UPDATE seizures SET row_num = row_num + 1 WHERE position > ?", (position,))
+    conn.execute(
+        "INSERT INTO seizures (row_num, date, time, duration, interval, comment, occurred_at, position) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (new_row_num, date_str, time_str, duration, interval, comment, occurred_at, position),
+    )
+    _set_interval(conn, following_id, _days_between(occurred_at, following_at))
+    return days, None
+
+
+def _position_before(conn, position):
+    """A free position between `position` and the row before it, None if there is none left"""
+    before = conn.execute("SELECT MAX(position) FROM seizures WHERE position < ?", (position,)).fetchone()[0]
+    if before is None:
+        return position - 1
+    middle = (before + position) / 2
+    return middle if before < middle < position else None
+
+
+def _delete_seizure(conn, row_id, occurred_at, position):
+    """
+    Delete one seizure inside an open transaction; the rows after it are
+    renumbered and the next seizure's interval counts from the one before
+    """
+    previous = _previous_seizure(conn, occurred_at, position)
+    following = _next_seizure(conn, occurred_at, position)
+    conn.execute("DELETE FROM seizures WHERE id = ?", (row_id,))
+    conn.execute("UPDATE seizures SET row_num = row_num - 1 WHERE position > ?", (position,))
+    if following is not None:
+        _set_interval(conn, following[0], _days_between(previous and previous[1], following[1]))
+
+
+class SQLiteSeizureStore(SeizureStore):
+    """
+    SeizureStore over the SQLite backend; the version comes from the meta table
+
+    Version checks run on every chart and export request, so they go through
+    one read connection per database kept open for the life of the store
+    instead of a new connection (and its PRAGMAs) per call.
+    """
+
+    def __init__(self, csv_path):
+        super().__init__(csv_path)
+        # Database path -> read connection; used under _readers_lock
+        self._readers = {}
+        self._readers_lock = threading.Lock()
+
+    def _query_one(self, db_path, sql):
+        with self._readers_lock:
+            conn = self._readers.get(db_path)
+            if conn is None:
+                # Reads only: the database is in WAL mode already, no PRAGMAs needed
+                conn = self._readers[db_path] = sqlite3.connect(
+                    db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            return conn.execute(sql).fetchone()
+
+    def close(self):
+        """Close the read connections; a later version check opens them again"""
+        with self._readers_lock:
+            readers, self._readers = self._readers, {}
+        for conn in readers.values():
+            conn.close()
+
+    def _file_signature(self):
+        return self._query_one(self.csv_path, "SELECT value FROM meta WHERE key = 'seizure_version'")[0]
+
+    def _read_log(self):
+        # Same parsing path as the CSV backend so both build identical columns
+        return read_log_cells(io.BytesIO(b''.join(iter_seizure_csv(self.csv_path))))
+
+    def medicine_signature(self, medicine_path):
+        # Medicine rows are only ever inserted, so count and last id change on every write
+        return self._query_one(medicine_path, "SELECT COUNT(*), MAX(id) FROM medicine")
+
+    def _load_medicine(self, medicine_path):
+        conn = connect(medicine_path)
+        try:
+            rows = conn.execute("SELECT date, comment FROM medicine ORDER BY id").fetchall()
+        finally:
+            conn.close()
+        return pd.DataFrame(rows, columns=MEDICINE_COLUMNS)
+
+
+def iter_seizure_csv(db_path, chunk_rows=1000):
+    """Stream the seizure log as UTF-8 CSV chunks in the two-header-row layout"""
+    yield (_csv_line(SEIZURE_TITLE) + _csv_line(SEIZURE_COLUMNS)).encode('utf-8')
+    conn = connect(db_path)
+    try:
+        cursor = conn.execute(
+            "SELECT row_num, date, time, duration, interval, comment FROM seizures ORDER BY position"
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            buf = io.StringIO()
+            csv.writer(buf, lineterminator='\n').writerows(
+                ['' if value is None else value for value in row] for row in rows
+            )
+            yield buf.getvalue().encode('utf-8')
+    finally:
+        conn.close()
+
+
+class SQLiteManager:
+    """
+    Seizure and medicine logs stored in SQLite (WAL mode).
+
+    Implements the same contract as CSVManager (add_seizure_record,
+    find/update/delete_seizure_record, get_data, get_statistics) and
+    MedicineManager (add_medicine_record, get_medicine_data). Date and time
+    strings are kept exactly as written so the CSV export is lossless; an
+    indexed ISO timestamp column is stored next to them for range queries
+    and for placing rows in time order.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = connect(db_path)
+        try:
+            conn.executescript(SCHEMA)
+            conn.execute("BEGIN IMMEDIATE")
+            _upgrade_schema(conn)
+            conn.execute("COMMIT")
+            conn.execute("CREATE INDEX IF NOT EXISTS seizures_position ON seizures (position)")
+        finally:
+            conn.close()
+        self.store = get_seizure_store(db_path)
+
+    def is_empty(self):
+        conn = connect(self.db_path)
+        try:
+            seizures = conn.execute("SELECT COUNT(*) FROM seizures").fetchone()[0]
+            medicine = conn.execute("SELECT COUNT(*) FROM medicine").fetchone()[0]
+            return seizures == 0 and medicine == 0
+        finally:
+            conn.close()
+
+    def get_data(self):
+        """Return the seizure log as DataFrame (shared, read-only)"""
+        try:
+            return self.store.frame()
+        except Exception:
+            logger.exception("Error reading seizures from SQLite")
+            return pd.DataFrame()
+
+    def add_seizure_record(self, datetime_str, duration, comment=""):
+        """
+        Add a new seizure record in time order (see _insert_seizure)
+
+        Args:
+            datetime_str (str): Date and time in format 'YYYY-MM-DD HH:MM'
+            duration (str): Duration of the seizure
+            comment (str): Optional comment
+
+        Returns:
+            tuple: (Success status, interval in days since the previous seizure)
+        """
+        try:
+            dt = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
+
+            conn = connect(self.db_path)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                old_version = conn.execute(
+                    "SELECT value FROM meta WHERE key = 'seizure_version'"
+                ).fetchone()[0]
+                days, line = _insert_seizure(conn, dt, duration, comment)
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+
+            if line is not None:
+                self.store.notify_append(line, old_version, old_version + 1)
+            write_events.publish(self.db_path)
+            return True, days
+
+        except Exception:
+            logger.exception("Error adding seizure record")
+            return False, None
+
+    def find_seizure_record(self, datetime_str):
+        """
+        Look up the seizure recorded at the given date and time
+
+        Args:
+            datetime_str (str): Date and time in format 'YYYY-MM-DD HH:MM'
+
+        Returns:
+            SeizureRecord: the record, None if there is no such record
+        """
+        try:
+            return self.store.record_at(datetime.strptime(datetime_str, "%Y-%m-%d %H:%M"))
+        except Exception:
+            logger.exception("Error finding seizure record")
+            return None
+
+    def update_seizure_record(self, datetime_str, new_datetime_str=None, duration=None, comment=None):
+        """
+        Change the seizure recorded at the given date and time
+
+        A new date/time moves the row to its place in time order; only the
+        intervals around the old and the new place are recomputed.
+
+        Args:
+            datetime_str (str): Date and time of the record, 'YYYY-MM-DD HH:MM'
+            new_datetime_str (str): New date and time in the same format, None to keep it
+            duration (str): New duration, None to keep it
+            comment (str): New comment, None to keep it
+
+        Returns:
+            tuple: (Success status, interval in days since the previous seizure);
+                   (False, None) if there is no such record
+        """
+        try:
+            occurred_at = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M").strftime(ISO_FORMAT)
+            new_dt = datetime.strptime(new_datetime_str, "%Y-%m-%d %H:%M") if new_datetime_str else None
+
+            conn = connect(self.db_path)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                found = conn.execute(
+                    "SELECT id, duration, comment, position FROM seizures WHERE occurred_at = ? "
+                    "ORDER BY position LIMIT 1",
+                    (occurred_at,),
+                ).fetchone()
+                if found is None:
+                    conn.execute("ROLLBACK")
+                    return False, None
+                row_id, old_duration, old_comment, position = found
+                duration = old_duration if duration is None else duration
+                comment = old_comment if comment is None else comment
+
+                if new_dt is None or new_dt.strftime(ISO_FORMAT) == occurred_at:
+                    conn.execute(
+                        "UPDATE seizures SET duration = ?, comment = ? WHERE id = ?",
+                        (duration, comment, row_id),
+                    )
+                    previous = _previous_seizure(conn, occurred_at, position)
+                    days = _days_between(previous and previous[1], occurred_at)
+                else:
+                    _delete_seizure(conn, row_id, occurred_at, position)
+                    days, _ = _insert_seizure(conn, new_dt, duration, comment)
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+            write_events.publish(self.db_path)
+            return True, days
+
+        except Exception:
+            logger.exception("Error updating seizure record")
+            return False, None
+
+    def delete_seizure_record(self, datetime_str):
+        """
+        Delete the seizure recorded at the given date and time
+
+        Args:
+            datetime_str (str): Date and time of the record, 'YYYY-MM-DD HH:MM'
+
+        Returns:
+            bool: True if a record was deleted
+        """
+        try:
+            occurred_at = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M").strftime(ISO_FORMAT)
+            conn = connect(self.db_path)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                found = conn.execute(
+                    "SELECT id, position FROM seizures WHERE occurred_at = ? ORDER BY position LIMIT 1",
+                    (occurred_at,),
+                ).fetchone()
+                if found is not None:
+                    _delete_seizure(conn, found[0], occurred_at, found[1])
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+            if found is not None:
+                write_events.publish(self.db_path)
+            return found is not None
+
+        except Exception:
+            logger.exception("Error deleting seizure record")
+            return False
+
+    def import_seizures(self, rows):
+        """
+        Merge uploaded seizures into the log in one transaction
+
+        Args:
+            rows (DataFrame): timestamp, duration, comment (see seizure_import.parse_upload)
+
+        Returns:
+            tuple: (rows added, rows already in the log), or None on error
+        """
+        try:
+            conn = connect(self.db_path)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                existing = pd.DataFrame(
+                    [['' if value is None else str(value) for value in row] for row in conn.execute(
+                        "SELECT row_num, date, time, duration, interval, comment FROM seizures ORDER BY position"
+                    )],
+                    columns=LOG_COLUMNS,
+                )
+                merged, added, known = merge_rows(existing, rows)
+                if added:
+                    # Same value _to_iso gives, without a strptime per row
+                    iso_dates, iso_times = format_timestamps(merged['timestamp'], "%Y-%m-%d", "%H:%M")
+                    merged['occurred_at'] = (iso_dates + " " + iso_times).where(merged['timestamp'].notna(), None)
+                    merged['№'] = merged['№'].astype(int)
+                    merged['position'] = range(len(merged))
+                    # Earlier history lands in the middle, so the table is rewritten in time order
+                    conn.execute("DELETE FROM seizures")
+                    conn.executemany(
+                        "INSERT INTO seizures "
+                        "(row_num, date, time, duration, interval, comment, occurred_at, position) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        merged[LOG_COLUMNS + ['occurred_at', 'position']].itertuples(index=False, name=None),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+            if added:
+                write_events.publish(self.db_path)
+            return added, known
+
+        except Exception:
+            logger.exception("Error importing seizure records")
+            return None
+
+    def get_statistics(self, now=None):
+        """
+        Calculate statistics from the seizure data
+
+        Aggregates are kept up to date per appended row by the seizure store,
+        so this does not rescan the log.
+
+        Args:
+            now (datetime): Naive local time the 7/30/90-day windows end at (default: now)
+
+        Returns:
+            dict: Statistics about seizures (see SeizureStats.summary)
+        """
+        try:
+            return self.store.statistics(now)
+        except Exception:
+            logger.exception("Error calculating statistics")
+            return {}
+
+    def iter_seizure_csv(self, chunk_rows=1000):
+        """Stream the seizure log as CSV for send_file_handler"""
+        return iter_seizure_csv(self.db_path, chunk_rows)
+
+    def add_medicine_record(self, date_str, comment):
+        """
+        Add a new medicine record
+
+        Args:
+            date_str (str): Date in format 'MM/DD/YYYY'
+            comment (str): Treatment information or comment
+
+        Returns:
+            bool: Success status
+        """
+        try:
+            conn = connect(self.db_path)
+            try:
+                conn.execute(
+                    "INSERT INTO medicine (date, comment, taken_on) VALUES (?, ?, ?)",
+                    (date_str, comment, _to_iso(date_str)),
+                )
+            finally:
+                conn.close()
+            write_events.publish(self.db_path)
+            return True
+        except Exception:
+            logger.exception("Error adding medicine record")
+            return False
+
+    def get_medicine_data(self):
+        """Return the medicine log as DataFrame with the CSV column names"""
+        conn = connect(self.db_path)
+        try:
+            rows = conn.execute("SELECT date, comment FROM medicine ORDER BY id").fetchall()
+        finally:
+            conn.close()
+        return pd.DataFrame(rows, columns=MEDICINE_COLUMNS)
+
+    def migrate_from_csv(self, seizure_csv_path, medicine_csv_path=None):
+        """
+        One-shot import of the CSV logs into an empty database
+
+        Cells are copied verbatim, so exporting back gives the same spreadsheet.
+
+        Returns:
+            tuple: (seizure rows imported, medicine rows imported)
+        """
+        if not self.is_empty():
+            raise RuntimeError(f"{self.db_path} already has data, refusing to migrate twice")
+
+        seizure_rows = []
+        with open(seizure_csv_path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # Title row
+            next(reader, None)  # Column names
+            for row in reader:
+                if not any(cell.strip() for cell in row):
+                    continue
+                row = (row + [''] * 6)[:6]
+                try:
+                    row_num = int(float(row[0]))
+                except ValueError:
+                    row_num = None
+                seizure_rows.append((row_num, row[1], row[2], row[3], row[4], row[5], _to_iso(row[1], row[2]),
+                                     len(seizure_rows)))
+
+        medicine_rows = []
+        if medicine_csv_path and os.path.exists(medicine_csv_path):
+            with open(medicine_csv_path, newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                next(reader, None)  # Column names
+                for row in reader:
+                    if not any(cell.strip() for cell in row):
+                        continue
+                    row = (row + [''] * 2)[:2]
+                    medicine_rows.append((row[0], row[1], _to_iso(row[0])))
+
+        conn = connect(self.db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO seizures (row_num, date, time, duration, interval, comment, occurred_at, position) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                seizure_rows,
+            )
+            conn.executemany(
+                "INSERT INTO medicine (date, comment, taken_on) VALUES (?, ?, ?)",
+                medicine_rows,
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return len(seizure_rows), len(medicine_rows)
+
+
+if __name__ == "__main__":
+    # python -m services.sqlite_manager: migrate the CSV logs from config.py
+    from config import path_to_csv, path_to_medicine_csv, path_to_sqlite
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    manager = SQLiteManager(path_to_sqlite)
+    seizures, medicine = manager.migrate_from_csv(path_to_csv, path_to_medicine_csv)
+    logger.info("Migrated %s seizures and %s medicine records into %s", seizures, medicine, path_to_sqlite)
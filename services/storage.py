@@ -0,0 +1,56 @@
+import logging
+import os
+
+from config import storage_backend, path_to_csv, path_to_medicine_csv, path_to_sqlite, path_to_binary_log
+
+logger = logging.getLogger(__name__)
+
+
+def partition_paths(data_dir):
+    """Seizure CSV, medicine CSV, SQLite and binary log paths inside one patient's data directory"""
+    return (
+        os.path.join(data_dir, "seizure.csv"),
+        os.path.join(data_dir, "medicine.csv"),
+        os.path.join(data_dir, "seizure.sqlite3"),
+        os.path.join(data_dir, "seizure.bin"),
+    )
+
+
+def create_storage(backend=storage_backend, csv_path=path_to_csv,
+                   medicine_csv_path=path_to_medicine_csv, sqlite_path=path_to_sqlite,
+                   binary_path=path_to_binary_log):
+    """
+    Build the seizure and medicine storage of one patient for the configured backend
+
+    Returns:
+        tuple: (seizure storage, medicine storage, path charts are read from,
+                path the chart treatment overlay reads the medicine log from)
+    """
+    if backend == "sqlite":
+        from services.sqlite_manager import SQLiteManager
+
+        manager = SQLiteManager(sqlite_path)
+        if manager.is_empty() and os.path.exists(csv_path):
+            # First start on SQLite: carry the existing spreadsheet over once
+            seizures, medicine = manager.migrate_from_csv(csv_path, medicine_csv_path)
+            logger.info("Migrated %s seizures and %s medicine records into %s", seizures, medicine, sqlite_path)
+        return manager, manager, sqlite_path, sqlite_path
+
+    if backend == "binary":
+        from services.binary_log import BinaryLogManager
+        from services.medicine_manager import MedicineManager
+
+        manager = BinaryLogManager(binary_path)
+        if manager.is_empty() and os.path.exists(csv_path):
+            # First start on the binary log: carry the existing spreadsheet over once
+            seizures = manager.migrate_from_csv(csv_path)
+            logger.info("Migrated %s seizures into %s", seizures, binary_path)
+        return manager, MedicineManager(medicine_csv_path), binary_path, medicine_csv_path
+
+    if backend == "csv":
+        from services.csv_manager import CSVManager
+        from services.medicine_manager import MedicineManager
+
+        return CSVManager(csv_path), MedicineManager(medicine_csv_path), csv_path, medicine_csv_path
+
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend!r}")
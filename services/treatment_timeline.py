@@ -0,0 +1,48 @@
+from utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+MEDICINE_DATE_FORMAT = "%m/%d/%Y"
+
+
+def build_treatment_timeline(columns, medicine):
+    """
+    Join the medicine log to the seizures with an as-of merge
+
+    Every medicine record starts a treatment period that lasts until the next
+    record. Each seizure is matched to the period in effect at its time by
+    pd.merge_asof, and the periods are summarized from that in one groupby.
+
+    Args:
+        columns (DataFrame): Typed seizure columns (see SeizureStore.columns)
+        medicine (DataFrame): Medicine log with 'Дата' and 'Лечение/Комментарии'
+
+    Returns:
+        DataFrame: one row per treatment change, oldest first: 'start', 'end'
+                   (next change, NaT for the current one), 'label', 'seizures'
+                   (count during the period), 'mean_interval' and 'mean_seconds'
+    """
+    events = pd.DataFrame({
+        'start': pd.to_datetime(medicine['Дата'], format=MEDICINE_DATE_FORMAT, errors='coerce'),
+        'label': medicine['Лечение/Комментарии'].fillna('').astype(str),
+    }).dropna(subset=['start'])
+    events = events.sort_values('start', kind='stable').reset_index(drop=True)
+    events['end'] = events['start'].shift(-1)
+
+    seizures = columns[['timestamp', 'interval_days', 'seconds']].dropna(subset=['timestamp'])
+    merged = pd.merge_asof(
+        seizures.sort_values('timestamp', kind='stable'),
+        events[['start']].assign(period=events.index),
+        left_on='timestamp', right_on='start', direction='backward',
+    )
+    per_period = merged.groupby('period').agg(
+        seizures=('timestamp', 'size'),
+        mean_interval=('interval_days', 'mean'),
+        mean_seconds=('seconds', 'mean'),
+    )
+    # Seizures before the first record have no period; the ids come back as floats then
+    per_period.index = per_period.index.astype(int)
+
+    events = events.join(per_period)
+    events['seizures'] = events['seizures'].fillna(0).astype(int)
+    return events
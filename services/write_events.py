@@ -0,0 +1,44 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class WriteEvents:
+    """
+    Tells subscribers that a log was written.
+
+    The storage classes publish the path of the log (seizure CSV, SQLite
+    database, binary log or medicine CSV) after every successful write.
+    Writes run in worker threads, so subscribers are called in the writing
+    thread and must hand the work over themselves, e.g. with
+    loop.call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, path):
+        """Call every subscriber with the path of the log that was written"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(path)
+            except Exception:
+                # The write itself succeeded; a subscriber must not turn it into an error
+                logger.exception("Error in write event subscriber")
+
+
+# Create a singleton instance
+write_events = WriteEvents()
@@ -0,0 +1,33 @@
+import asyncio
+from collections import defaultdict
+
+from services.metrics import storage_seconds
+
+
+def _timed(func, *args, **kwargs):
+    """Run a storage call, recording how long it took (waiting for the lock excluded)"""
+    with storage_seconds.time(func.__name__):
+        return func(*args, **kwargs)
+
+
+class WriteQueue:
+    """
+    Serializes storage writes per key and runs them in a worker thread.
+
+    Handlers await submit() instead of calling the blocking storage methods
+    directly, so the event loop keeps serving other users while the file is
+    written and two admins finishing at the same moment can not interleave
+    their read-modify-write cycles.
+    """
+
+    def __init__(self):
+        self._locks = defaultdict(asyncio.Lock)
+
+    async def submit(self, key, func, *args, **kwargs):
+        """Run func(*args, **kwargs) off the loop, one at a time per key"""
+        async with self._locks[key]:
+            return await asyncio.to_thread(_timed, func, *args, **kwargs)
+
+
+# Create a singleton instance
+write_queue = WriteQueue()
@@ -1,30 +1,88 @@
 import datetime
 import re
-from dateutil import parser
+from functools import lru_cache
+
 import pytz
+from utils.lazy_import import lazy_import
+
+parser = lazy_import("dateutil.parser")
 
 TIMEZONE = pytz.timezone("Asia/Dushanbe")
 
+DATE_PART_PATTERN = re.compile(r"(\d{1,2}[\s/.\-]\d{1,2}[\s/.\-]\d{2,4})")
+DATE_JUNK_PATTERN = re.compile(r'[^\d\s/.\-]')
+DATE_SEPARATOR_PATTERN = re.compile(r'[\s/.\-]+')
+TIME_JUNK_PATTERN = re.compile(r'[^\d\s:.\-]')
+TIME_SEPARATOR_PATTERN = re.compile(r'[\s:.\-]+')
+
+# Один проход по строке находит дату, время и часть суток; остальные слова
+# ("в", "примерно", "часа") пропускаются
+TOKEN_PATTERN = re.compile(r"""
+    (?P<date>
+        (?P<day>3[01]|[12]\d|0?[1-9]) \s*[\s/.\-]\s*
+        (?P<month>1[0-2]|0?[1-9]) \s*[\s/.\-]\s*
+        (?P<year>\d{4}|\d{2}) (?!\d)
+    )
+  | (?P<time>
+        (?P<hours>\d{1,2}) (?:[:.\-\s](?P<minutes>\d{2}))? (?!\d)
+    )
+  | (?<![a-zа-яё]) (?P<period>утра|утро|дня|день|вечера|вечер|ночи|ночь|am|pm) (?![a-zа-яё])
+""", re.VERBOSE)
+
+# Диапазоны для графиков: "01.01.2025 30.06.2025", "последние 90 дней", "за последний месяц"
+RANGE_DATE_PATTERN = re.compile(r"(?<!\d)(3[01]|[12]\d|0?[1-9])[/.\-](1[0-2]|0?[1-9])[/.\-](\d{4}|\d{2})(?!\d)")
+RELATIVE_RANGE_PATTERN = re.compile(
+    r"(?:за\s+)?(?:последн\w*|last)\s+(?:(\d+)\s+)?(дн\w*|день|недел\w*|месяц\w*|год\w*|лет|day|week|month|year)s?",
+    re.IGNORECASE,
+)
+RANGE_UNIT_DAYS = {'д': 1, 'н': 7, 'м': 30, 'г': 365, 'л': 365, 'd': 1, 'w': 7, 'm': 30, 'y': 365}
+
+PERIOD_PATTERN = re.compile(r"(?<![a-zа-яё])(утра|утро|дня|день|вечера|вечер|ночи|ночь|am|pm)(?![a-zа-яё])")
+
+# Две разные даты по умолчанию для dateutil: если результаты расходятся,
+# дата во вводе не указана и dateutil подставил бы сегодняшнюю
+_FUZZY_DEFAULTS = (datetime.datetime(2000, 1, 1), datetime.datetime(2001, 2, 2))
+
+
+def _full_year(year: str) -> int:
+    if len(year) == 2:
+        return 2000 + int(year) if int(year) < 50 else 1900 + int(year)
+    return int(year)
+
+
+def _to_24_hours(hours: int, period: str | None) -> int:
+    """
+    Переводит час с указанием части суток в 24-часовой формат:
+    "7 утра" -> 7, "12 дня" -> 12, "2 дня" -> 14, "2:30 вечера" -> 14, "2 ночи" -> 2, "11 ночи" -> 23
+    """
+    if period in ('am', 'утра', 'утро'):
+        return 0 if hours == 12 else hours
+    if period in ('дня', 'день'):
+        return hours + 12 if 1 <= hours <= 6 else hours
+    if period in ('pm', 'вечера', 'вечер'):
+        return hours + 12 if hours < 12 else hours
+    if period in ('ночи', 'ночь'):
+        if hours == 12:
+            return 0
+        return hours + 12 if 6 <= hours < 12 else hours
+    return hours
+
 
 def parse_strict_date(user_message: str) -> datetime.datetime:
     """
     Парсинг строго формата ДД-ММ-ГГГГ и т.п.
     Возвращает datetime.datetime (без времени).
     """
-    cleaned_input = re.sub(r'[^\d\s/.\-]', '', user_message.strip())
-    parts = re.split(r'[\s/.\-]+', cleaned_input)
-    parts = [part for part in parts if part]
+    cleaned_input = DATE_JUNK_PATTERN.sub('', user_message.strip())
+    parts = [part for part in DATE_SEPARATOR_PATTERN.split(cleaned_input) if part]
 
     if len(parts) != 3:
         raise ValueError("Неверный формат даты. Укажите день, месяц и год.")
 
     day, month, year = parts
 
-    if len(year) == 2:
-        year = f"20{year}" if int(year) < 50 else f"19{year}"
-
     try:
-        return datetime.datetime(int(year), int(month), int(day))
+        return datetime.datetime(_full_year(year), int(month), int(day))
     except ValueError:
         raise ValueError("Неверная дата. Проверьте правильность дня, месяца и года.")
 
@@ -35,11 +93,9 @@ def parse_strict_time(user_message: str) -> str:
     Возвращает строку времени: HH:MM
     """
     cleaned_input = user_message.strip().lower()
-    is_am = any(marker in cleaned_input for marker in ['am', 'утра', 'утро', 'дня'])
-    is_pm = any(marker in cleaned_input for marker in ['pm', 'вечера', 'вечер', 'ночи', 'ночь'])
-    cleaned_input = re.sub(r'[^\d\s:.\-]', '', cleaned_input)
-    parts = re.split(r'[\s:.\-]+', cleaned_input)
-    parts = [part for part in parts if part]
+    period = PERIOD_PATTERN.search(cleaned_input)
+    cleaned_input = TIME_JUNK_PATTERN.sub('', cleaned_input)
+    parts = [part for part in TIME_SEPARATOR_PATTERN.split(cleaned_input) if part]
 
     if len(parts) == 1:
         hours = int(parts[0])
@@ -50,10 +106,7 @@ def parse_strict_time(user_message: str) -> str:
     else:
         raise ValueError("Неверный формат времени.")
 
-    if is_pm and hours < 12:
-        hours += 12
-    elif is_am and hours == 12:
-        hours = 0
+    hours = _to_24_hours(hours, period.group(1) if period else None)
 
     if not (0 <= hours <= 23 and 0 <= minutes <= 59):
         raise ValueError("Неверное значение времени.")
@@ -61,26 +114,76 @@ def parse_strict_time(user_message: str) -> str:
     return f"{hours:02d}:{minutes:02d}"
 
 
+def parse_tokens(text: str) -> datetime.datetime:
+    """
+    Быстрый разбор за один проход: "25/12/2023 в 2 часа дня", "25.12.23 7 утра" и т.п.
+    Возвращает datetime без часового пояса; без времени - полночь.
+    Бросает ValueError, если даты нет или ввод неоднозначен.
+    """
+    date_match = time_match = period = None
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        kind = match.lastgroup
+        if kind == 'date':
+            if date_match:
+                raise ValueError("Указано несколько дат.")
+            date_match = match
+        elif kind == 'time':
+            if time_match:
+                raise ValueError("Указано несколько времён.")
+            time_match = match
+        elif period and period != match.group('period'):
+            raise ValueError("Противоречивое время суток.")
+        else:
+            period = match.group('period')
+
+    if date_match is None:
+        raise ValueError("Не удалось найти дату.")
+    if time_match is None and period:
+        raise ValueError("Не удалось найти время.")
+
+    hours = minutes = 0
+    if time_match:
+        hours = _to_24_hours(int(time_match.group('hours')), period)
+        minutes = int(time_match.group('minutes') or 0)
+
+    return datetime.datetime(
+        _full_year(date_match.group('year')), int(date_match.group('month')),
+        int(date_match.group('day')), hours, minutes,
+    )
+
+
+def _parse_fuzzy(user_input: str) -> datetime.datetime | None:
+    """Гибкий разбор через dateutil; None, если во вводе нет полной даты"""
+    try:
+        first, second = (
+            parser.parse(user_input, fuzzy=True, dayfirst=True, default=default)
+            for default in _FUZZY_DEFAULTS
+        )
+    except (ValueError, OverflowError):
+        return None
+    if first != second or first.tzinfo is not None:
+        return None
+    return first
+
+
+@lru_cache(maxsize=1024)
+def _parse_cached(user_input: str) -> datetime.datetime | None:
+    try:
+        naive = parse_tokens(user_input)
+    except ValueError:
+        naive = _parse_fuzzy(user_input)
+    return TIMEZONE.localize(naive) if naive else None
+
+
 def parse_user_datetime(user_input: str) -> datetime.datetime | None:
     """
-    Объединённый парсер. Сначала пробует строгий разбор, затем гибкий.
+    Объединённый парсер. Сначала пробует быстрый разбор, затем гибкий.
     Возвращает datetime с учётом часового пояса.
+    Результаты кешируются: повторный ввод не разбирается заново.
     """
-    try:
-        # Пробуем разбить вручную
-        date_part, time_part = split_date_time(user_input)
-        date_obj = parse_strict_date(date_part)
-        time_str = parse_strict_time(time_part)
-        time_obj = datetime.datetime.strptime(time_str, "%H:%M").time()
-        combined = datetime.datetime.combine(date_obj.date(), time_obj)
-        return TIMEZONE.localize(combined)
-    except Exception:
-        try:
-            # Гибкий разбор
-            dt = parser.parse(user_input, fuzzy=True)
-            return TIMEZONE.localize(dt)
-        except Exception:
-            return None
+    if not user_input:
+        return None
+    return _parse_cached(user_input.strip())
 
 
 def split_date_time(text: str) -> tuple[str, str]:
@@ -88,7 +191,7 @@ def split_date_time(text: str) -> tuple[str, str]:
     Делит ввод на две части: дату и время
     (например: "31.07.2025 03:20" -> ("31.07.2025", "03:20"))
     """
-    match = re.search(r"(\d{1,2}[\s/.\-]\d{1,2}[\s/.\-]\d{2,4})", text)
+    match = DATE_PART_PATTERN.search(text)
     if match:
         date_part = match.group(1)
         time_part = text.replace(date_part, "")
@@ -97,6 +200,46 @@ def split_date_time(text: str) -> tuple[str, str]:
         raise ValueError("Не удалось найти дату.")
 
 
+def extract_date_range(text: str, today: datetime.date) -> tuple[tuple | None, str]:
+    """
+    Находит во вводе диапазон дат для графиков.
+    "01.01.2025 30.06.2025" -> с 01.01.2025 по 30.06.2025 включительно,
+    "01.01.2025" -> с этой даты, "последние 90 дней" / "последний месяц" -> до сегодня включительно.
+    Возвращает ((start, end) или None, остаток текста); end не входит в диапазон,
+    None вместо границы - без ограничения.
+    """
+    match = RELATIVE_RANGE_PATTERN.search(text)
+    if match:
+        days = int(match.group(1) or 1) * RANGE_UNIT_DAYS[match.group(2).lower()[0]]
+        end = datetime.datetime.combine(today, datetime.time()) + datetime.timedelta(days=1)
+        return (end - datetime.timedelta(days=days), end), text[:match.start()] + text[match.end():]
+
+    dates = []
+    for match in RANGE_DATE_PATTERN.finditer(text):
+        try:
+            dates.append(datetime.datetime(_full_year(match.group(3)), int(match.group(2)), int(match.group(1))))
+        except ValueError:
+            continue
+    rest = RANGE_DATE_PATTERN.sub('', text)
+    if len(dates) >= 2:
+        start, last = min(dates[:2]), max(dates[:2])
+        return (start, last + datetime.timedelta(days=1)), rest
+    if dates:
+        return (dates[0], None), rest
+    return None, text
+
+
+def format_date_range(start, end, open_end: str = "…") -> str:
+    """
+    Диапазон из extract_date_range для подписи: "01.01.2025 – 30.06.2025".
+    end не входит в диапазон, показывается последний включённый день;
+    вместо отсутствующей границы - "…" (или open_end для конца).
+    """
+    first = start.strftime('%d.%m.%Y') if start else "…"
+    last = (end - datetime.timedelta(microseconds=1)).strftime('%d.%m.%Y') if end else open_end
+    return f"{first} – {last}"
+
+
 def format_datetime_for_csv(dt: datetime.datetime) -> str:
     """
     Возвращает строку вида YYYY-MM-DD HH:MM
@@ -104,77 +247,18 @@ def format_datetime_for_csv(dt: datetime.datetime) -> str:
     return dt.strftime("%Y-%m-%d %H:%M")
 
 
-#
-# def test_date_parser():
-#     print("=== Testing parse_strict_date ===")
-#     date_examples = [
-#         "25 12 2023",     # Spaces
-#         "25/12/2023",     # Slashes
-#         "25.12.2023",     # Dots
-#         "25-12-2023",     # Dashes
-#         "25/12/23",       # 2-digit year
-#         "25.12-2023",     # Mixed separators
-#     ]
-#
-#     for example in date_examples:
-#         try:
-#             result = parse_strict_date(example)
-#             print(f"Input: '{example}' → Output: '{result}'")
-#         except ValueError as e:
-#             print(f"Input: '{example}' → Error: {e}")
-#
-#     print("\n=== Testing parse_strict_time ===")
-#     time_examples = [
-#         "14:30",          # 24-hour format with colon
-#         "14.30",          # 24-hour format with dot
-#         "14 30",          # 24-hour format with space
-#         "2:30 pm",        # 12-hour format with PM
-#         "2:30 вечера",    # 12-hour format with Russian time of day
-#         "2:30PM",         # 12-hour without space
-#         "12 дня",         # 12-hour with only hours
-#         "7 утра",         # Morning time in Russian
-#         "23:05",          # Late evening
-#         "9",              # Only hours
-#     ]
-#
-#     for example in time_examples:
-#         try:
-#             result = parse_strict_time(example)
-#             print(f"Input: '{example}' → Output: '{result}'")
-#         except ValueError as e:
-#             print(f"Input: '{example}' → Error: {e}")
-#
-#     print("\n=== Testing split_date_time ===")
-#     split_examples = [
-#         "25.12.2023 14:30",
-#         "25/12/2023 в 14.30",
-#         "25-12-2023 примерно 2:30 вечера",
-#         "25.12.23 7 утра"
-#     ]
-#
-#     for example in split_examples:
-#         try:
-#             date_part, time_part = split_date_time(example)
-#             print(f"Input: '{example}' → Date: '{date_part}', Time: '{time_part}'")
-#         except ValueError as e:
-#             print(f"Input: '{example}' → Error: {e}")
-#
-#     print("\n=== Testing parse_user_datetime ===")
-#     datetime_examples = [
-#         "25.12.2023 14:30",
-#         "25/12/2023 в 2 часа дня",
-#         "25-12-2023 примерно 2:30 вечера",
-#         "25.12.23 7 утра",
-#         "неправильный формат",  # Should handle errors
-#     ]
-#
-#     for example in datetime_examples:
-#         result = parse_user_datetime(example)
-#         if result:
-#             formatted = format_datetime_for_csv(result)
-#             print(f"Input: '{example}' → Parsed: '{result}' → CSV format: '{formatted}'")
-#         else:
-#             print(f"Input: '{example}' → Could not parse")
-#
-# if __name__ == "__main__":
-#     test_date_parser()
\ No newline at end of file
+def format_interval(days: float) -> str:
+    """
+    Интервал в днях для сообщения: 2.5417 -> "2 дн. 13 ч", 0.0625 -> "1 ч 30 мин"
+    """
+    minutes = round(days * 24 * 60)
+    whole_days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    parts = []
+    if whole_days:
+        parts.append(f"{whole_days} дн.")
+    if hours:
+        parts.append(f"{hours} ч")
+    if minutes and not whole_days:
+        parts.append(f"{minutes} мин")
+    return " ".join(parts) or "0 мин"
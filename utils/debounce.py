@@ -0,0 +1,30 @@
+import time
+
+
+class Debouncer:
+    """
+    Drops repeated events: allow(key) is True at most once per `interval` seconds per key.
+
+    Used for impatient repeated taps on the same button; keys older than the
+    interval are forgotten, so memory stays bounded by the recent activity.
+    done(key) ends the quiet period early, e.g. once the work the first tap
+    started has finished or failed.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._last = {}
+
+    def allow(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        last = self._last.get(key)
+        if last is not None and now - last < self.interval:
+            return False
+        self._last[key] = now
+        if len(self._last) > 1024:
+            self._last = {k: t for k, t in self._last.items() if now - t < self.interval}
+        return True
+
+    def done(self, key):
+        """Let the next event for `key` through right away"""
+        self._last.pop(key, None)
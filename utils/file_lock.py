@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process locks apply
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Exclusive advisory lock on `path`.lock, shared by every process on the host
+    (several webhook workers appending to the same CSV).
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
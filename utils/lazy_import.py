@@ -0,0 +1,21 @@
+import importlib
+import types
+
+
+class _LazyModule(types.ModuleType):
+    def __getattr__(self, attr):
+        # importlib handles locking, so concurrent first uses are safe
+        module = importlib.import_module(self.__name__)
+        value = getattr(module, attr)
+        setattr(self, attr, value)
+        return value
+
+
+def lazy_import(name):
+    """
+    Return a stand-in for module `name` that imports it on first attribute access.
+
+    Used for pandas/numpy so that starting the bot does not pay for them
+    until a handler actually needs them.
+    """
+    return _LazyModule(name)